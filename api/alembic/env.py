@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.abspath("."))
 try:
     import app  # pylint: disable=unused-import
     from app.db.models import Base
+    from app.db.migrate import include_name
 
     target_metadata = Base.metadata
 except ImportError:
@@ -22,6 +23,7 @@ except ImportError:
         "WARNING: Could not import 'Base' from 'app.db.models'. Autogenerate may fail."
     )
     target_metadata = None
+    include_name = None  # pylint: disable=invalid-name
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -95,7 +97,11 @@ def run_migrations_online() -> None:
         )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
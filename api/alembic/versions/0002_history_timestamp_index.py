@@ -0,0 +1,34 @@
+"""history timestamp index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 01:52:11.402817
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stamped databases may already have it from the old per-boot autogenerate
+    op.create_index(
+        op.f("ix_history_timestamp"),
+        "history",
+        ["timestamp"],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_history_timestamp"), table_name="history")
@@ -0,0 +1,44 @@
+"""inventory reservations
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:12:44.310518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "inventory_reservations",
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["inventory.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("item_id", "day"),
+    )
+    # Every day of every rental is copied, as returns and deletions release
+    # the whole period of a rental, past days included
+    op.execute("""
+        INSERT INTO inventory_reservations (item_id, day, quantity)
+        SELECT item_id, day::date, SUM(quantity)
+        FROM rentals,
+            generate_series(start_date, end_date, interval '1 day') AS day
+        GROUP BY item_id, day::date
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("inventory_reservations")
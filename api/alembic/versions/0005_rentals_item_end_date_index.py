@@ -0,0 +1,32 @@
+"""rentals item end date index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 10:03:27.861240
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_rentals_item_id_end_date",
+        "rentals",
+        ["item_id", "end_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rentals_item_id_end_date", table_name="rentals")
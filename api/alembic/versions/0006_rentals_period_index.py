@@ -0,0 +1,36 @@
+"""rentals period index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 11:20:05.417902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rentals ending before they start would not fit in a range
+    op.execute("UPDATE rentals SET end_date = start_date WHERE end_date < start_date")
+    op.create_index(
+        "ix_rentals_period",
+        "rentals",
+        [sa.text("daterange(start_date, end_date, '[]')")],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rentals_period", table_name="rentals", postgresql_using="gist")
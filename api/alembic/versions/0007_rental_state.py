@@ -0,0 +1,97 @@
+"""rental state
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 12:41:52.093377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("rentals", sa.Column("returned_on", sa.Date(), nullable=True))
+    op.add_column(
+        "rentals",
+        sa.Column("overdue", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.alter_column("rentals", "overdue", server_default=None)
+    op.add_column(
+        "inventory",
+        sa.Column("rented_quantity", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.alter_column("inventory", "rented_quantity", server_default=None)
+    op.drop_constraint("inventory_rental_id_fkey", "inventory", type_="foreignkey")
+    op.create_foreign_key(
+        "inventory_rental_id_fkey",
+        "inventory",
+        "rentals",
+        ["rental_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    # Returns were not recorded: rentals that already ended count as returned
+    op.execute(
+        "UPDATE rentals SET returned_on = end_date WHERE end_date < CURRENT_DATE"
+    )
+    op.execute("""
+        UPDATE inventory
+        SET rented_quantity = COALESCE(s.rented, 0),
+            rental_status = COALESCE(s.rented, 0) >= inventory.quantity,
+            rental_id = s.rental_id
+        FROM (
+            SELECT inventory.id, SUM(rentals.quantity) AS rented,
+                MAX(rentals.id) AS rental_id
+            FROM inventory
+            LEFT JOIN rentals ON rentals.item_id = inventory.id
+                AND rentals.returned_on IS NULL
+                AND rentals.start_date <= CURRENT_DATE
+            GROUP BY inventory.id
+        ) AS s
+        WHERE inventory.id = s.id
+        """)
+    op.create_index(
+        "ix_rentals_open_start_date",
+        "rentals",
+        ["start_date"],
+        unique=False,
+        postgresql_where=sa.text("returned_on IS NULL"),
+    )
+    op.create_index(
+        "ix_rentals_open_end_date",
+        "rentals",
+        ["end_date"],
+        unique=False,
+        postgresql_where=sa.text("returned_on IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_rentals_open_end_date",
+        table_name="rentals",
+        postgresql_where=sa.text("returned_on IS NULL"),
+    )
+    op.drop_index(
+        "ix_rentals_open_start_date",
+        table_name="rentals",
+        postgresql_where=sa.text("returned_on IS NULL"),
+    )
+    op.drop_constraint("inventory_rental_id_fkey", "inventory", type_="foreignkey")
+    op.create_foreign_key(
+        "inventory_rental_id_fkey", "inventory", "rentals", ["rental_id"], ["id"]
+    )
+    op.drop_column("inventory", "rented_quantity")
+    op.drop_column("rentals", "overdue")
+    op.drop_column("rentals", "returned_on")
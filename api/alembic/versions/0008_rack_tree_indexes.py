@@ -0,0 +1,31 @@
+"""rack tree indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 14:06:38.571924
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_shelves_rack_id"), "shelves", ["rack_id"], unique=False)
+    op.create_index(
+        op.f("ix_machines_shelf_id"), "machines", ["shelf_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_machines_shelf_id"), table_name="machines")
+    op.drop_index(op.f("ix_shelves_rack_id"), table_name="shelves")
@@ -0,0 +1,75 @@
+"""search indexes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 18:42:10.316508
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _document(*columns: str) -> str:
+    """
+    Searched text of a row, see app.db.models.search_document.
+    :param columns: Searched columns
+    :return: SQL expression
+    """
+    document = f"coalesce({columns[0]}, '')"
+    for column in columns[1:]:
+        document = f"textcat(textcat({document}, ' '), coalesce({column}, ''))"
+    return document
+
+
+SEARCH_DOCUMENTS = {
+    "machines": _document("name", "ip_address", "mac_address", "serial_number"),
+    "inventory": _document("name"),
+    "racks": _document("name"),
+    "rooms": _document("name"),
+    "user": _document("name", "surname", "login"),
+    "documentation": _document("title", "content"),
+}
+# Text matched by similarity, documentation content is too long for it
+TRIGRAM_DOCUMENTS = SEARCH_DOCUMENTS | {"documentation": _document("title")}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, document in SEARCH_DOCUMENTS.items():
+        op.create_index(
+            f"ix_{table}_search",
+            table,
+            [sa.text(f"to_tsvector('simple'::regconfig, {document})")],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+    # Fuzzy matching needs the pg_trgm extension, shipped with the official
+    # Postgres images but not with every server. Search works without it.
+    available = op.get_bind().scalar(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    )
+    if not available:
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, document in TRIGRAM_DOCUMENTS.items():
+        op.execute(
+            f'CREATE INDEX ix_trgm_{table} ON "{table}" '
+            f"USING gin (({document}) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(list(SEARCH_DOCUMENTS)):
+        op.execute(f"DROP INDEX IF EXISTS ix_trgm_{table}")
+        op.drop_index(f"ix_{table}_search", table_name=table, postgresql_using="gin")
@@ -0,0 +1,49 @@
+"""tag link indexes
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 20:15:47.902113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Association tables between tags and entities, and their entity column
+TAG_LINKS = {
+    "tags_rooms": "room_id",
+    "tags_documentation": "documentation_id",
+    "tags_racks": "rack_id",
+    "tags_machines": "machine_id",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in TAG_LINKS.items():
+        # Keep the first of duplicated links, the unique index forbids them
+        op.execute(
+            f"DELETE FROM {table} a USING {table} b "
+            f"WHERE a.{column} = b.{column} AND a.tag_id = b.tag_id AND a.id > b.id"
+        )
+        op.create_index(
+            op.f(f"ix_{table}_{column}_tag_id"),
+            table,
+            [column, "tag_id"],
+            unique=True,
+        )
+        op.create_index(op.f(f"ix_{table}_tag_id"), table, ["tag_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(TAG_LINKS.items()):
+        op.drop_index(op.f(f"ix_{table}_tag_id"), table_name=table)
+        op.drop_index(op.f(f"ix_{table}_{column}_tag_id"), table_name=table)
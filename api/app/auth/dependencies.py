@@ -1,8 +1,9 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from app.auth.auth_config import fastapi_users
 from sqlalchemy.orm import Query, Session
 from app.db.models import User, UserType, UsersTeams
-from app.database import get_db
+from app.database import DB_READ_REPLICA_URL, get_db, get_replica_db
+from app.utils.redis_service import has_recent_write
 
 current_active_user = fastapi_users.current_user(active=True)
 
@@ -10,11 +11,17 @@ current_active_user = fastapi_users.current_user(active=True)
 class RequestContext:
     def __init__(
         self,
+        request: Request,
         current_user: User = Depends(current_active_user),
         db: Session = Depends(get_db),
     ):
         self.db = db
+        # Read by ReadYourWritesMiddleware to pin this user to the primary
+        request.state.user_id = current_user.id
         self._setup(current_user)
+        # Return the primary connection to the pool right away, handlers that
+        # read from the replica would otherwise hold it for the whole request
+        self.db.rollback()
 
     def _setup(self, current_user: User):
         self.current_user = current_user
@@ -69,3 +76,25 @@ class RequestContext:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Access denied."
             )
+
+
+async def _reads_from_primary(
+    current_user: User = Depends(current_active_user),
+) -> bool:
+    """
+    Decide whether a read must go to the primary database.
+    :param current_user: Authenticated user
+    :return: True without a replica or after a recent write of the user
+    """
+    if not DB_READ_REPLICA_URL:
+        return True
+    return await has_recent_write(current_user.id)
+
+
+def get_read_db(use_primary: bool = Depends(_reads_from_primary)):
+    """
+    Database session for read only GET handlers. Uses the read replica unless
+    the current user has written within the stickiness window.
+    :param use_primary: Resolved by _reads_from_primary
+    """
+    yield from get_replica_db(use_primary)
@@ -7,7 +7,13 @@ from fastapi.params import Depends
 from fastapi_users import BaseUserManager, IntegerIDMixin, exceptions
 from app.db.models import User
 from app.database import get_user_db
+from app.utils.security import (
+    hash_password_async,
+    password_helper,
+    verify_and_update_password_async,
+)
 from sqlalchemy import select
+from sqlalchemy.orm.exc import StaleDataError
 
 load_dotenv(".env/api.env")
 AUTH_SECRET = os.getenv("AUTH_SECRET")
@@ -33,20 +39,30 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
 
     async def authenticate(self, credentials):
         """Authenticate a user with given credentials.
+        Hashing runs in the bounded hashing threadpool, outdated hashes are
+        replaced with one of the configured scheme and cost.
         :param credentials: The credentials to authenticate.
         :return: The authenticated User instance or None if authentication fails.
         """
         try:
             user = await self.get_by_login(credentials.username)
         except exceptions.UserNotExists:
-            self.password_helper.hash(credentials.password)
+            # Hash anyway, so unknown logins take as long as wrong passwords
+            await hash_password_async(credentials.password)
             return None
 
-        verified, _ = self.password_helper.verify_and_update(
+        verified, updated_hash = await verify_and_update_password_async(
             credentials.password, user.hashed_password
         )
         if not verified or not user.is_active:
             return None
+        if updated_hash is not None:
+            try:
+                await self.user_db.update(user, {"hashed_password": updated_hash})
+            except StaleDataError:
+                # A concurrent login of the same user already rehashed it
+                await self.user_db.session.rollback()
+                await self.user_db.session.refresh(user)
 
         return user
 
@@ -56,4 +72,4 @@ async def get_user_manager(user_db=Depends(get_user_db)):
     :param user_db: Database dependency instance.
     :return: UserManager instance.
     """
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
@@ -1,15 +1,21 @@
 """Main application entry point for the database server."""
 
+import functools
 import os
+import uuid
 
+from anyio import CapacityLimiter, to_thread
 from fastapi import Depends
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from fastapi_users_db_sqlalchemy.access_token import SQLAlchemyAccessTokenDatabase
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 from app.db.models import User, AccessToken
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_status
+from app.utils.metrics_service import instrument_engine
 
 # pylint: disable=unused-import
 import app.db.listeners
@@ -22,15 +28,170 @@ DB_HOST = os.getenv("DB_HOST", "db")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_URL = os.getenv("DATABASE_URL", "url")
 
+# "session" keeps long-lived client pools against Postgres. "transaction" is for
+# running behind a transaction-mode pooler (PgBouncer): no client side pooling,
+# no named prepared statements and no session-scoped server settings.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "session").lower()
+if DB_POOL_MODE not in ("session", "transaction"):
+    raise ValueError("DB_POOL_MODE must be 'session' or 'transaction'")
 
-# ---- ASYNC ENGINE (LOGINS, USERS, TOKENS)
-async_engine = create_async_engine(
-    DB_URL.replace("postgresql+psycopg2", "postgresql+asyncpg"),
-    pool_pre_ping=True,
-    pool_size=50,
-    max_overflow=60,
-    pool_timeout=1800,
+# Pool sizing is per engine and per worker process: the total number of
+# Postgres connections is workers * (pool_size + max_overflow) for each engine.
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", "10"))
+DB_SYNC_MAX_OVERFLOW = int(os.getenv("DB_SYNC_MAX_OVERFLOW", "5"))
+DB_SYNC_POOL_TIMEOUT = int(os.getenv("DB_SYNC_POOL_TIMEOUT", "30"))
+DB_SYNC_POOL_RECYCLE = int(os.getenv("DB_SYNC_POOL_RECYCLE", "1800"))
+DB_SYNC_POOL_PRE_PING = os.getenv("DB_SYNC_POOL_PRE_PING", "true").lower() == "true"
+
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "5"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "5"))
+DB_ASYNC_POOL_TIMEOUT = int(os.getenv("DB_ASYNC_POOL_TIMEOUT", "30"))
+DB_ASYNC_POOL_RECYCLE = int(os.getenv("DB_ASYNC_POOL_RECYCLE", "1800"))
+DB_ASYNC_POOL_PRE_PING = os.getenv("DB_ASYNC_POOL_PRE_PING", "true").lower() == "true"
+
+# Server side timeouts in milliseconds, 0 disables the timeout.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(
+    os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "60000")
 )
+
+# Optional streaming replica for heavy GET endpoints. After a mutation the same
+# user keeps reading from the primary for DB_READ_STICKY_SECONDS.
+DB_READ_REPLICA_URL = os.getenv("DB_READ_REPLICA_URL", "")
+DB_READ_STICKY_SECONDS = int(os.getenv("DB_READ_STICKY_SECONDS", "5"))
+
+# Worker threads available to async handlers for blocking ORM work. Matches the
+# sync pool by default so threads never queue on a pool checkout.
+DB_THREADPOOL_SIZE = int(
+    os.getenv("DB_THREADPOOL_SIZE", str(DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW))
+)
+db_threadpool_limiter = CapacityLimiter(DB_THREADPOOL_SIZE)
+
+
+def get_server_settings():
+    """
+    Build Postgres session settings applied to every new connection.
+    :return: Dictionary of setting name to value
+    """
+    settings = {}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+    if DB_IDLE_IN_TRANSACTION_TIMEOUT_MS > 0:
+        settings["idle_in_transaction_session_timeout"] = str(
+            DB_IDLE_IN_TRANSACTION_TIMEOUT_MS
+        )
+    return settings
+
+
+def get_psycopg2_connect_args(pool_mode: str = DB_POOL_MODE):
+    """
+    Connection arguments for psycopg2, settings are passed as libpq options.
+    :param pool_mode: "session" or "transaction"
+    :return: Dictionary of connect arguments
+    """
+    settings = get_server_settings()
+    if not settings or pool_mode == "transaction":
+        return {}
+    return {"options": " ".join(f"-c {k}={v}" for k, v in settings.items())}
+
+
+def get_asyncpg_connect_args(pool_mode: str = DB_POOL_MODE):
+    """
+    Connection arguments for asyncpg, settings are passed as server_settings.
+    In transaction mode prepared statements are not cached and get unique names,
+    since consecutive transactions may land on different server connections.
+    :param pool_mode: "session" or "transaction"
+    :return: Dictionary of connect arguments
+    """
+    if pool_mode == "transaction":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    settings = get_server_settings()
+    if not settings:
+        return {}
+    return {"server_settings": settings}
+
+
+def apply_transaction_settings(engine):
+    """
+    Apply server settings transaction-locally at the start of every transaction.
+    Used in transaction mode, where startup parameters are rejected by the
+    pooler and plain SET would leak into other clients' transactions.
+    :param engine: Sync engine (or async_engine.sync_engine)
+    """
+    settings = get_server_settings()
+    if not settings:
+        return
+
+    # set_config(..., true) is SET LOCAL in a single statement, asyncpg cannot
+    # prepare multiple commands at once.
+    statement = "SELECT " + ", ".join(
+        f"set_config('{k}', '{v}', true)" for k, v in settings.items()
+    )
+
+    @event.listens_for(engine, "begin")
+    def _set_local(conn):
+        conn.exec_driver_sql(statement)
+
+
+def create_async_db_engine(url: str = DB_URL, pool_mode: str = DB_POOL_MODE):
+    """
+    Create the asyncpg engine for the given pool mode.
+    :param url: Database URL (psycopg2 URLs are converted to asyncpg)
+    :param pool_mode: "session" or "transaction"
+    :return: AsyncEngine
+    """
+    url = url.replace("postgresql+psycopg2", "postgresql+asyncpg")
+    if pool_mode == "transaction":
+        engine = create_async_engine(
+            url, poolclass=NullPool, connect_args=get_asyncpg_connect_args(pool_mode)
+        )
+        apply_transaction_settings(engine.sync_engine)
+    else:
+        engine = create_async_engine(
+            url,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_pre_ping=DB_ASYNC_POOL_PRE_PING,
+            pool_size=DB_ASYNC_POOL_SIZE,
+            max_overflow=DB_ASYNC_MAX_OVERFLOW,
+            pool_timeout=DB_ASYNC_POOL_TIMEOUT,
+            pool_recycle=DB_ASYNC_POOL_RECYCLE,
+            connect_args=get_asyncpg_connect_args(pool_mode),
+        )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def create_sync_db_engine(url: str = DB_URL, pool_mode: str = DB_POOL_MODE):
+    """
+    Create the psycopg2 engine for the given pool mode.
+    :param url: Database URL
+    :param pool_mode: "session" or "transaction"
+    :return: Engine
+    """
+    if pool_mode == "transaction":
+        engine = create_engine(url, poolclass=NullPool)
+        apply_transaction_settings(engine)
+    else:
+        engine = create_engine(
+            url,
+            poolclass=TimedQueuePool,
+            pool_pre_ping=DB_SYNC_POOL_PRE_PING,
+            pool_size=DB_SYNC_POOL_SIZE,
+            max_overflow=DB_SYNC_MAX_OVERFLOW,
+            pool_timeout=DB_SYNC_POOL_TIMEOUT,
+            pool_recycle=DB_SYNC_POOL_RECYCLE,
+            connect_args=get_psycopg2_connect_args(pool_mode),
+        )
+    instrument_engine(engine)
+    return engine
+
+
+# ---- ASYNC ENGINE (LOGINS, USERS, TOKENS)
+async_engine = create_async_db_engine()
 AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -40,11 +201,50 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 # ---- SYNC ENGINE (COMMON DB OPERATIONS)
-sync_engine = create_engine(
-    DB_URL, pool_pre_ping=True, pool_size=50, max_overflow=60, pool_timeout=1800
-)
+# Session.info (e.g. the "user_id" used by history listeners) is client side
+# state of the ORM session and never touches the server connection, so it is
+# safe in both pool modes.
+sync_engine = create_sync_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 
+# ---- READ REPLICA (OPTIONAL, READ ONLY GET ENDPOINTS)
+replica_engine = (
+    create_sync_db_engine(DB_READ_REPLICA_URL) if DB_READ_REPLICA_URL else None
+)
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None
+    else None
+)
+
+
+def get_pool_status():
+    """
+    Collect connection pool usage for both engines.
+    :return: Dictionary with pool status per engine
+    """
+    status = {
+        "sync": pool_status(sync_engine.pool),
+        "async": pool_status(async_engine.sync_engine.pool),
+    }
+    if replica_engine is not None:
+        status["replica"] = pool_status(replica_engine.pool)
+    return status
+
+
+async def run_in_db_threadpool(func, *args, **kwargs):
+    """
+    Run blocking sync-session work in a worker thread so the event loop keeps
+    serving other requests and websockets while the query is in flight.
+    :param func: Callable doing the database work
+    :param args: Positional arguments for func
+    :param kwargs: Keyword arguments for func
+    :return: Return value of func
+    """
+    return await to_thread.run_sync(
+        functools.partial(func, *args, **kwargs), limiter=db_threadpool_limiter
+    )
+
 
 def get_db():
     """
@@ -58,6 +258,23 @@ def get_db():
         db.close()
 
 
+def get_replica_db(use_primary: bool = False):
+    """
+    Dependency generator that yields a session for read only queries.
+    Falls back to the primary when no replica is configured or when the caller
+    needs to read its own recent writes.
+    :param use_primary: Force the primary database
+    """
+    if ReplicaSessionLocal is None or use_primary:
+        db = SessionLocal()
+    else:
+        db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 async def get_async_db():
     """
     Dependency generator that yields an asynchronous database session.
@@ -0,0 +1,115 @@
+"""
+Bring the database schema to the latest committed Alembic revision.
+Run at container start with: python -m app.db.migrate
+"""
+
+import os
+import sys
+
+from alembic import command  # pylint: disable=import-error
+from alembic.config import Config  # pylint: disable=import-error
+from alembic.runtime.migration import (  # pylint: disable=import-error
+    MigrationContext,
+)
+from alembic.script import ScriptDirectory  # pylint: disable=import-error
+from alembic.util import CommandError  # pylint: disable=import-error
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+load_dotenv(".env/api.env")
+
+# Revision describing the schema created by the old per-boot autogenerate
+BASELINE_REVISION = "0001"
+# Key of the Postgres advisory lock serialising migrations across containers
+MIGRATION_LOCK_ID = 7265001
+# Prefix of the indexes created only where their extension is available
+TRIGRAM_INDEX_PREFIX = "ix_trgm_"
+
+
+def get_alembic_config() -> Config:
+    """
+    Alembic configuration of the API.
+    :return: Alembic Config
+    """
+    return Config(os.getenv("ALEMBIC_CONFIG", "alembic.ini"))
+
+
+def include_name(name, type_, parent_names) -> bool:  # pylint: disable=unused-argument
+    """
+    Alembic autogenerate filter: skip the trigram indexes, which depend on
+    the pg_trgm extension and so are not part of the models.
+    :param name: Name of the schema object
+    :param type_: Kind of the object, e.g. "index"
+    :param parent_names: Names of the objects containing it
+    :return: False for objects left out of the comparison
+    """
+    return not (type_ == "index" and name.startswith(TRIGRAM_INDEX_PREFIX))
+
+
+def get_current_revision(conn, script: ScriptDirectory):
+    """
+    Revision the database is stamped with.
+    :param conn: SQLAlchemy connection
+    :param script: Alembic script directory
+    :return: Revision ID, None for an unversioned database and "unknown" for a
+        revision missing from the committed migrations
+    """
+    current = MigrationContext.configure(conn).get_current_revision()
+    if current is None:
+        return None
+    try:
+        script.get_revision(current)
+    except CommandError:
+        return "unknown"
+    return current
+
+
+def migrate(database_url: str, config: Config) -> str:
+    """
+    Upgrade the database to head. Returns right after one query when it is
+    already current, so restarts do not depend on the schema size.
+    Databases created before migrations were committed (unversioned or stamped
+    with a generated revision) are stamped with the baseline first.
+    :param database_url: Database URL, must not point at a transaction pooler
+    :param config: Alembic Config
+    :return: "current", "upgraded" or "stamped and upgraded"
+    """
+    # Alembic commands below connect through env.py, which reads this option
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    script = ScriptDirectory.from_config(config)
+    head = script.get_current_head()
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            if get_current_revision(conn, script) == head:
+                return "current"
+
+            conn.execute(
+                text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+            try:
+                # Another container may have migrated while we were waiting
+                current = get_current_revision(conn, script)
+                if current == head:
+                    return "current"
+                result = "upgraded"
+                if current in (None, "unknown") and inspect(conn).has_table("user"):
+                    command.stamp(config, BASELINE_REVISION, purge=True)
+                    result = "stamped and upgraded"
+                command.upgrade(config, "head")
+                return result
+            finally:
+                conn.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID}
+                )
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        sys.exit("ERROR: DATABASE_URL is not set.")
+    print(f"Database schema: {migrate(url, get_alembic_config())}")
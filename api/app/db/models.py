@@ -9,9 +9,12 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     func,
+    literal_column,
+    text,
     UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import JSONB
@@ -22,6 +25,33 @@ from fastapi_users_db_sqlalchemy.access_token import SQLAlchemyBaseAccessTokenTa
 Base = declarative_base()
 
 
+def search_document(*columns):
+    """
+    Searchable text of a row: its columns separated by spaces, NULL as empty.
+    Immutable, so it can be indexed; searches must use the same expression to
+    use the index.
+    :param columns: Searched columns
+    :return: Text expression
+    """
+    document = func.coalesce(columns[0], "")
+    for column in columns[1:]:
+        # textcat is ||, nested calls print like Postgres prints the index
+        document = func.textcat(func.textcat(document, " "), func.coalesce(column, ""))
+    return document
+
+
+def search_vector(*columns):
+    """
+    Full-text search vector of a row, split into words without stemming so
+    names, addresses and serial numbers match as typed.
+    :param columns: Searched columns
+    :return: tsvector expression
+    """
+    return func.to_tsvector(
+        literal_column("'simple'::regconfig"), search_document(*columns)
+    )
+
+
 # pylint: disable=too-many-ancestors
 # pylint: disable=too-few-public-methods
 
@@ -109,6 +139,10 @@ class Rack(Base):
     shelves = relationship("Shelf", back_populates="rack", cascade="all, delete-orphan")
     tags = relationship("Tags", secondary="tags_racks", back_populates="racks")
 
+    __table_args__ = (
+        Index("ix_racks_search", search_vector(name), postgresql_using="gin"),
+    )
+
 
 class Shelf(Base):
     """
@@ -119,7 +153,7 @@ class Shelf(Base):
 
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False, unique=True)
-    rack_id = Column(Integer, ForeignKey("racks.id"), nullable=False)
+    rack_id = Column(Integer, ForeignKey("racks.id"), nullable=False, index=True)
     order = Column(Integer, nullable=False)
 
     version_id = Column(Integer, nullable=False, default=1)
@@ -144,7 +178,10 @@ class Rooms(Base):
 
     __mapper_args__ = {"version_id_col": version_id}
 
-    __table_args__ = (UniqueConstraint("name", "team_id", name="_room_team_uc"),)
+    __table_args__ = (
+        UniqueConstraint("name", "team_id", name="_room_team_uc"),
+        Index("ix_rooms_search", search_vector(name), postgresql_using="gin"),
+    )
 
     layouts = relationship("Layouts", back_populates="room")
     machines = relationship("Machines", back_populates="room")
@@ -203,13 +240,18 @@ class Machines(Base):
     added_on = Column(DateTime, nullable=False, default=datetime.now)
     ram = Column(String(100), nullable=True)
     metadata_id = Column(Integer, ForeignKey("metadata.id"), nullable=False)
-    shelf_id = Column(Integer, ForeignKey("shelves.id"), nullable=True)
+    shelf_id = Column(Integer, ForeignKey("shelves.id"), nullable=True, index=True)
     version_id = Column(Integer, nullable=False, default=1)
 
     __mapper_args__ = {"version_id_col": version_id}
 
     __table_args__ = (
         UniqueConstraint("name", "localization_id", name="_machine_room_uc"),
+        Index(
+            "ix_machines_search",
+            search_vector(name, ip_address, mac_address, serial_number),
+            postgresql_using="gin",
+        ),
     )
 
     room = relationship("Rooms", back_populates="machines")
@@ -293,7 +335,14 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         default=UserType.USER,
     )
     force_password_change = Column(Boolean, nullable=False, default=False)
-    __table_args__ = {"schema": None}
+    __table_args__ = (
+        Index(
+            "ix_user_search",
+            search_vector(name, surname, login),
+            postgresql_using="gin",
+        ),
+        {"schema": None},
+    )
 
     version_id = Column(Integer, nullable=False, default=1)
 
@@ -330,7 +379,31 @@ class Rentals(Base):
     end_date = Column(Date, nullable=False)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
-    __table_args__ = {"schema": None}
+    returned_on = Column(Date, nullable=True)
+    # Set once the overdue notification of the rental has been queued
+    overdue = Column(Boolean, nullable=False, default=False)
+    # Rentals of an item: item_id = ? [AND end_date >= ?].
+    # Rentals overlapping a period: daterange(start_date, end_date) && ?
+    # Rentals not returned yet, scanned by the rental sweeper
+    __table_args__ = (
+        Index("ix_rentals_item_id_end_date", "item_id", "end_date"),
+        Index(
+            "ix_rentals_open_start_date",
+            "start_date",
+            postgresql_where=returned_on.is_(None),
+        ),
+        Index(
+            "ix_rentals_open_end_date",
+            "end_date",
+            postgresql_where=returned_on.is_(None),
+        ),
+        Index(
+            "ix_rentals_period",
+            func.daterange(start_date, end_date, text("'[]'")),
+            postgresql_using="gist",
+        ),
+        {"schema": None},
+    )
 
     version_id = Column(Integer, nullable=False, default=1)
 
@@ -357,8 +430,12 @@ class Inventory(Base):
     localization_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
     machine_id = Column(Integer, ForeignKey("machines.id"), nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    # Kept up to date by the rental writes and the rental sweeper
     rental_status = Column(Boolean, nullable=False, default=False)
-    rental_id = Column(Integer, ForeignKey("rentals.id"), nullable=True)
+    rental_id = Column(
+        Integer, ForeignKey("rentals.id", ondelete="SET NULL"), nullable=True
+    )
+    rented_quantity = Column(Integer, nullable=False, default=0)
 
     version_id = Column(Integer, nullable=False, default=1)
 
@@ -375,6 +452,26 @@ class Inventory(Base):
 
     category = relationship("Categories", back_populates="inventory")
 
+    __table_args__ = (
+        Index("ix_inventory_search", search_vector(name), postgresql_using="gin"),
+    )
+
+
+class InventoryReservation(Base):
+    """
+    InventoryReservation model holding the quantity of an item reserved by
+    rentals on each day. It is kept in step with the rentals, so stock checks
+    read a few rows instead of summing the rental history.
+    """
+
+    __tablename__ = "inventory_reservations"
+
+    item_id = Column(
+        Integer, ForeignKey("inventory.id", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    quantity = Column(Integer, nullable=False)
+
 
 class Categories(Base):
     """
@@ -415,6 +512,7 @@ class History(Base):
     timestamp = Column(
         DateTime(timezone=True),
         server_default=func.now(),  # pylint: disable=not-callable
+        index=True,
     )
     before_state = Column(JSONB)
     after_state = Column(JSONB)
@@ -470,6 +568,14 @@ class Documentation(Base):
         "Tags", secondary="tags_documentation", back_populates="documentation"
     )
 
+    __table_args__ = (
+        Index(
+            "ix_documentation_search",
+            search_vector(title, content),
+            postgresql_using="gin",
+        ),
+    )
+
 
 class TagsRooms(Base):
     """
@@ -480,7 +586,11 @@ class TagsRooms(Base):
 
     id = Column(Integer, primary_key=True)
     room_id = Column(Integer, ForeignKey("rooms.id"))
-    tag_id = Column(Integer, ForeignKey("tags.id"))
+    tag_id = Column(Integer, ForeignKey("tags.id"), index=True)
+
+    __table_args__ = (
+        Index("ix_tags_rooms_room_id_tag_id", "room_id", "tag_id", unique=True),
+    )
 
 
 class TagsDocumentation(Base):
@@ -492,7 +602,16 @@ class TagsDocumentation(Base):
 
     id = Column(Integer, primary_key=True)
     documentation_id = Column(Integer, ForeignKey("documentation.id"))
-    tag_id = Column(Integer, ForeignKey("tags.id"))
+    tag_id = Column(Integer, ForeignKey("tags.id"), index=True)
+
+    __table_args__ = (
+        Index(
+            "ix_tags_documentation_documentation_id_tag_id",
+            "documentation_id",
+            "tag_id",
+            unique=True,
+        ),
+    )
 
 
 class TagsRacks(Base):
@@ -504,7 +623,11 @@ class TagsRacks(Base):
 
     id = Column(Integer, primary_key=True)
     rack_id = Column(Integer, ForeignKey("racks.id"))
-    tag_id = Column(Integer, ForeignKey("tags.id"))
+    tag_id = Column(Integer, ForeignKey("tags.id"), index=True)
+
+    __table_args__ = (
+        Index("ix_tags_racks_rack_id_tag_id", "rack_id", "tag_id", unique=True),
+    )
 
 
 class TagsMachines(Base):
@@ -515,7 +638,13 @@ class TagsMachines(Base):
     __tablename__ = "tags_machines"
     id = Column(Integer, primary_key=True)
     machine_id = Column(Integer, ForeignKey("machines.id"))
-    tag_id = Column(Integer, ForeignKey("tags.id"))
+    tag_id = Column(Integer, ForeignKey("tags.id"), index=True)
+
+    __table_args__ = (
+        Index(
+            "ix_tags_machines_machine_id_tag_id", "machine_id", "tag_id", unique=True
+        ),
+    )
 
 
 class UsersTeams(Base):
@@ -532,3 +661,16 @@ class UsersTeams(Base):
 
     user = relationship("User", back_populates="teams")
     team = relationship("Teams", back_populates="users")
+
+
+class BootstrapState(Base):
+    """
+    BootstrapState model recording which version of the seed data (service
+    team and account, virtual lab, documentation) a database has received.
+    """
+
+    __tablename__ = "bootstrap_state"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
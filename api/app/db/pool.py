@@ -0,0 +1,101 @@
+"""Connection pool classes that record checkout telemetry."""
+
+import time
+from threading import Lock
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """
+    Counters describing how long requests waited for a pooled connection.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        """
+        Record a single checkout attempt.
+        :param waited: Seconds spent waiting for a connection
+        :param timed_out: True if the checkout failed with a pool timeout
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self):
+        """
+        Return counters as a plain dictionary.
+        :return: Dictionary with checkout counters
+        """
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class TimedPoolMixin:
+    """
+    Mixin measuring the time spent in QueuePool._do_get (waiting for a free slot).
+    """
+
+    @property
+    def stats(self) -> PoolStats:
+        """Lazily created stats object, survives only as long as the pool itself."""
+        if "_labbyn_stats" not in self.__dict__:
+            self.__dict__["_labbyn_stats"] = PoolStats()
+        return self.__dict__["_labbyn_stats"]
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    """QueuePool used by the sync (psycopg2) engine."""
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool used by the async (asyncpg) engine."""
+
+
+def pool_status(pool) -> dict:
+    """
+    Describe the current state of a connection pool.
+    :param pool: SQLAlchemy pool instance
+    :return: Dictionary with pool size, usage and checkout telemetry
+    """
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,  # pylint: disable=protected-access
+                "pool_timeout": pool.timeout(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+    if isinstance(pool, TimedPoolMixin):
+        status.update(pool.stats.snapshot())
+    return status
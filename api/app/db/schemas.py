@@ -99,6 +99,28 @@ class TagsAssignment(BaseModel):
     entity_type: str
 
 
+class TagsBulkAssignment(BaseModel):
+    """Used for assigning or detaching several tags on several entities of one type."""
+
+    tag_ids: List[int] = Field(..., min_length=1, max_length=100)
+    entity_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    entity_type: str
+
+
+class TagsBulkResponse(BaseModel):
+    """Number of tag links created or removed by a bulk assignment."""
+
+    changed: int
+
+
+class TagFacetResponse(TagsBase):
+    """Tag with the number of entities of each type carrying it."""
+
+    id: int
+    total: int
+    counts: Dict[str, int]
+
+
 # ==========================
 #          LAYOUT
 # ==========================
@@ -576,6 +598,36 @@ class UserCreatedResponse(UserResponse):
     )
 
 
+class BulkRowResult(BaseModel):
+    """
+    Outcome of one row of a bulk request.
+    """
+
+    row: int = Field(..., description="Row number in the request, starting at 1")
+    status: str = Field(..., description="created or error")
+    id: Optional[int] = None
+    detail: Optional[str] = Field(None, description="Reason the row was rejected")
+
+
+class UserBulkResult(BulkRowResult):
+    """
+    Outcome of one user of a bulk import, with the generated password.
+    """
+
+    login: Optional[str] = None
+    generated_password: Optional[str] = None
+
+
+class UsersBulkResponse(BaseModel):
+    """
+    Summary and per-row results of a bulk user import.
+    """
+
+    created: int
+    failed: int
+    results: List[UserBulkResult]
+
+
 class UserGroupInfo(BaseModel):
     """
     Model representing a simplified group/team information.
@@ -818,6 +870,31 @@ class MachinesUpdate(BaseModel):
     metadata_id: Optional[int] = None
 
 
+class MachinesBatchUpdate(BaseModel):
+    """
+    Schema for applying the same change to many machines. Only the fields
+    that are sent are changed; shelf_id null unmounts the machines.
+    """
+
+    machine_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    team_id: Optional[int] = Field(None, description="New owning team")
+    localization_id: Optional[int] = Field(None, description="New room")
+    shelf_id: Optional[int] = Field(
+        None, description="Shelf to mount on, moves the machines to its room"
+    )
+    add_tag_ids: List[int] = Field(default=[], description="Tags to attach")
+    remove_tag_ids: List[int] = Field(default=[], description="Tags to detach")
+
+
+class MachinesBatchUpdateResponse(BaseModel):
+    """
+    Result of a batch machine update.
+    """
+
+    updated: int
+    machine_ids: List[int]
+
+
 class MachinesResponse(MachinesBase):
     """
     Schema for reading Machine data.
@@ -831,6 +908,53 @@ class MachinesResponse(MachinesBase):
     disks: List[DiskResponse]
 
 
+class MachineBulkRow(BaseModel):
+    """
+    One machine of a bulk import or export, with its metadata flags, hardware
+    and tags inlined so a row maps to one CSV line.
+    """
+
+    name: str = Field(..., max_length=100, description="Unique machine name/hostname")
+    localization_id: int = Field(
+        ..., description="ID of the room where machine is located"
+    )
+    mac_address: Optional[str] = Field(None, max_length=17)
+    ip_address: Optional[str] = Field(None, max_length=15)
+    pdu_port: Optional[int] = None
+    team_id: Optional[int] = None
+    os: Optional[str] = Field(None, max_length=30)
+    serial_number: Optional[str] = Field(None, max_length=50)
+    note: Optional[str] = Field(None, max_length=500)
+    ram: Optional[str] = Field(None, max_length=100)
+    shelf_id: Optional[int] = None
+    cpus: List[str] = Field(default=[], description="CPU names")
+    disks: List[str] = Field(
+        default=[], description="Disks as 'name' or 'name:capacity'"
+    )
+    tags: List[str] = Field(default=[], description="Names of existing tags")
+    agent_prometheus: bool = False
+    ansible_access: bool = False
+    ansible_root_access: bool = False
+
+
+class MachineBulkResult(BulkRowResult):
+    """
+    Outcome of one machine of a bulk import.
+    """
+
+    name: Optional[str] = None
+
+
+class MachinesBulkResponse(BaseModel):
+    """
+    Summary and per-row results of a bulk machine import.
+    """
+
+    created: int
+    failed: int
+    results: List[MachineBulkResult]
+
+
 class MachineInRackResponse(BaseModel):
     """
     Schema for reading Machine data within a Rack context.
@@ -927,6 +1051,12 @@ class RentalsResponse(RentalsBase):
     """
 
     id: int
+    returned_on: Optional[date] = Field(
+        None, description="Day the rental was fully returned"
+    )
+    overdue: bool = Field(
+        False, description="True if the rental was not returned by its end date"
+    )
     version_id: int
     model_config = ConfigDict(from_attributes=True)
 
@@ -967,7 +1097,9 @@ class InventoryBase(BaseModel):
         None, description="ID of the machine if item is part of one"
     )
     category_id: int = Field(..., description="ID of the item category")
-    rental_status: bool = Field(False, description="True if item is currently rented")
+    rental_status: bool = Field(
+        False, description="True if every unit of the item is currently rented"
+    )
     rental_id: Optional[int] = Field(
         None, description="ID of the current active rental"
     )
@@ -998,6 +1130,7 @@ class InventoryResponse(InventoryBase):
     """
 
     id: int
+    rented_quantity: int = Field(0, description="Units currently rented")
     version_id: int
     model_config = ConfigDict(from_attributes=True)
 
@@ -1086,6 +1219,34 @@ class DashboardResponse(BaseModel):
     sections: List[DashboardSection]
 
 
+# ==========================
+#       SEARCH MODELS
+# ==========================
+
+
+class SearchResult(BaseModel):
+    """
+    Schema for one entity found by the search.
+    """
+
+    type: str = Field(..., description="Entity type, e.g. machine or room")
+    id: int
+    name: str
+    location: str = Field(..., description="Page of the entity")
+    rank: float = Field(..., description="Relevance, higher first")
+
+
+class SearchResponse(BaseModel):
+    """
+    Schema for one page of search results, best matches first.
+    """
+
+    total: int = Field(..., description="Number of matches over all pages")
+    limit: int
+    offset: int
+    items: List[SearchResult]
+
+
 # ==========================
 #       EXTRA MODELS
 # ==========================
@@ -1280,6 +1441,17 @@ class RackResponse(RackBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RoomSnapshotResponse(BaseModel):
+    """
+    Schema for the floor plan snapshot of a room: the room, the coordinates
+    of its racks, and its racks with their shelves and machines.
+    """
+
+    room: RoomsResponse
+    layouts: List[LayoutResponse] = []
+    racks: List[RackResponse] = []
+
+
 class RackWithOrderedMachinesResponse(RackBase):
     id: int = Field(..., description="Unique identifier of the rack")
     team_name: Optional[str]
@@ -1,10 +1,15 @@
 """Main application entry point for the FastAPI server."""
 
 import asyncio
+import logging
 import os
+import time
 from contextlib import asynccontextmanager
 
-import fastapi_users
+# Start of the import phase reported by /metrics/startup
+IMPORTS_STARTED = time.perf_counter()
+
+# pylint: disable=wrong-import-position
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -30,10 +35,20 @@ from app.routers import (
     subpage_history_router,
     database_cpus_router,
     database_disks_router,
+    metrics_router,
+    search_router,
 )
 from app.routers.prometheus_router import metrics_worker, status_worker
-from app.database import SessionLocal
-from app.utils.database_service import init_super_user, init_virtual_lab, init_document
+from app.database import DB_READ_REPLICA_URL, SessionLocal, get_pool_status
+from app.middleware import PerformanceMiddleware, ReadYourWritesMiddleware
+from app.utils.metrics_service import (
+    get_startup_report,
+    record_startup_phase,
+    register_pool_collector,
+    track_startup,
+)
+from app.utils.database_service import bootstrap_database
+from app.utils.rental_service import rental_sweeper_worker
 
 # pylint: disable=unused-import
 import app.db.listeners
@@ -43,30 +58,39 @@ from app.db.schemas import UserRead
 from app.db.schemas import UserUpdate
 from app.auth.auth_config import fastapi_users
 
+record_startup_phase("imports", time.perf_counter() - IMPORTS_STARTED)
+SETUP_STARTED = time.perf_counter()
+
 
 @asynccontextmanager
 async def lifespan(fast_api_app: FastAPI):  # pylint: disable=unused-argument
     """
     Application lifespan context manager.
-    Starts background tasks for fetching Prometheus metrics.
+    Starts background tasks for fetching Prometheus metrics and sweeping
+    rentals.
+    Every startup phase is timed and reported, see /metrics/startup.
     :param app: FastAPI application instance
     :return: None
     """
     db = SessionLocal()
     try:
-        init_super_user(db)
-        init_virtual_lab(db)
-        init_document(db)
+        with track_startup("bootstrap"):
+            bootstrap_database(db)
     finally:
         db.close()
     status_task = asyncio.create_task(status_worker())
     metrics_task = asyncio.create_task(metrics_worker())
+    sweeper_task = asyncio.create_task(rental_sweeper_worker())
+    logging.getLogger("uvicorn.error").info("Startup time: %s", get_startup_report())
     try:
         yield
     finally:
         status_task.cancel()
         metrics_task.cancel()
-        await asyncio.gather(status_task, metrics_task, return_exceptions=True)
+        sweeper_task.cancel()
+        await asyncio.gather(
+            status_task, metrics_task, sweeper_task, return_exceptions=True
+        )
 
 
 app = FastAPI(lifespan=lifespan)
@@ -94,6 +118,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if DB_READ_REPLICA_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Added last so it wraps every other middleware and measures the full request
+app.add_middleware(PerformanceMiddleware)
+register_pool_collector(get_pool_status)
+
 app.include_router(
     fastapi_users.get_auth_router(auth_backend), prefix="/auth", tags=["auth"]
 )
@@ -123,3 +154,7 @@ app.include_router(database_rack_router.router)
 app.include_router(database_shelf_router.router)
 app.include_router(database_cpus_router.router)
 app.include_router(database_disks_router.router)
+app.include_router(metrics_router.router)
+app.include_router(search_router.router)
+
+record_startup_phase("app_setup", time.perf_counter() - SETUP_STARTED)
@@ -0,0 +1,74 @@
+"""ASGI middlewares used by the FastAPI application."""
+
+import time
+
+from app.database import DB_READ_STICKY_SECONDS
+from app.utils.metrics_service import observe_request, start_request_stats
+from app.utils.redis_service import mark_recent_write
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a user to the primary database for a short window after a successful
+    mutation, so replica lag never hides the user's own changes.
+    The user ID is put on request.state by RequestContext.
+    """
+
+    def __init__(self, app, sticky_seconds: int = DB_READ_STICKY_SECONDS):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            # Mark before the client sees the response, so a GET sent right
+            # after it can never reach the replica ahead of the marker
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = scope.get("state", {}).get("user_id")
+                if user_id is not None:
+                    await mark_recent_write(user_id, self.sticky_seconds)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class PerformanceMiddleware:
+    """
+    Records latency, SQL, Redis and Prometheus usage of every HTTP request,
+    labelled by the matched route template to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request_stats()
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - start,
+                stats,
+            )
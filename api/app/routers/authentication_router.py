@@ -12,7 +12,7 @@ current_user = fastapi_users.current_user(active=True)
 
 
 @router.post("/setup-password")
-async def setup_first_password(
+def setup_first_password(
     data: FirstChangePasswordRequest,
     user: User = Depends(current_user),
     db: Session = Depends(get_db),
@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.database import get_db
 from app.db.schemas import DashboardResponse
 from app.utils.dashboard_service import build_dashboard
-from app.auth.dependencies import RequestContext
+from app.auth.dependencies import RequestContext, get_read_db
 
 router = APIRouter()
 
@@ -14,5 +13,5 @@ router = APIRouter()
     response_model=DashboardResponse,
     tags=["Dashboard"],
 )
-def get_dashboard(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
+def get_dashboard(db: Session = Depends(get_read_db), ctx: RequestContext = Depends()):
     return build_dashboard(db, ctx)
@@ -3,18 +3,38 @@
 from typing import List
 
 from app.database import get_db
-from app.db.models import Documentation, Tags
+from app.db.models import Documentation, Tags, TagsDocumentation
 from app.db.schemas import (
     DocumentationCreate,
     DocumentationUpdate,
     DocumentationResponse,
 )
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+    digest,
+    related_rows,
+)
 from app.utils.redis_service import acquire_lock
+from app.utils.tag_service import TagFilter
 from app.auth.dependencies import RequestContext
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 router = APIRouter()
+# Version of the tags in DocumentationResponse, part of its entity tag
+DOCUMENTATION_RELATIONS = digest(
+    related_rows(
+        Tags,
+        Tags.id.in_(
+            select(TagsDocumentation.tag_id)
+            .where(TagsDocumentation.documentation_id == Documentation.id)
+            .correlate(Documentation)
+        ),
+    ),
+)
 
 
 @router.get(
@@ -22,16 +42,21 @@ router = APIRouter()
     response_model=List[DocumentationResponse],
     tags=["Documentation"],
 )
-def get_documentation(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
+def get_documentation(
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    tag_filter: TagFilter = Depends(),
+):
     """
     Get all documents from documentation
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param tag_filter: Optional filter by tag names
     :return: List of all documents
     """
     ctx.require_user()
-    query = db.query(Documentation).options(joinedload(Documentation.tags)).all()
-    return query
+    query = db.query(Documentation).options(joinedload(Documentation.tags))
+    return tag_filter.apply(query, "documentation").all()
 
 
 @router.post(
@@ -71,26 +96,26 @@ def create_documentation(
     "/db/documentation/{documentation_id}",
     response_model=DocumentationResponse,
     tags=["Documentation"],
+    responses=NOT_MODIFIED_OPENAPI,
 )
 def get_documentation_by_id(
     documentation_id: int,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Get specific document from documentation by ID
     :param documentation_id: Document ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: Document object
     """
     ctx.require_user()
-    query = (
-        db.query(Documentation)
-        .filter(Documentation.id == documentation_id)
-        .options(joinedload(Documentation.tags))
-    )
-    document = query.first()
+    query = db.query(Documentation).filter(Documentation.id == documentation_id)
+    cond.evaluate(query, Documentation, DOCUMENTATION_RELATIONS)
+    document = query.options(joinedload(Documentation.tags)).first()
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
@@ -102,12 +127,14 @@ def get_documentation_by_id(
     "/db/documentation/{documentation_id}",
     response_model=DocumentationResponse,
     tags=["Documentation"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def update_documentation(
     documentation_id: int,
     documentation_data: DocumentationUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update document data
@@ -115,16 +142,14 @@ async def update_documentation(
     :param documentation_data: Documentation data schema
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: Updated Document
     """
     ctx.require_user()
     async with acquire_lock(f"documentation_lock:{documentation_id}"):
-        query = (
-            db.query(Documentation)
-            .filter(Documentation.id == documentation_id)
-            .options(joinedload(Documentation.tags))
-        )
-        document = query.first()
+        query = db.query(Documentation).filter(Documentation.id == documentation_id)
+        cond.evaluate(query, Documentation, DOCUMENTATION_RELATIONS)
+        document = query.options(joinedload(Documentation.tags)).first()
         if not document:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
@@ -141,27 +166,27 @@ async def update_documentation(
     "/db/documentation/{documentation_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     tags=["Documentation"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def delete_document(
     documentation_id: int,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete document
     :param documentation_id: Document ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: None
     """
     ctx.require_user()
     async with acquire_lock(f"documentation_lock:{documentation_id}"):
-        query = (
-            db.query(Documentation)
-            .filter(Documentation.id == documentation_id)
-            .options(joinedload(Documentation.tags))
-        )
-        document = query.first()
+        query = db.query(Documentation).filter(Documentation.id == documentation_id)
+        cond.evaluate(query, Documentation, DOCUMENTATION_RELATIONS)
+        document = query.options(joinedload(Documentation.tags)).first()
         if not document:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
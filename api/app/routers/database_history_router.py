@@ -17,7 +17,7 @@ from app.db.models import (
     Categories,
 )
 from app.db.schemas import HistoryEnhancedResponse
-from app.auth.dependencies import RequestContext
+from app.auth.dependencies import RequestContext, get_read_db
 
 router = APIRouter()
 
@@ -135,7 +135,7 @@ def _rollback_update(model_class, log_entry: History, db: Session) -> str:
     "/db/history/", response_model=List[HistoryEnhancedResponse], tags=["History"]
 )
 def get_history_logs(
-    limit=200, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    limit=200, db: Session = Depends(get_read_db), ctx: RequestContext = Depends()
 ):
     """
     Retrieve history logs with enhanced information.
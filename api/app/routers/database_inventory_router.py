@@ -1,6 +1,5 @@
 """Router for Inventory Database API CRUD."""
 
-from datetime import datetime
 from typing import List
 
 from app.database import get_db
@@ -13,13 +12,70 @@ from app.db.schemas import (
 )
 from app.utils.redis_service import acquire_lock
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from app.auth.dependencies import RequestContext
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.auth.dependencies import RequestContext, get_read_db
 from app.utils.database_service import resolve_target_team_id
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+)
 
 router = APIRouter()
 
 
+def _detail_options():
+    """
+    Loader options of the inventory detail views. Only rentals not returned
+    yet are loaded, with a separate query, so the rental history of an item
+    does not multiply the rows of the item query.
+    :return: List of loader options
+    """
+    return [
+        joinedload(Inventory.team),
+        joinedload(Inventory.room),
+        joinedload(Inventory.machine),
+        joinedload(Inventory.category),
+        selectinload(Inventory.rental_history.and_(Rentals.returned_on.is_(None)))
+        .joinedload(Rentals.user)
+        .selectinload(User.teams)
+        .joinedload(UsersTeams.team),
+    ]
+
+
+def _inventory_detail(item: Inventory):
+    """
+    Detail view of an item loaded with _detail_options.
+    :param item: Inventory item
+    :return: Dictionary matching InventoryDetailResponse
+    """
+    return {
+        "id": item.id,
+        "name": item.name,
+        "total_quantity": item.quantity,
+        "in_stock_quantity": item.quantity - item.rented_quantity,
+        "team_name": item.team.name if item.team else "N/A",
+        "room_name": item.room.name if item.room else "N/A",
+        "machine_info": item.machine.name if item.machine else "None",
+        "category_name": item.category.name if item.category else "N/A",
+        "location_link": f"room/{item.localization_id}",
+        "active_rentals": [
+            {
+                "id": r.id,
+                "borrower_name": f"{r.user.name} {r.user.surname}",
+                "borrower_team": (
+                    ", ".join([ut.team.name for ut in r.user.teams])
+                    if r.user.teams
+                    else "N/A"
+                ),
+                "quantity": r.quantity,
+                "end_date": r.end_date,
+            }
+            for r in item.rental_history
+        ],
+    }
+
+
 @router.post(
     "/db/inventory/",
     response_model=InventoryResponse,
@@ -70,7 +126,7 @@ def get_inventory(db: Session = Depends(get_db), ctx: RequestContext = Depends()
     tags=["Inventory"],
 )
 def get_inventory_details(
-    db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    db: Session = Depends(get_read_db), ctx: RequestContext = Depends()
 ):
     """
     Fetch all inventory items with detailed information from related tables (team, room, machine, category).
@@ -79,57 +135,9 @@ def get_inventory_details(
     :return: List of inventory items
     """
     ctx.require_user()
-    query = db.query(Inventory).options(
-        joinedload(Inventory.team),
-        joinedload(Inventory.room),
-        joinedload(Inventory.machine),
-        joinedload(Inventory.category),
-        joinedload(Inventory.rental_history)
-        .joinedload(Rentals.user)
-        .joinedload(User.teams)
-        .joinedload(UsersTeams.team),
-    )
-
+    query = db.query(Inventory).options(*_detail_options())
     query = ctx.team_filter(query, Inventory)
-    items = query.all()
-    today = datetime.now().date()
-
-    results = []
-    for item in items:
-        active_rentals_list = [
-            {
-                "id": r.id,
-                "borrower_name": f"{r.user.name} {r.user.surname}",
-                "borrower_team": (
-                    ", ".join([ut.team.name for ut in r.user.teams])
-                    if r.user.teams
-                    else "N/A"
-                ),
-                "quantity": r.quantity,
-                "end_date": r.end_date,
-            }
-            for r in item.rental_history
-            if r.end_date >= today
-        ]
-
-        total_rented = sum(r["quantity"] for r in active_rentals_list)
-
-        results.append(
-            {
-                "id": item.id,
-                "name": item.name,
-                "total_quantity": item.quantity,
-                "in_stock_quantity": item.quantity - total_rented,
-                "team_name": item.team.name if item.team else "N/A",
-                "room_name": item.room.name if item.room else "N/A",
-                "machine_info": item.machine.name if item.machine else "None",
-                "category_name": item.category.name if item.category else "N/A",
-                "location_link": f"room/{item.localization_id}",
-                "active_rentals": active_rentals_list,
-            }
-        )
-
-    return results
+    return [_inventory_detail(item) for item in query.all()]
 
 
 @router.post(
@@ -173,7 +181,7 @@ def bulk_create_items(
     tags=["Inventory"],
 )
 def get_inventory_item_details(
-    item_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    item_id: int, db: Session = Depends(get_read_db), ctx: RequestContext = Depends()
 ):
     """
     Fetch all specific item with detailed information from related tables (team, room, machine, category).
@@ -183,76 +191,41 @@ def get_inventory_item_details(
     """
     ctx.require_user()
     query = (
-        db.query(Inventory)
-        .filter(Inventory.id == item_id)
-        .options(
-            joinedload(Inventory.team),
-            joinedload(Inventory.room),
-            joinedload(Inventory.machine),
-            joinedload(Inventory.category),
-            joinedload(Inventory.rental_history)
-            .joinedload(Rentals.user)
-            .joinedload(User.teams)
-            .joinedload(UsersTeams.team),
-        )
+        db.query(Inventory).filter(Inventory.id == item_id).options(*_detail_options())
     )
-
     query = ctx.team_filter(query, Inventory)
     item = query.first()
 
     if not item:
         raise HTTPException(status_code=404, detail="Item not found or access denied")
 
-    today = datetime.now().date()
-
-    active_rentals_list = [
-        {
-            "id": r.id,
-            "borrower_name": f"{r.user.name} {r.user.surname}",
-            "borrower_team": (
-                ", ".join([ut.team.name for ut in r.user.teams])
-                if r.user.teams
-                else "N/A"
-            ),
-            "quantity": r.quantity,
-            "end_date": r.end_date,
-        }
-        for r in item.rental_history
-        if r.end_date >= today
-    ]
-
-    total_rented = sum(r["quantity"] for r in active_rentals_list)
-
-    return {
-        "id": item.id,
-        "name": item.name,
-        "total_quantity": item.quantity,
-        "in_stock_quantity": item.quantity - total_rented,
-        "team_name": item.team.name if item.team else "N/A",
-        "room_name": item.room.name if item.room else "N/A",
-        "machine_info": item.machine.name if item.machine else "None",
-        "category_name": item.category.name if item.category else "N/A",
-        "location_link": f"room/{item.localization_id}",
-        "active_rentals": active_rentals_list,
-    }
+    return _inventory_detail(item)
 
 
 @router.get(
-    "/db/inventory/{item_id}", response_model=InventoryResponse, tags=["Inventory"]
+    "/db/inventory/{item_id}",
+    response_model=InventoryResponse,
+    tags=["Inventory"],
+    responses=NOT_MODIFIED_OPENAPI,
 )
 def get_inventory_item(
-    item_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    item_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Fetch specific inventory item by ID
     :param item_id: Item ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: Inventory item
     """
     ctx.require_user()
     query = db.query(Inventory).filter(Inventory.id == item_id)
     query = ctx.team_filter(query, Inventory)
+    cond.evaluate(query, Inventory)
     item = query.first()
     if not item:
         raise HTTPException(
@@ -263,25 +236,31 @@ def get_inventory_item(
 
 
 @router.patch(
-    "/db/inventory/{item_id}", response_model=InventoryResponse, tags=["Inventory"]
+    "/db/inventory/{item_id}",
+    response_model=InventoryResponse,
+    tags=["Inventory"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def update_item(
     item_id: int,
     item_data: InventoryUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update item in inventory
     :param item_id: Item ID
     :param item_data: Item data schema
     :param db: Active database session
+    :param cond: Conditional request handling, for If-Match
     :return: Updated Inventory item
     """
     ctx.require_user()
     async with acquire_lock(f"inventory_lock:{item_id}"):
         query = db.query(Inventory).filter(Inventory.id == item_id)
         query = ctx.team_filter(query, Inventory)
+        cond.evaluate(query, Inventory)
         item = query.first()
         if not item:
             raise HTTPException(
@@ -306,20 +285,26 @@ async def update_item(
     "/db/inventory/{item_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     tags=["Inventory"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def delete_item(
-    item_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    item_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete item in inventory
     :param item_id: Item ID
     :param db: Active database session
+    :param cond: Conditional request handling, for If-Match
     :return: None
     """
     ctx.require_user()
     async with acquire_lock(f"inventory_lock:{item_id}"):
         query = db.query(Inventory).filter(Inventory.id == item_id)
         query = ctx.team_filter(query, Inventory)
+        cond.evaluate(query, Inventory)
         item = query.first()
         if not item:
             raise HTTPException(
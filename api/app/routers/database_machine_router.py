@@ -3,22 +3,248 @@
 import json
 from typing import List
 
-from app.database import get_db
-from app.db.models import Machines, User, UserType, Rack, Shelf, CPUs, Disks
+from app.database import get_db, run_in_db_threadpool
+from app.db.models import (
+    ActionType,
+    EntityType,
+    History,
+    Machines,
+    Metadata,
+    User,
+    UserType,
+    Rack,
+    Rooms,
+    Shelf,
+    CPUs,
+    Disks,
+    Tags,
+    Teams,
+)
 from app.db.schemas import (
+    MachineBulkRow,
+    MachinesBatchUpdate,
+    MachinesBatchUpdateResponse,
+    MachinesBulkResponse,
     MachinesCreate,
     MachinesResponse,
     MachinesUpdate,
     MachineFullDetailResponse,
 )
-from app.utils.redis_service import acquire_lock, get_cache
-from app.auth.dependencies import RequestContext
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from app.utils.bulk_service import (
+    BULK_BATCH_SIZE,
+    EXPORT_MEDIA_TYPES,
+    STREAMING_BULK_OPENAPI,
+    iter_bulk_batches,
+    iter_export_chunks,
+    row_error,
+    split_list_fields,
+    validate_rows,
+)
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+    digest,
+    related_rows,
+)
+from app.utils.redis_service import acquire_lock, acquire_locks, get_cache
+from app.utils.tag_service import TAG_LINKS, TagFilter, link_tags, unlink_tags
+from app.auth.dependencies import RequestContext, get_read_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.utils.database_service import resolve_target_team_id
 
 router = APIRouter()
 
+# MachineBulkRow fields stored outside the machines table
+BULK_METADATA_FIELDS = ("agent_prometheus", "ansible_access", "ansible_root_access")
+BULK_RELATED_FIELDS = ("cpus", "disks", "tags")
+# Version of the CPUs and disks in MachinesResponse, part of its entity tag
+MACHINE_RELATIONS = digest(
+    related_rows(CPUs, CPUs.machine_id == Machines.id),
+    related_rows(Disks, Disks.machine_id == Machines.id),
+)
+
+
+def _metric_series(payload: dict, metric: str) -> list:
+    """
+    Series of one metric from a cached Prometheus payload. The workers store an
+    error dictionary instead of the series when Prometheus could not be queried.
+    :param payload: Parsed cache payload
+    :param metric: Metric name
+    :return: List of series, empty on errors
+    """
+    series = payload.get(metric, [])
+    return series if isinstance(series, list) else []
+
+
+def _import_machine_batch(db: Session, ctx: RequestContext, valid: list):
+    """
+    Check a batch of validated import rows against the database and insert the
+    accepted ones with their metadata, CPUs, disks and tags. Every lookup and
+    insert is one query for the whole batch, and the batch is audited with a
+    single summarized history entry instead of one per machine.
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :param valid: Validated (row number, MachineBulkRow) pairs
+    :return: Per-row results
+    """
+    rows = [row for _, row in valid]
+    rooms = {
+        room_id
+        for (room_id,) in db.query(Rooms.id).filter(
+            Rooms.id.in_({row.localization_id for row in rows})
+        )
+    }
+    teams = {
+        team_id
+        for (team_id,) in db.query(Teams.id).filter(
+            Teams.id.in_({row.team_id for row in rows} | set(ctx.team_ids))
+        )
+    }
+    shelves = {
+        shelf_id: (room_id, team_id)
+        for shelf_id, room_id, team_id in db.query(Shelf.id, Rack.room_id, Rack.team_id)
+        .join(Rack, Shelf.rack_id == Rack.id)
+        .filter(Shelf.id.in_({row.shelf_id for row in rows}))
+    }
+    tags = dict(
+        db.query(Tags.name, Tags.id).filter(
+            Tags.name.in_({tag for row in rows for tag in row.tags})
+        )
+    )
+    taken = set(
+        db.query(Machines.name, Machines.localization_id).filter(
+            tuple_(Machines.name, Machines.localization_id).in_(
+                {(row.name, row.localization_id) for row in rows}
+            )
+        )
+    )
+
+    results, accepted = [], []
+    for number, row in valid:
+        try:
+            team_id = resolve_target_team_id(ctx, row.team_id)
+        except HTTPException as e:
+            results.append(row_error(number, e.detail, name=row.name))
+            continue
+        shelf = shelves.get(row.shelf_id)
+        missing_tags = sorted(set(row.tags) - tags.keys())
+        detail = None
+        if (row.name, row.localization_id) in taken:
+            detail = "Machine already exists in this room."
+        elif row.localization_id not in rooms:
+            detail = f"Room {row.localization_id} not found"
+        elif team_id is not None and team_id not in teams:
+            detail = f"Team {team_id} not found"
+        elif row.shelf_id is not None and shelf is None:
+            detail = f"Shelf {row.shelf_id} not found"
+        elif shelf and shelf[0] != row.localization_id:
+            detail = f"Shelf {row.shelf_id} is not in room {row.localization_id}"
+        elif shelf and not ctx.is_admin and shelf[1] not in ctx.team_ids:
+            detail = "You don't have permission to use this rack/shelf"
+        elif missing_tags:
+            detail = f"Tags not found: {missing_tags}"
+        if detail:
+            results.append(row_error(number, detail, name=row.name))
+            continue
+        taken.add((row.name, row.localization_id))
+        accepted.append((number, row, team_id))
+
+    if not accepted:
+        return results
+
+    try:
+        metadata_ids = db.scalars(
+            insert(Metadata).returning(Metadata.id, sort_by_parameter_order=True),
+            [
+                row.model_dump(include=set(BULK_METADATA_FIELDS))
+                for _, row, _ in accepted
+            ],
+        ).all()
+        machine_ids = db.scalars(
+            insert(Machines).returning(Machines.id, sort_by_parameter_order=True),
+            [
+                {
+                    **row.model_dump(
+                        exclude={*BULK_METADATA_FIELDS, *BULK_RELATED_FIELDS}
+                    ),
+                    "team_id": team_id,
+                    "metadata_id": metadata_id,
+                }
+                for (_, row, team_id), metadata_id in zip(accepted, metadata_ids)
+            ],
+        ).all()
+
+        cpus, disks, tag_links = [], [], []
+        for (_, row, _), machine_id in zip(accepted, machine_ids):
+            cpus += [{"name": name, "machine_id": machine_id} for name in row.cpus]
+            for disk in row.disks:
+                name, _, capacity = disk.partition(":")
+                disks.append(
+                    {
+                        "name": name,
+                        "capacity": capacity or None,
+                        "machine_id": machine_id,
+                    }
+                )
+            tag_links += [(machine_id, tags[tag]) for tag in row.tags]
+        for model, values in ((CPUs, cpus), (Disks, disks)):
+            if values:
+                db.execute(insert(model.__table__), values)
+        _, tag_column = TAG_LINKS["machine"]
+        link_tags(db, tag_column, tag_links)
+
+        db.add(
+            History(
+                entity_type=EntityType.MACHINES,
+                action=ActionType.CREATE,
+                entity_id=machine_ids[0],
+                user_id=db.info.get("user_id", 1),
+                can_rollback=False,
+                extra_data={
+                    "bulk_import": len(machine_ids),
+                    "machine_ids": machine_ids,
+                },
+            )
+        )
+        db.commit()
+    except (IntegrityError, DataError) as e:
+        db.rollback()
+        detail = f"Batch rejected by the database: {e.orig}"
+        return results + [
+            row_error(number, detail, name=row.name) for number, row, _ in accepted
+        ]
+
+    return results + [
+        {"row": number, "status": "created", "id": machine_id, "name": row.name}
+        for (number, row, _), machine_id in zip(accepted, machine_ids)
+    ]
+
+
+def _export_row(machine: Machines) -> dict:
+    """
+    Machine as a bulk row, the format read back by the bulk import.
+    :param machine: Machine with metadata, CPUs, disks and tags loaded
+    :return: Row dictionary
+    """
+    row = {}
+    for field in MachineBulkRow.model_fields:
+        if field in BULK_METADATA_FIELDS:
+            row[field] = bool(getattr(machine.machine_metadata, field))
+        elif field not in BULK_RELATED_FIELDS:
+            row[field] = getattr(machine, field)
+    row["cpus"] = [cpu.name for cpu in machine.cpus]
+    row["disks"] = [
+        f"{disk.name}:{disk.capacity}" if disk.capacity else disk.name
+        for disk in machine.disks
+    ]
+    row["tags"] = [tag.name for tag in machine.tags]
+    return row
+
 
 @router.post(
     "/db/machines/",
@@ -53,35 +279,260 @@ def create_machine(
 
 
 @router.get("/db/machines/", response_model=List[MachinesResponse], tags=["Machines"])
-def get_machines(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
+def get_machines(
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    tag_filter: TagFilter = Depends(),
+):
     """
     Fetch all machines
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param tag_filter: Optional filter by tag names
     :return: List of machines
     """
     ctx.require_user()
-    query = db.query(Machines)
+    query = db.query(Machines).options(
+        selectinload(Machines.cpus), selectinload(Machines.disks)
+    )
     query = ctx.team_filter(query, Machines)
+    query = tag_filter.apply(query, "machine")
     return query.all()
 
 
+@router.post(
+    "/db/machines/bulk",
+    response_model=MachinesBulkResponse,
+    tags=["Machines"],
+    openapi_extra=STREAMING_BULK_OPENAPI,
+)
+async def create_machines_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Import machines from a JSON array, CSV or NDJSON (fields of MachineBulkRow,
+    list columns separated by ';' in CSV). The body is read and imported in
+    batches of BULK_BATCH_SIZE rows, each committed on its own; invalid rows
+    are reported and skipped.
+    :param request: Request with the rows
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Per-row results
+    """
+    ctx.require_user()
+    results = []
+    first_row = 1
+    async for rows in iter_bulk_batches(request, BULK_BATCH_SIZE):
+        split_list_fields(rows, ("cpus", "disks", "tags"))
+        valid, errors = validate_rows(rows, MachineBulkRow, start=first_row)
+        first_row += len(rows)
+        results += errors
+        if valid:
+            results += await run_in_db_threadpool(_import_machine_batch, db, ctx, valid)
+
+    results.sort(key=lambda r: r["row"])
+    created = sum(1 for r in results if r["status"] == "created")
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
+@router.get("/db/machines/export", tags=["Machines"])
+def export_machines(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_read_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Stream all machines in the bulk import format, as CSV or NDJSON. Machines
+    are read in batches, so memory use does not grow with the fleet.
+    :param export_format: "csv" or "ndjson"
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Streaming response
+    """
+    ctx.require_user()
+    query = (
+        ctx.team_filter(db.query(Machines), Machines)
+        .options(
+            joinedload(Machines.machine_metadata),
+            selectinload(Machines.cpus),
+            selectinload(Machines.disks),
+            selectinload(Machines.tags),
+        )
+        .order_by(Machines.id)
+        .yield_per(BULK_BATCH_SIZE)
+    )
+
+    def _stream():
+        # The body is sent after the dependency cleanup, close what it reopens
+        try:
+            yield from iter_export_chunks(
+                (_export_row(m) for m in query),
+                list(MachineBulkRow.model_fields),
+                export_format,
+            )
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        _stream(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="machines.{export_format}"'
+        },
+    )
+
+
+@router.patch(
+    "/db/machines/batch",
+    response_model=MachinesBatchUpdateResponse,
+    tags=["Machines"],
+)
+async def update_machines_batch(
+    batch: MachinesBatchUpdate,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Re-team, move, mount or re-tag many machines in one transaction. The
+    machine locks are taken in sorted order and every check is one query for
+    the whole batch; if any machine or target is rejected nothing is changed.
+    :param batch: Machine IDs and the changes to apply
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Number and IDs of the updated machines
+    """
+    ctx.require_user()
+    changes = batch.model_dump(
+        include={"team_id", "localization_id", "shelf_id"}, exclude_unset=True
+    )
+    if changes.get("localization_id", 0) is None:
+        del changes["localization_id"]
+    machine_ids = sorted(set(batch.machine_ids))
+    if changes.get("team_id") is not None and not ctx.is_admin:
+        if changes["team_id"] not in ctx.team_ids:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to assign this machine to the specified team",
+            )
+
+    def _update():
+        query = db.query(Machines).filter(Machines.id.in_(machine_ids))
+        machines = ctx.team_filter(query, Machines).all()
+        missing = sorted(set(machine_ids) - {m.id for m in machines})
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Machines not found or access denied: {missing}",
+            )
+
+        if changes.get("shelf_id") is not None:
+            shelf = (
+                db.query(Shelf.id, Rack.room_id, Rack.team_id)
+                .join(Rack, Shelf.rack_id == Rack.id)
+                .filter(Shelf.id == changes["shelf_id"])
+                .first()
+            )
+            if not shelf:
+                raise HTTPException(status_code=404, detail="Target shelf not found")
+            if not ctx.is_admin and shelf.team_id not in ctx.team_ids:
+                raise HTTPException(
+                    status_code=403,
+                    detail="You don't have permission to use this rack/shelf",
+                )
+            if changes.setdefault("localization_id", shelf.room_id) != shelf.room_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Target shelf is not in the target room",
+                )
+        elif changes.get("localization_id") is not None:
+            if (
+                not db.query(Rooms.id)
+                .filter(Rooms.id == changes["localization_id"])
+                .first()
+            ):
+                raise HTTPException(status_code=404, detail="Target room not found")
+        if changes.get("team_id") is not None and ctx.is_admin:
+            if not db.query(Teams.id).filter(Teams.id == changes["team_id"]).first():
+                raise HTTPException(status_code=404, detail="Target team not found")
+
+        tag_ids = set(batch.add_tag_ids) | set(batch.remove_tag_ids)
+        if tag_ids:
+            found = {t for (t,) in db.query(Tags.id).filter(Tags.id.in_(tag_ids))}
+            if tag_ids - found:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Tags not found: {sorted(tag_ids - found)}",
+                )
+
+        # One set-based UPDATE instead of a versioned UPDATE per machine, so
+        # the history entries the flush listeners would write are added here
+        if changes:
+            db.execute(
+                update(Machines)
+                .where(Machines.id.in_(machine_ids))
+                .values(**changes, version_id=Machines.version_id + 1)
+                .execution_options(synchronize_session=False)
+            )
+            user_id = db.info.get("user_id", 1)
+            for machine in machines:
+                diff = {
+                    k: {"old": getattr(machine, k), "new": v}
+                    for k, v in changes.items()
+                    if getattr(machine, k) != v
+                }
+                if diff:
+                    db.add(
+                        History(
+                            entity_type=EntityType.MACHINES,
+                            action=ActionType.UPDATE,
+                            entity_id=machine.id,
+                            user_id=user_id,
+                            extra_data=diff,
+                        )
+                    )
+        _, tag_column = TAG_LINKS["machine"]
+        if batch.remove_tag_ids:
+            unlink_tags(db, tag_column, machine_ids, batch.remove_tag_ids)
+        link_tags(
+            db,
+            tag_column,
+            [(m, t) for m in machine_ids for t in batch.add_tag_ids],
+        )
+        db.commit()
+        return {"updated": len(machines), "machine_ids": machine_ids}
+
+    async with acquire_locks(
+        f"machine_lock:{machine_id}" for machine_id in machine_ids
+    ):
+        return await run_in_db_threadpool(_update)
+
+
 @router.get(
-    "/db/machines/{machine_id}", response_model=MachinesResponse, tags=["Machines"]
+    "/db/machines/{machine_id}",
+    response_model=MachinesResponse,
+    tags=["Machines"],
+    responses=NOT_MODIFIED_OPENAPI,
 )
 def get_machine_by_id(
-    machine_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    machine_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Fetch specific machine by ID
     :param machine_id: Machine ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: Machine object
     """
     ctx.require_user()
     query = db.query(Machines).filter(Machines.id == machine_id)
     query = ctx.team_filter(query, Machines)
+    cond.evaluate(query, Machines, MACHINE_RELATIONS)
     machine = query.first()
     if not machine:
         raise HTTPException(
@@ -108,21 +559,23 @@ async def get_machine_full_detail(
     """
 
     ctx.require_user()
-    query = db.query(Machines).filter(Machines.id == machine_id)
 
-    query = ctx.team_filter(query, Machines)
+    def _load_machine():
+        query = db.query(Machines).filter(Machines.id == machine_id)
+        query = ctx.team_filter(query, Machines)
+        return (
+            query.options(
+                joinedload(Machines.team),
+                joinedload(Machines.room),
+                joinedload(Machines.machine_metadata),
+                joinedload(Machines.tags),
+                joinedload(Machines.cpus),
+                joinedload(Machines.disks),
+                joinedload(Machines.shelf).joinedload(Shelf.rack),
+            )
+        ).first()
 
-    machine = (
-        query.options(
-            joinedload(Machines.team),
-            joinedload(Machines.room),
-            joinedload(Machines.machine_metadata),
-            joinedload(Machines.tags),
-            joinedload(Machines.cpus),
-            joinedload(Machines.disks),
-            joinedload(Machines.shelf).joinedload(Shelf.rack),
-        )
-    ).first()
+    machine = await run_in_db_threadpool(_load_machine)
 
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
@@ -138,7 +591,7 @@ async def get_machine_full_detail(
     live_payload = {"cpu_usage": None, "ram_usage": None}
 
     if status_parsed:
-        for s in status_parsed.get("status", []):
+        for s in _metric_series(status_parsed, "status"):
             if target_ip in s["instance"] and s["value"] == 1.0:
                 net_status = "Online"
                 break
@@ -147,7 +600,7 @@ async def get_machine_full_detail(
         live_payload["cpu_usage"] = next(
             (
                 m["value"]
-                for m in metrics_parsed.get("cpu_usage", [])
+                for m in _metric_series(metrics_parsed, "cpu_usage")
                 if target_ip in m["instance"]
             ),
             None,
@@ -155,7 +608,7 @@ async def get_machine_full_detail(
         live_payload["ram_usage"] = next(
             (
                 m["value"]
-                for m in metrics_parsed.get("memory_usage", [])
+                for m in _metric_series(metrics_parsed, "memory_usage")
                 if target_ip in m["instance"]
             ),
             None,
@@ -166,7 +619,7 @@ async def get_machine_full_detail(
                 "value": round(m["value"], 2) if m["value"] is not None else None,
                 "timestamp": m["timestamp"],
             }
-            for m in metrics_parsed.get("disk_usage", [])
+            for m in _metric_series(metrics_parsed, "disk_usage")
             if target_ip in m["instance"]
         ]
         live_payload["disks"] = disks
@@ -209,13 +662,17 @@ async def get_machine_full_detail(
 
 
 @router.patch(
-    "/db/machines/{machine_id}", response_model=MachinesResponse, tags=["Machines"]
+    "/db/machines/{machine_id}",
+    response_model=MachinesResponse,
+    tags=["Machines"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def update_machine(
     machine_id: int,
     machine_data: MachinesUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update machine data
@@ -223,52 +680,66 @@ async def update_machine(
     :param machine_data: Machine data schema
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: Updated Machine
     """
     ctx.require_user()
-    async with acquire_lock(f"machine_lock:{machine_id}"):
-        query = db.query(Machines).filter(Machines.id == machine_id).first()
+    update_data = machine_data.model_dump(exclude_unset=True)
+    if "team_id" in update_data and not ctx.is_admin:
+        if update_data["team_id"] not in ctx.team_ids:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to assign this machine to the specified team",
+            )
+
+    def _update():
+        query = db.query(Machines).filter(Machines.id == machine_id)
         query = ctx.team_filter(query, Machines)
+        cond.evaluate(query, Machines, MACHINE_RELATIONS)
         machine = query.first()
         if not machine:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Machine not found or access denied",
             )
-        update_data = machine_data.model_dump(exclude_unset=True)
-        if "team_id" in update_data and not ctx.is_admin:
-            if update_data["team_id"] not in ctx.team_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You don't have permission to assign this machine to the specified team",
-                )
         for k, v in update_data.items():
             setattr(machine, k, v)
 
         db.commit()
         db.refresh(machine)
-        return machine
+        # Serialize in the worker so lazy cpus/disks loads stay off the loop
+        return MachinesResponse.model_validate(machine)
+
+    async with acquire_lock(f"machine_lock:{machine_id}"):
+        return await run_in_db_threadpool(_update)
 
 
 @router.delete(
     "/db/machines/{machine_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     tags=["Machines"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def delete_machine(
-    machine_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    machine_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete Machine
     :param machine_id: Machine ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: None
     """
     ctx.require_user()
-    async with acquire_lock(f"machine_lock:{machine_id}"):
+
+    def _delete():
         query = db.query(Machines).filter(Machines.id == machine_id)
         query = ctx.team_filter(query, Machines)
+        cond.evaluate(query, Machines, MACHINE_RELATIONS)
         machine = query.first()
         if not machine:
             raise HTTPException(
@@ -278,6 +749,9 @@ async def delete_machine(
         db.delete(machine)
         db.commit()
 
+    async with acquire_lock(f"machine_lock:{machine_id}"):
+        await run_in_db_threadpool(_delete)
+
 
 @router.post(
     "/db/machines/{machine_id}/mount/{shelf_id}", status_code=status.HTTP_200_OK
@@ -297,7 +771,8 @@ async def mount_machine(
     :return: Status message
     """
     ctx.require_user()
-    async with acquire_lock(f"machine_lock:{machine_id}"):
+
+    def _mount():
         machine_query = db.query(Machines).filter(Machines.id == machine_id)
         machine = ctx.team_filter(machine_query, Machines).first()
 
@@ -329,6 +804,9 @@ async def mount_machine(
             "message": f"Machine {machine.name} mounted on shelf {shelf.name} (Rack: {shelf.rack.name})",
         }
 
+    async with acquire_lock(f"machine_lock:{machine_id}"):
+        return await run_in_db_threadpool(_mount)
+
 
 @router.post("/db/machines/{machine_id}/unmount", status_code=status.HTTP_200_OK)
 def unmount_machine(
@@ -1,12 +1,13 @@
 """Router for Rack Database API CRUD."""
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload, Session
 from typing import List, Optional
 
 from app.database import get_db
-from app.db.models import Rack, Shelf, Rooms, Tags, Teams, Machines
-from app.auth.dependencies import RequestContext
+from app.db.models import Rack, Shelf, Rooms, Tags, Machines
+from app.auth.dependencies import RequestContext, get_read_db
 from app.db.schemas import (
     RackCreate,
     RackUpdate,
@@ -14,8 +15,18 @@ from app.db.schemas import (
     RackWithOrderedMachinesResponse,
 )
 from app.utils.database_service import resolve_target_team_id
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+    validator_headers,
+)
+from app.utils.tag_service import TagFilter
+from app.utils.tree_service import render_racks, rack_tree_columns, with_rack_tree_joins
 
 router = APIRouter(tags=["Racks"])
+# Version of the whole tree of a rack, part of its entity tag
+RACK_TREE_VERSION = rack_tree_columns()[0]
 
 
 def format_rack_output(rack: Rack):
@@ -52,36 +63,30 @@ def format_rack_output(rack: Rack):
 def get_racks(
     room_ids: Optional[List[int]] = Query(None),
     team_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_read_db),
     ctx: RequestContext = Depends(),
+    tag_filter: TagFilter = Depends(),
 ):
     """
     Returns ALL racks with their shelves and machines nested inside.
     :param room_ids: Optional list of room IDs to filter by
     :param team_ids: Optional list of team IDs to filter by
+    :param db: Read only database session
     :param ctx: Request context for database and user info
+    :param tag_filter: Optional filter by tag names
     :return: List of racks with nested structures
     """
     ctx.require_user()
-    query = ctx.db.query(Rack)
-
-    query = ctx.team_filter(query, Rack)
+    query = ctx.team_filter(select(Rack), Rack)
 
     if room_ids:
         query = query.filter(Rack.room_id.in_(room_ids))
     if team_ids:
         query = query.filter(Rack.team_id.in_(team_ids))
+    query = tag_filter.apply(query, "rack")
 
-    racks = query.options(
-        joinedload(Rack.room),
-        joinedload(Rack.team),
-        joinedload(Rack.shelves).joinedload(Shelf.machines),
-    ).all()
-
-    for r in racks:
-        r.room_name = r.room.name if r.room else "N/A"
-        r.team_name = r.team.name if r.team else "N/A"
-
-    return racks
+    trees = render_racks(db, query)
+    return Response(content="[" + ",".join(trees) + "]", media_type="application/json")
 
 
 @router.get("/db/racks-list", tags=["Racks"])
@@ -99,39 +104,40 @@ def get_racks_list(db: Session = Depends(get_db), ctx: RequestContext = Depends(
     return [{"id": r.id, "name": r.name} for r in racks]
 
 
-@router.get("/db/racks/{rack_id}", response_model=RackResponse, tags=["Racks"])
+@router.get(
+    "/db/racks/{rack_id}",
+    response_model=RackResponse,
+    tags=["Racks"],
+    responses=NOT_MODIFIED_OPENAPI,
+)
 def get_rack_detail(
-    rack_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    rack_id: int,
+    db: Session = Depends(get_read_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Fetch specific rack by ID with its nested shelves and machines
     :param rack_id: ID of the rack
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: Detailed rack object
     """
     ctx.require_user()
-    query = db.query(Rack).filter(Rack.id == rack_id)
-    rack = (
-        ctx.team_filter(query, Rack)
-        .options(
-            joinedload(Rack.room),
-            joinedload(Rack.team),
-            joinedload(Rack.shelves).joinedload(Shelf.machines),
-        )
-        .first()
-    )
+    rack_query = ctx.team_filter(db.query(Rack).filter(Rack.id == rack_id), Rack)
+    version = cond.evaluate(with_rack_tree_joins(rack_query), Rack, RACK_TREE_VERSION)
+    query = ctx.team_filter(select(Rack).where(Rack.id == rack_id), Rack)
+    trees = render_racks(db, query, [(rack_id, version)] if version else None)
 
-    if not rack:
+    if not trees:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Rack not found or access denied",
         )
 
-    rack.room_name = rack.room.name if rack.room else "N/A"
-    rack.team_name = rack.team.name if rack.team else "N/A"
-
-    return rack
+    headers = validator_headers(cond.etag) if cond.etag else None
+    return Response(content=trees[0], media_type="application/json", headers=headers)
 
 
 @router.post(
@@ -184,12 +190,18 @@ def create_rack(
     return db_rack
 
 
-@router.patch("/db/racks/{rack_id}", response_model=RackResponse, tags=["Racks"])
+@router.patch(
+    "/db/racks/{rack_id}",
+    response_model=RackResponse,
+    tags=["Racks"],
+    responses=PRECONDITION_OPENAPI,
+)
 def update_rack(
     rack_id: int,
     rack_data: RackUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update an existing rack including team or room changes
@@ -197,11 +209,15 @@ def update_rack(
     :param rack_data: Data fields to update
     :param db: Active database session
     :param ctx: Request context for permissions
+    :param cond: Conditional request handling, for If-Match
     :return: Updated rack object
     """
     ctx.require_user()
 
     query = db.query(Rack).filter(Rack.id == rack_id)
+    cond.evaluate(
+        with_rack_tree_joins(ctx.team_filter(query, Rack)), Rack, RACK_TREE_VERSION
+    )
     db_rack = ctx.team_filter(query, Rack).first()
 
     if not db_rack:
@@ -250,21 +266,31 @@ def update_rack(
 
 
 @router.delete(
-    "/db/racks/{rack_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Racks"]
+    "/db/racks/{rack_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["Racks"],
+    responses=PRECONDITION_OPENAPI,
 )
 def delete_rack(
-    rack_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    rack_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete a specific rack from the database
     :param rack_id: ID of the rack to delete
     :param db: Active database session
     :param ctx: Request context for team-based access control
+    :param cond: Conditional request handling, for If-Match
     :return: No content response
     """
     ctx.require_user()
 
     query = db.query(Rack).filter(Rack.id == rack_id)
+    cond.evaluate(
+        with_rack_tree_joins(ctx.team_filter(query, Rack)), Rack, RACK_TREE_VERSION
+    )
     db_rack = ctx.team_filter(query, Rack).first()
 
     if not db_rack:
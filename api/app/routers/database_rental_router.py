@@ -1,17 +1,23 @@
 """Router for Rental Database API CRUD."""
 
 from typing import List, Optional
-from datetime import date
-from app.database import get_db
+from datetime import date, timedelta
+from app.database import get_db, run_in_db_threadpool
 from app.db.models import (
     Rentals,
     Inventory,
 )
 from app.db.schemas import RentalsCreate, RentalsResponse, RentalReturn
-from app.utils.redis_service import acquire_lock
+from app.utils.availability_service import (
+    book,
+    period,
+    refresh_items,
+    release,
+    reserve,
+    reserved_peak,
+)
 from app.auth.dependencies import RequestContext
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -37,33 +43,32 @@ async def create_rental(
     """
     ctx.require_user()
 
-    async with acquire_lock(f"inventory_lock:{rent_data.item_id}"):
-        item = (
-            db.query(Inventory)
-            .filter(Inventory.id == rent_data.item_id)
-            .with_for_update(nowait=True)
-            .first()
+    if rent_data.end_date < rent_data.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date can't be before start date",
         )
 
-        if not item:
-            raise HTTPException(status_code=404, detail="Item not found")
-
-        active_rentals_sum = (
-            db.query(func.coalesce(func.sum(Rentals.quantity), 0))
-            .filter(
-                Rentals.item_id == item.id,
-                Rentals.start_date <= rent_data.end_date,
-                Rentals.end_date >= rent_data.start_date,
-            )
-            .scalar()
+    def _create():
+        booked = book(
+            db,
+            rent_data.item_id,
+            rent_data.start_date,
+            rent_data.end_date,
+            rent_data.quantity,
         )
 
-        in_stock = item.quantity - active_rentals_sum
-
-        if rent_data.quantity > in_stock:
+        if booked is None:
+            db.rollback()
+            item = db.get(Inventory, rent_data.item_id)
+            if not item:
+                raise HTTPException(status_code=404, detail="Item not found")
+            in_stock = item.quantity - reserved_peak(
+                db, item.id, rent_data.start_date, rent_data.end_date
+            )
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
-                detail=f"You can't borrow more than: {in_stock}",
+                detail=f"You can't borrow more than: {max(in_stock, 0)}",
             )
 
         rental = Rentals(
@@ -73,16 +78,19 @@ async def create_rental(
             end_date=rent_data.end_date,
             user_id=ctx.current_user.id,
         )
-
         db.add(rental)
+        db.flush()
 
-        if in_stock - rent_data.quantity == 0:
-            item.rental_status = True
-            item.rental_id = None
+        if rent_data.start_date <= date.today():
+            # Future rentals are counted by the rental sweeper when they start
+            refresh_items(db, [rent_data.item_id], date.today())
 
+        # Serialize before the commit expires it, instead of reloading it
+        response = RentalsResponse.model_validate(rental)
         db.commit()
-        db.refresh(rental)
-        return rental
+        return response
+
+    return await run_in_db_threadpool(_create)
 
 
 @router.post("/db/rentals/{rental_id}/return", tags=["Rentals"])
@@ -101,36 +109,27 @@ async def return_rental(
     """
     ctx.require_user()
 
-    query = (
-        db.query(Rentals)
-        .join(Inventory, Rentals.item_id == Inventory.id)
-        .filter(Rentals.id == rental_id)
-    )
-    query = ctx.team_filter(query, Inventory)
-
-    rental = query.first()
-
-    if not rental:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Rental not found or access denied",
+    def _return():
+        query = (
+            db.query(Rentals)
+            .join(Inventory, Rentals.item_id == Inventory.id)
+            .filter(Rentals.id == rental_id)
         )
+        query = ctx.team_filter(query, Inventory)
 
-    item_id = rental.item_id
+        rental = query.with_for_update(of=Rentals).first()
 
-    async with acquire_lock(f"inventory_lock:{rental.item_id}"):
-        db.expire_all()
-
-        rental = (
-            db.query(Rentals).filter(Rentals.id == rental_id).with_for_update().first()
-        )
-
-        item = (
-            db.query(Inventory)
-            .filter(Inventory.id == item_id)
-            .with_for_update()
-            .first()
-        )
+        if not rental:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Rental not found or access denied",
+            )
+        if rental.returned_on is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Rental already returned on {rental.returned_on}",
+            )
+        item_id = rental.item_id
 
         qty_to_return = (
             return_data.quantity
@@ -144,35 +143,77 @@ async def return_rental(
                 detail=f"You can't return more than you borrowed: ({rental.quantity})",
             )
 
-        if qty_to_return == rental.quantity:
-            rental.end_date = date.today()
-            if item:
-                item.rental_status = False
+        today = date.today()
+        if qty_to_return == rental.quantity and today < rental.start_date:
+            # Returning a rental that has not started yet cancels it
+            release(db, item_id, rental.start_date, rental.end_date, rental.quantity)
+            db.delete(rental)
+            message = "Rental cancelled"
+        elif qty_to_return == rental.quantity:
+            # The rental now ends today: free the days after it, or keep the
+            # days it was overdue reserved
+            if today < rental.end_date:
+                release(
+                    db,
+                    item_id,
+                    max(rental.start_date, today + timedelta(days=1)),
+                    rental.end_date,
+                    rental.quantity,
+                )
+            elif today > rental.end_date:
+                reserve(
+                    db,
+                    item_id,
+                    max(rental.start_date, rental.end_date + timedelta(days=1)),
+                    today,
+                    rental.quantity,
+                )
+            rental.end_date = today
+            rental.returned_on = today
             message = "Returned successfully (Full)"
         else:
+            release(db, item_id, rental.start_date, rental.end_date, qty_to_return)
             rental.quantity -= qty_to_return
-            if item:
-                item.rental_status = False
             message = f"Partially returned {qty_to_return} items. Remaining: {rental.quantity}"
 
-        if item:
-            item.rental_status = False
-
+        db.flush()
+        refresh_items(db, [item_id], today)
         db.commit()
+        return message
+
+    message = await run_in_db_threadpool(_return)
 
     return {"message": message}
 
 
 @router.get("/db/rentals/", response_model=List[RentalsResponse], tags=["Rentals"])
-def get_rentals(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
+def get_rentals(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+):
     """
-    Get all rentals
+    Get all rentals, or the rentals overlapping a period
+    :param start_date: First day of the period, unbounded if not given
+    :param end_date: Last day of the period, unbounded if not given
     :param db: Active database session
     :param ctx: Request context for user and team info
-    :return: List of all rentals
+    :return: List of rentals
     """
     ctx.require_user()
+    if start_date and end_date and end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date can't be before start date",
+        )
     query = db.query(Rentals).join(Inventory, Rentals.item_id == Inventory.id)
+    if start_date or end_date:
+        query = query.filter(
+            period(Rentals.start_date, Rentals.end_date).op("&&")(
+                period(start_date, end_date)
+            )
+        )
     query = ctx.team_filter(query, Inventory)
     return query.all()
 
@@ -218,24 +259,25 @@ async def delete_rental(
     :return: None
     """
     ctx.require_user()
-    query = (
-        db.query(Rentals)
-        .join(Inventory, Rentals.item_id == Inventory.id)
-        .filter(Rentals.id == rental_id)
-    )
-    query = ctx.team_filter(query, Inventory)
-    rental = query.first()
-    if not rental:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Rental not found or access denied",
-        )
 
-    async with acquire_lock(f"inventory_lock:{rental.item_id}"):
-        item = db.query(Inventory).filter(Inventory.id == rental.item_id).first()
-        if item and item.rental_id == rental.id:
-            item.rental_status = False
-            item.rental_id = None
+    def _delete():
+        query = (
+            db.query(Rentals)
+            .join(Inventory, Rentals.item_id == Inventory.id)
+            .filter(Rentals.id == rental_id)
+        )
+        query = ctx.team_filter(query, Inventory)
+        rental = query.with_for_update(of=Rentals).first()
+        if not rental:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Rental not found or access denied",
+            )
 
+        release(db, rental.item_id, rental.start_date, rental.end_date, rental.quantity)
         db.delete(rental)
+        db.flush()
+        refresh_items(db, [rental.item_id], date.today())
         db.commit()
+
+    await run_in_db_threadpool(_delete)
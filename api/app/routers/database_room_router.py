@@ -2,22 +2,51 @@
 
 from typing import List
 from app.database import get_db
-from app.db.models import Rooms, Tags, Rack, Shelf
+from app.db.models import Rooms, Tags, TagsRooms, Rack, Shelf
 from app.db.schemas import (
     RoomsCreate,
     RoomsResponse,
     RoomsUpdate,
     RoomDashboardResponse,
     RoomDetailsResponse,
+    RoomSnapshotResponse,
 )
 from app.utils.redis_service import acquire_lock
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.auth.dependencies import RequestContext
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from app.auth.dependencies import RequestContext, get_read_db
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 from app.utils.database_service import resolve_target_team_id
-
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+    digest,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    related_rows,
+    validator_headers,
+)
+from app.utils.tag_service import TagFilter
+from app.utils.tree_service import (
+    render_room_snapshot,
+    room_cache,
+    room_snapshot_version,
+)
 
 router = APIRouter()
+# Version of the tags in RoomsResponse, part of its entity tag
+ROOM_RELATIONS = digest(
+    related_rows(
+        Tags,
+        Tags.id.in_(
+            select(TagsRooms.tag_id)
+            .where(TagsRooms.room_id == Rooms.id)
+            .correlate(Rooms)
+        ),
+    ),
+)
 
 
 @router.post(
@@ -57,22 +86,30 @@ def create_room(
 
 
 @router.get("/db/rooms/", response_model=List[RoomsResponse], tags=["Rooms"])
-def get_rooms(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
+def get_rooms(
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    tag_filter: TagFilter = Depends(),
+):
     """
     Fetch all rooms
     :param db: Active database session
+    :param tag_filter: Optional filter by tag names
     :return: List of all rooms
     """
     ctx.require_user()
     query = db.query(Rooms).options(joinedload(Rooms.tags))
     query = ctx.team_filter(query, Rooms)
+    query = tag_filter.apply(query, "room")
     return query.all()
 
 
 @router.get(
     "/db/rooms/dashboard", response_model=List[RoomDashboardResponse], tags=["Rooms"]
 )
-def get_rooms_dashboard(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
+def get_rooms_dashboard(
+    db: Session = Depends(get_read_db), ctx: RequestContext = Depends()
+):
     """
     Fetch all rooms with rack count and map link for dashboard
     :param db: Active database session
@@ -101,7 +138,7 @@ def get_rooms_dashboard(db: Session = Depends(get_db), ctx: RequestContext = Dep
     "/db/rooms/{room_id}/details", response_model=RoomDetailsResponse, tags=["Rooms"]
 )
 def get_room_details(
-    room_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    room_id: int, db: Session = Depends(get_read_db), ctx: RequestContext = Depends()
 ):
     """
     Fetch specific room by ID with nested racks, shelves and machines for dashboard details
@@ -160,20 +197,79 @@ def get_room_details(
     }
 
 
-@router.get("/db/rooms/{room_id}", response_model=RoomsResponse, tags=["Rooms"])
+@router.get(
+    "/db/rooms/{room_id}/snapshot",
+    response_model=RoomSnapshotResponse,
+    tags=["Rooms"],
+    responses=NOT_MODIFIED_OPENAPI,
+)
+def get_room_snapshot(
+    room_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Floor plan snapshot of a room for the map view. Its ETag changes with any
+    room, rack, shelf, machine, tag or rack coordinate it contains, so
+    polling clients sending If-None-Match get 304 after one version query.
+    :param room_id: Room ID
+    :param request: Incoming request, for its conditional headers
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Room snapshot, or empty 304 response
+    """
+    ctx.require_user()
+    query = ctx.team_filter(select(Rooms).where(Rooms.id == room_id), Rooms)
+    version = room_snapshot_version(db, query)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Lab not found")
+
+    cached = room_cache.get(room_id, version)
+    rendered_at = cached[1] if cached else None
+    etag = make_etag(room_id, version)
+    if is_not_modified(request, etag, rendered_at):
+        return not_modified(etag, rendered_at)
+
+    if cached is None:
+        rendered = render_room_snapshot(db, room_id)
+        if rendered is None:
+            raise HTTPException(status_code=404, detail="Lab not found")
+        version, document, rendered_at = rendered
+        etag = make_etag(room_id, version)
+    else:
+        document = cached[0]
+    return Response(
+        content=document,
+        media_type="application/json",
+        headers=validator_headers(etag, rendered_at),
+    )
+
+
+@router.get(
+    "/db/rooms/{room_id}",
+    response_model=RoomsResponse,
+    tags=["Rooms"],
+    responses=NOT_MODIFIED_OPENAPI,
+)
 def get_room_by_id(
-    room_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    room_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Fetch specific room by ID
     :param room_id: Room ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: Room object
     """
     ctx.require_user()
     query = db.query(Rooms).filter(Rooms.id == room_id)
     query = ctx.team_filter(query, Rooms)
+    cond.evaluate(query, Rooms, ROOM_RELATIONS)
     room = query.first()
     if not room:
         raise HTTPException(
@@ -182,12 +278,18 @@ def get_room_by_id(
     return room
 
 
-@router.patch("/db/rooms/{room_id}", response_model=RoomsResponse, tags=["Rooms"])
+@router.patch(
+    "/db/rooms/{room_id}",
+    response_model=RoomsResponse,
+    tags=["Rooms"],
+    responses=PRECONDITION_OPENAPI,
+)
 async def update_room(
     room_id: int,
     room_data: RoomsUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update room
@@ -195,6 +297,7 @@ async def update_room(
     :param room_data: Room data schema
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: Updated Room
     """
     ctx.require_group_admin()
@@ -202,6 +305,7 @@ async def update_room(
     async with acquire_lock(f"room_lock:{room_id}"):
         query = db.query(Rooms).filter(Rooms.id == room_id)
         query = ctx.team_filter(query, Rooms)
+        cond.evaluate(query, Rooms, ROOM_RELATIONS)
 
         room = query.first()
         if not room:
@@ -232,16 +336,23 @@ async def update_room(
 
 
 @router.delete(
-    "/db/rooms/{room_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Rooms"]
+    "/db/rooms/{room_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["Rooms"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def delete_room(
-    room_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    room_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete Room
     :param room_id: Room ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: None
     """
     ctx.require_group_admin()
@@ -249,6 +360,7 @@ async def delete_room(
     async with acquire_lock(f"room_lock:{room_id}"):
         query = db.query(Rooms).filter(Rooms.id == room_id)
         query = ctx.team_filter(query, Rooms)
+        cond.evaluate(query, Rooms, ROOM_RELATIONS)
         room = query.first()
         if not room:
             raise HTTPException(
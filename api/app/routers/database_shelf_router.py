@@ -5,15 +5,41 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session, joinedload
 
 from app.database import get_db
-from app.db.models import Rack, Shelf
+from app.db.models import Machines, Rack, Shelf
 from app.auth.dependencies import RequestContext
 from app.db.schemas import (
     ShelfCreate,
     ShelfUpdate,
     ShelfResponse,
 )
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+    digest,
+    related_rows,
+)
 
 router = APIRouter(tags=["shelves"])
+# Version of the machines in ShelfResponse, part of its entity tag
+SHELF_RELATIONS = digest(related_rows(Machines, Machines.shelf_id == Shelf.id))
+
+
+def _evaluate_shelf(
+    cond: ConditionalRequest, db: Session, ctx: RequestContext, shelf_id: int
+):
+    """
+    Evaluate the conditional headers of a request against a shelf, accessible
+    through the team of its rack.
+    :param cond: Conditional request handling
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :param shelf_id: ID of the shelf
+    :return: None
+    """
+    query = db.query(Shelf).join(Rack, Rack.id == Shelf.rack_id)
+    query = ctx.team_filter(query.filter(Shelf.id == shelf_id), Rack)
+    cond.evaluate(query, Shelf, SHELF_RELATIONS)
 
 
 @router.get("/db/rack/{rack_id}/all", response_model=List[ShelfResponse])
@@ -42,18 +68,27 @@ def get_shelves_by_rack(
     )
 
 
-@router.get("/db/shelf/{shelf_id}", response_model=ShelfResponse)
+@router.get(
+    "/db/shelf/{shelf_id}",
+    response_model=ShelfResponse,
+    responses=NOT_MODIFIED_OPENAPI,
+)
 def get_single_shelf(
-    shelf_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    shelf_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Fetch specific shelf by ID with its nested machines
     :param shelf_id: ID of the shelf
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: Detailed shelf object
     """
     ctx.require_user()
+    _evaluate_shelf(cond, db, ctx, shelf_id)
 
     shelf = (
         db.query(Shelf)
@@ -109,12 +144,17 @@ def create_shelf(
     return db_shelf
 
 
-@router.patch("/db/shelf/{shelf_id}", response_model=ShelfResponse)
+@router.patch(
+    "/db/shelf/{shelf_id}",
+    response_model=ShelfResponse,
+    responses=PRECONDITION_OPENAPI,
+)
 def update_shelf(
     shelf_id: int,
     shelf_data: ShelfUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update shelf details like name or order
@@ -122,9 +162,11 @@ def update_shelf(
     :param shelf_data: Fields to update
     :param db: Active database session
     :param ctx: Request context for permissions
+    :param cond: Conditional request handling, for If-Match
     :return: Updated shelf object
     """
     ctx.require_user()
+    _evaluate_shelf(cond, db, ctx, shelf_id)
 
     db_shelf = db.query(Shelf).filter(Shelf.id == shelf_id).first()
     if not db_shelf:
@@ -146,19 +188,28 @@ def update_shelf(
     return db_shelf
 
 
-@router.delete("/db/shelf/{shelf_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/db/shelf/{shelf_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses=PRECONDITION_OPENAPI,
+)
 def delete_shelf(
-    shelf_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    shelf_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete a specific shelf if it is empty
     :param shelf_id: ID of the shelf to delete
     :param db: Active database session
     :param ctx: Request context for authorization
+    :param cond: Conditional request handling, for If-Match
     :return: No content response
     """
 
     ctx.require_user()
+    _evaluate_shelf(cond, db, ctx, shelf_id)
 
     db_shelf = db.query(Shelf).filter(Shelf.id == shelf_id).first()
     if not db_shelf:
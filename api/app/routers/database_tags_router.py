@@ -1,23 +1,41 @@
 """Router for Tags Database API CRUD."""
 
-from typing import List
+from typing import List, Literal, Optional
 
 from app.database import get_db
-from app.db.models import Tags, Machines, Rack, Rooms, Documentation
-from app.db.schemas import TagsCreate, TagsUpdate, TagsResponse, TagsAssignment
+from app.db.models import Tags
+from app.db.schemas import (
+    TagsCreate,
+    TagsUpdate,
+    TagsResponse,
+    TagsAssignment,
+    TagsBulkAssignment,
+    TagsBulkResponse,
+    TagFacetResponse,
+)
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+)
 from app.utils.redis_service import acquire_lock
-from app.auth.dependencies import RequestContext
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.utils.tag_service import (
+    TAG_LINKS,
+    check_access,
+    check_tags,
+    link_tags,
+    link_tags_product,
+    tag_facets,
+    tag_link,
+    unlink_tags,
+)
+from app.auth.dependencies import RequestContext, get_read_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
-ENTITY_MAP = {
-    "machine": Machines,
-    "rack": Rack,
-    "room": Rooms,
-    "documentation": Documentation,
-}
+TaggedType = Literal["machine", "rack", "room", "documentation"]
 
 
 @router.get(
@@ -37,58 +55,131 @@ def get_tags(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
     return query
 
 
+@router.get(
+    "/db/tags/facets",
+    response_model=List[TagFacetResponse],
+    tags=["Tags"],
+)
+def get_tag_facets(
+    types: Optional[List[TaggedType]] = Query(
+        None, description="Counted entity types, all by default"
+    ),
+    db: Session = Depends(get_read_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Number of machines, racks, rooms and documents of the user's teams
+    carrying each tag, for tag filters of the listings
+    :param types: Optional list of entity types to count
+    :param db: Read only database session
+    :param ctx: Request context for user and team info
+    :return: List of tags with their counts, by name
+    """
+    ctx.require_user()
+    return tag_facets(db, ctx, list(dict.fromkeys(types or TAG_LINKS)))
+
+
 @router.post("/db/tags/assign", status_code=status.HTTP_200_OK, tags=["Tags"])
-async def assign_tag(
+def assign_tag(
     data: TagsAssignment, db: Session = Depends(get_db), ctx: RequestContext = Depends()
 ):
+    """
+    Assign tag to entity, assigning it again changes nothing
+    :param data: Tag, entity ID and entity type
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Confirmation message
+    """
     ctx.require_user()
+    entity_type = data.entity_type.lower()
+    _, column = tag_link(entity_type)
+    check_access(db, ctx, entity_type, [data.entity_id])
+    names = check_tags(db, [data.tag_id])
 
-    model = ENTITY_MAP.get(data.entity_type.lower())
-    if not model:
-        raise HTTPException(status_code=400, detail="Invalid entity type")
-
-    query = db.query(model).filter(model.id == data.entity_id)
+    link_tags(db, column, [(data.entity_id, data.tag_id)])
+    db.commit()
 
-    if data.entity_type.lower() == "documentation":
-        entity = query.first()
-    else:
-        entity = ctx.team_filter(query, model).first()
+    return {f"Tag {names[data.tag_id]} assigned to {data.entity_type}"}
 
-    if not entity:
-        raise HTTPException(
-            status_code=404, detail=f"{data.entity_type} not found or access denied"
-        )
 
-    tag = db.query(Tags).filter(Tags.id == data.tag_id).first()
-    if not tag:
-        raise HTTPException(status_code=404, detail="Tag not found")
+@router.post("/db/tags/detach", status_code=status.HTTP_200_OK, tags=["Tags"])
+def detach_tag(
+    data: TagsAssignment, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+):
+    """
+    Detach tag from entity
+    :param data: Tag, entity ID and entity type
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Confirmation message
+    """
+    ctx.require_user()
+    entity_type = data.entity_type.lower()
+    _, column = tag_link(entity_type)
+    check_access(db, ctx, entity_type, [data.entity_id])
+    names = check_tags(db, [data.tag_id])
 
-    if tag not in entity.tags:
-        entity.tags.append(tag)
-        db.commit()
+    unlink_tags(db, column, [data.entity_id], [data.tag_id])
+    db.commit()
 
-    return {f"Tag {tag.name} assigned to {data.entity_type}"}
+    return {f"Tag {names[data.tag_id]} detached from {data.entity_type}"}
 
 
-@router.post("/db/tags/detach", status_code=status.HTTP_200_OK, tags=["Tags"])
-async def detach_tag(
-    data: TagsAssignment, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+@router.post(
+    "/db/tags/assign/bulk",
+    response_model=TagsBulkResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Tags"],
+)
+def assign_tags_bulk(
+    data: TagsBulkAssignment,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
 ):
+    """
+    Assign every tag to every entity in one statement, existing links are kept
+    :param data: Tags, entity IDs and entity type
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Number of links created
+    """
     ctx.require_user()
+    entity_type = data.entity_type.lower()
+    _, column = tag_link(entity_type)
+    check_access(db, ctx, entity_type, data.entity_ids)
+    check_tags(db, data.tag_ids)
 
-    model = ENTITY_MAP.get(data.entity_type.lower())
-    entity = db.query(model).filter(model.id == data.entity_id).first()
-
-    if not entity:
-        raise HTTPException(status_code=404, detail="Entity not found")
+    changed = link_tags_product(db, column, data.entity_ids, data.tag_ids)
+    db.commit()
+    return {"changed": changed}
 
-    tag = db.query(Tags).filter(Tags.id == data.tag_id).first()
 
-    if tag in entity.tags:
-        entity.tags.remove(tag)
-        db.commit()
+@router.post(
+    "/db/tags/detach/bulk",
+    response_model=TagsBulkResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Tags"],
+)
+def detach_tags_bulk(
+    data: TagsBulkAssignment,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Detach every tag from every entity in one statement
+    :param data: Tags, entity IDs and entity type
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Number of links removed
+    """
+    ctx.require_user()
+    entity_type = data.entity_type.lower()
+    _, column = tag_link(entity_type)
+    check_access(db, ctx, entity_type, data.entity_ids)
 
-    return {f"Tag {tag.name} detached from {data.entity_type}"}
+    changed = unlink_tags(db, column, data.entity_ids, data.tag_ids)
+    db.commit()
+    return {"changed": changed}
 
 
 @router.post(
@@ -122,21 +213,25 @@ def create_tag(
     "/db/tags/{tag_id}",
     response_model=TagsResponse,
     tags=["Tags"],
+    responses=NOT_MODIFIED_OPENAPI,
 )
 def get_tag_by_id(
     tag_id: int,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Get specific tag from DB by ID
     :param tag_id: Tag ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: Tag object
     """
     ctx.require_user()
     query = db.query(Tags).filter(Tags.id == tag_id)
+    cond.evaluate(query, Tags)
     tag = query.first()
     if not tag:
         raise HTTPException(
@@ -149,12 +244,14 @@ def get_tag_by_id(
     "/db/tags/{tag_id}",
     response_model=TagsResponse,
     tags=["Tags"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def update_tag(
     tag_id: int,
     tag_data: TagsUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update tag data
@@ -162,11 +259,13 @@ async def update_tag(
     :param tag_data: Tag data schema
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: Updated tag
     """
     ctx.require_group_admin()
     async with acquire_lock(f"tag_lock:{tag_id}"):
         query = db.query(Tags).filter(Tags.id == tag_id)
+        cond.evaluate(query, Tags)
         tag = query.first()
         if not tag:
             raise HTTPException(
@@ -184,22 +283,26 @@ async def update_tag(
     "/db/tags/{tag_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     tags=["Tags"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def delete_tag(
     tag_id: int,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete tag
     :param tag_id: Tag ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling, for If-Match
     :return: None
     """
     ctx.require_group_admin()
     async with acquire_lock(f"tag_lock:{tag_id}"):
         query = db.query(Tags).filter(Tags.id == tag_id)
+        cond.evaluate(query, Tags)
         tag = query.first()
         if not tag:
             raise HTTPException(
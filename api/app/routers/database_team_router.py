@@ -11,9 +11,22 @@ from app.db.schemas import (
     TeamFullDetailResponse,
 )
 from app.utils.redis_service import acquire_lock
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from app.auth.dependencies import RequestContext
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.auth.dependencies import RequestContext, get_read_db
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+)
+from app.utils.team_service import (
+    render_teams,
+    team_detail_cache,
+    team_detail_version,
+    team_summary_cache,
+    team_summary_version,
+)
 
 from app.db.models import UserType
 
@@ -83,9 +96,11 @@ def format_team_full_detail(team: Teams):
     ]
 
     sorted_machines = []
+    placed_machine_ids = set()
     for rack in team.racks:
         for shelf in sorted(rack.shelves, key=lambda s: s.order):
             for machine in shelf.machines:
+                placed_machine_ids.add(machine.id)
                 sorted_machines.append(
                     {
                         "name": machine.name,
@@ -97,9 +112,8 @@ def format_team_full_detail(team: Teams):
                     }
                 )
 
-    placed_machine_names = {m["name"] for m in sorted_machines}
     for machine in team.machines:
-        if machine.name not in placed_machine_names:
+        if machine.id not in placed_machine_ids:
             sorted_machines.append(
                 {
                     "name": machine.name,
@@ -155,6 +169,60 @@ def format_team_full_detail(team: Teams):
     }
 
 
+def _render_summaries(db: Session, team_ids: list):
+    """
+    Render the TeamDetailResponse JSON of teams, members loaded in one batch.
+    :param db: Active database session
+    :param team_ids: Team IDs
+    :return: Dictionary of team ID to JSON document
+    """
+    teams = (
+        db.query(Teams)
+        .filter(Teams.id.in_(team_ids))
+        .options(selectinload(Teams.users).joinedload(UsersTeams.user))
+        .all()
+    )
+    return {
+        t.id: TeamDetailResponse.model_validate(format_team_output(t)).model_dump_json()
+        for t in teams
+    }
+
+
+def _render_details(db: Session, team_ids: list):
+    """
+    Render the TeamFullDetailResponse JSON of teams. Each relation is loaded
+    in its own batch, instead of one join multiplying racks, shelves,
+    machines, members and inventory rows.
+    :param db: Active database session
+    :param team_ids: Team IDs
+    :return: Dictionary of team ID to JSON document
+    """
+    teams = (
+        db.query(Teams)
+        .filter(Teams.id.in_(team_ids))
+        .options(
+            selectinload(Teams.users).joinedload(UsersTeams.user),
+            selectinload(Teams.racks)
+            .selectinload(Rack.shelves)
+            .selectinload(Shelf.machines),
+            selectinload(Teams.racks).selectinload(Rack.tags),
+            selectinload(Teams.inventory).options(
+                joinedload(Inventory.room),
+                joinedload(Inventory.machine),
+                joinedload(Inventory.category),
+            ),
+            selectinload(Teams.machines),
+        )
+        .all()
+    )
+    return {
+        t.id: TeamFullDetailResponse.model_validate(
+            format_team_full_detail(t)
+        ).model_dump_json()
+        for t in teams
+    }
+
+
 @router.post(
     "/db/teams/",
     response_model=TeamsResponse,
@@ -199,7 +267,7 @@ def get_teams(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
 @router.get(
     "/db/teams/teams_info", response_model=List[TeamDetailResponse], tags=["Teams"]
 )
-def get_team_info(db: Session = Depends(get_db), ctx: RequestContext = Depends()):
+def get_team_info(db: Session = Depends(get_read_db), ctx: RequestContext = Depends()):
     """
     Fetch detailed information about the current user's team, including admin names and member details.
     :param db: Active database session
@@ -207,12 +275,16 @@ def get_team_info(db: Session = Depends(get_db), ctx: RequestContext = Depends()
     :return: Detailed team information with admin names and member details
     """
     ctx.require_user()
-    teams = (
-        db.query(Teams)
-        .options(joinedload(Teams.users).joinedload(UsersTeams.user))
-        .all()
+    summaries = render_teams(
+        db,
+        select(Teams),
+        team_summary_version(),
+        team_summary_cache,
+        lambda team_ids: _render_summaries(db, team_ids),
+    )
+    return Response(
+        content="[" + ",".join(summaries) + "]", media_type="application/json"
     )
-    return [format_team_output(t) for t in teams]
 
 
 @router.get(
@@ -221,7 +293,7 @@ def get_team_info(db: Session = Depends(get_db), ctx: RequestContext = Depends()
     tags=["Teams"],
 )
 def get_team_info_by_id(
-    team_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    team_id: int, db: Session = Depends(get_read_db), ctx: RequestContext = Depends()
 ):
     """
     Fetch detailed information about a specific team by ID, including user, machines, and inventory details.
@@ -231,38 +303,42 @@ def get_team_info_by_id(
     :return: Detailed team information with admin names and member details
     """
     ctx.require_user()
-
-    team = (
-        db.query(Teams)
-        .filter(Teams.id == team_id)
-        .options(
-            joinedload(Teams.users).joinedload(UsersTeams.user),
-            joinedload(Teams.racks).joinedload(Rack.shelves).joinedload(Shelf.machines),
-            joinedload(Teams.inventory).joinedload(Inventory.room),
-            joinedload(Teams.inventory).joinedload(Inventory.category),
-            joinedload(Teams.machines),
-        )
-        .first()
+    details = render_teams(
+        db,
+        select(Teams).where(Teams.id == team_id),
+        team_detail_version(),
+        team_detail_cache,
+        lambda team_ids: _render_details(db, team_ids),
     )
-
-    if not team:
+    if not details:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    return format_team_full_detail(team)
+    return Response(content=details[0], media_type="application/json")
 
 
-@router.get("/db/teams/{team_id}", response_model=TeamsResponse, tags=["Teams"])
+@router.get(
+    "/db/teams/{team_id}",
+    response_model=TeamsResponse,
+    tags=["Teams"],
+    responses=NOT_MODIFIED_OPENAPI,
+)
 def get_team_by_id(
-    team_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    team_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Fetch specific team by ID
     :param team_id: Team ID
     :param db: Active database session
+    :param cond: Conditional request handling
     :return: Team object
     """
     ctx.require_user()
-    team = db.query(Teams).filter(Teams.id == team_id).first()
+    query = db.query(Teams).filter(Teams.id == team_id)
+    cond.evaluate(query, Teams)
+    team = query.first()
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Team not found"
@@ -270,18 +346,25 @@ def get_team_by_id(
     return team
 
 
-@router.patch("/db/teams/{team_id}", response_model=TeamsResponse, tags=["Teams"])
+@router.patch(
+    "/db/teams/{team_id}",
+    response_model=TeamsResponse,
+    tags=["Teams"],
+    responses=PRECONDITION_OPENAPI,
+)
 async def update_team(
     team_id: int,
     team_data: TeamsUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update Team
     :param team_id: Team ID
     :param team_data: Team data schema
     :param db: Active database session
+    :param cond: Conditional request handling, for If-Match
     :return: Updated Team
     """
 
@@ -302,7 +385,9 @@ async def update_team(
             )
 
     async with acquire_lock(f"team_lock:{team_id}"):
-        team = db.query(Teams).filter(Teams.id == team_id).first()
+        query = db.query(Teams).filter(Teams.id == team_id)
+        cond.evaluate(query, Teams)
+        team = query.first()
         if not team:
             raise HTTPException(404, detail="Team not found")
         for k, v in team_data.model_dump(exclude_unset=True).items():
@@ -313,20 +398,29 @@ async def update_team(
 
 
 @router.delete(
-    "/db/teams/{team_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Teams"]
+    "/db/teams/{team_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["Teams"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def delete_team(
-    team_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    team_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete Team
     :param team_id: Team ID
     :param db: Active database session
+    :param cond: Conditional request handling, for If-Match
     :return: None
     """
     ctx.require_admin()
     async with acquire_lock(f"team_lock:{team_id}"):
-        team = db.query(Teams).filter(Teams.id == team_id).first()
+        query = db.query(Teams).filter(Teams.id == team_id)
+        cond.evaluate(query, Teams)
+        team = query.first()
         if not team:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Team not found"
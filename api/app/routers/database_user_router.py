@@ -1,12 +1,13 @@
 """Router for User Database API CRUD."""
 
+import asyncio
 import os
 import shutil
 import glob
 from typing import List, Union
 
-from app.database import get_db
-from app.db.models import User, UserType, UsersTeams
+from app.database import get_db, run_in_db_threadpool
+from app.db.models import Teams, User, UserType, UsersTeams
 from app.db.schemas import (
     UserCreate,
     UserUpdate,
@@ -14,17 +15,65 @@ from app.db.schemas import (
     UserInfoExtended,
     UserInfo,
     UserTeamRoleUpdate,
+    UsersBulkResponse,
+)
+from app.utils.bulk_service import (
+    BULK_OPENAPI,
+    read_bulk_rows,
+    row_error,
+    split_list_fields,
+    validate_rows,
+)
+from app.utils.etag_service import (
+    NOT_MODIFIED_OPENAPI,
+    PRECONDITION_OPENAPI,
+    ConditionalRequest,
+    digest,
+    related_rows,
 )
 from app.utils.redis_service import acquire_lock
-from app.utils.security import hash_password, generate_starting_password
+from app.utils.security import (
+    generate_starting_password,
+    hash_password,
+    hash_password_async,
+)
 from app.db.schemas import UserRead
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 from app.auth.dependencies import RequestContext
 
-
 router = APIRouter()
 AVATAR_DIR = "/home/labbyn/avatars"
+# Version of the memberships in UserInfoExtended, part of its entity tag
+USER_RELATIONS = digest(
+    related_rows(UsersTeams, UsersTeams.user_id == User.id),
+    related_rows(
+        Teams,
+        Teams.id.in_(
+            select(UsersTeams.team_id)
+            .where(UsersTeams.user_id == User.id)
+            .correlate(User)
+        ),
+    ),
+)
+
+
+def _evaluate_user(
+    cond: ConditionalRequest, db: Session, ctx: RequestContext, user_id: int
+):
+    """
+    Evaluate the conditional headers of a request against a user of one of
+    the teams of the requester.
+    :param cond: Conditional request handling
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :param user_id: User ID
+    :return: None
+    """
+    query = ctx.team_filter(db.query(User).filter(User.id == user_id), User)
+    cond.evaluate(query, User, USER_RELATIONS)
 
 
 def get_masked_user_model(u: User, ctx: RequestContext, detailed: bool = False):
@@ -77,7 +126,7 @@ def get_masked_user_model(u: User, ctx: RequestContext, detailed: bool = False):
     status_code=status.HTTP_201_CREATED,
     tags=["Users"],
 )
-async def create_user(
+def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
@@ -150,6 +199,143 @@ async def create_user(
         raise HTTPException(500, detail=f"User creation error: {str(e)}")
 
 
+@router.post(
+    "/db/users/bulk",
+    response_model=UsersBulkResponse,
+    tags=["Users"],
+    openapi_extra=BULK_OPENAPI,
+)
+async def create_users_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Create many users from a JSON array or CSV (columns of UserCreate, team_ids
+    separated by ';'). Rows are checked against existing users and teams in
+    one query each, passwords are hashed in parallel and valid rows are
+    inserted together; invalid rows are reported and skipped.
+    :param request: Request with the rows
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :return: Per-row results with the generated passwords
+    """
+    ctx.require_group_admin()
+    rows = await read_bulk_rows(request)
+    split_list_fields(rows, ("team_ids",))
+    valid, results = validate_rows(rows, UserCreate)
+
+    def _find_conflicts():
+        logins = [u.login for _, u in valid]
+        emails = [u.email for _, u in valid]
+        team_ids = {t for _, u in valid for t in u.team_ids or []}
+        taken = (
+            db.query(User.login, User.email)
+            .filter(User.login.in_(logins) | User.email.in_(emails))
+            .all()
+        )
+        existing_teams = db.query(Teams.id).filter(Teams.id.in_(team_ids)).all()
+        return (
+            {login for login, _ in taken} | {email for _, email in taken},
+            {t for (t,) in existing_teams},
+        )
+
+    taken, existing_teams = await run_in_db_threadpool(_find_conflicts)
+
+    accepted = []
+    for number, user_data in valid:
+        detail = None
+        if user_data.login in taken or user_data.email in taken:
+            detail = "User already exists."
+        elif not ctx.is_admin and user_data.user_type == UserType.ADMIN:
+            detail = "Only admins can create other admin users."
+        elif ctx.is_admin and set(user_data.team_ids or []) - existing_teams:
+            missing = sorted(set(user_data.team_ids) - existing_teams)
+            detail = f"Teams not found: {missing}"
+        if detail:
+            results.append(row_error(number, detail, login=user_data.login))
+            continue
+        taken |= {user_data.login, user_data.email}
+        accepted.append((number, user_data))
+
+    passwords = [u.password or generate_starting_password() for _, u in accepted]
+    hashes = await asyncio.gather(*(hash_password_async(p) for p in passwords))
+
+    def _insert():
+        users = []
+        for (_, user_data), hashed in zip(accepted, hashes):
+            users.append(
+                User(
+                    **user_data.model_dump(
+                        exclude={
+                            "password",
+                            "team_ids",
+                            "is_active",
+                            "is_superuser",
+                            "is_verified",
+                        }
+                    ),
+                    hashed_password=hashed,
+                    force_password_change=True,
+                    is_active=True,
+                    is_superuser=(user_data.user_type == UserType.ADMIN),
+                )
+            )
+        db.add_all(users)
+        db.flush()
+
+        links = []
+        for user, (_, user_data) in zip(users, accepted):
+            if ctx.is_admin:
+                target_teams = user_data.team_ids or []
+            else:
+                target_teams = [
+                    t_id for t_id in user_data.team_ids if t_id in ctx.team_ids
+                ]
+                if not target_teams and ctx.team_ids:
+                    target_teams = [ctx.team_ids[0]]
+            links += [
+                UsersTeams(
+                    user_id=user.id,
+                    team_id=t_id,
+                    is_group_admin=(user_data.user_type == UserType.GROUP_ADMIN),
+                )
+                for t_id in target_teams
+            ]
+        db.add_all(links)
+        user_ids = [user.id for user in users]
+        db.commit()
+        return user_ids
+
+    if accepted:
+        try:
+            user_ids = await run_in_db_threadpool(_insert)
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(
+                409, detail="Users were created concurrently, retry the import."
+            ) from e
+        for (number, user_data), user_id, password in zip(
+            accepted, user_ids, passwords
+        ):
+            results.append(
+                {
+                    "row": number,
+                    "status": "created",
+                    "id": user_id,
+                    "login": user_data.login,
+                    "generated_password": password,
+                }
+            )
+
+    results.sort(key=lambda r: r["row"])
+    return {
+        "created": len(accepted),
+        "failed": len(results) - len(accepted),
+        "results": results,
+    }
+
+
 @router.get("/db/users/list_info", response_model=List[UserInfo], tags=["Users"])
 def get_users_with_groups(
     db: Session = Depends(get_db), ctx: RequestContext = Depends()
@@ -167,18 +353,28 @@ def get_users_with_groups(
     return [get_masked_user_model(u, ctx, detailed=False) for u in users]
 
 
-@router.get("/db/users/{user_id}", response_model=UserInfoExtended, tags=["Users"])
+@router.get(
+    "/db/users/{user_id}",
+    response_model=UserInfoExtended,
+    tags=["Users"],
+    responses=NOT_MODIFIED_OPENAPI,
+)
 def get_user_detail_with_groups(
-    user_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    user_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Fetch full user profile including avatar and group links (requires permissions).
     :param user_id: User ID
     :param db: Active database session
     :param ctx: Request context for user and team info
+    :param cond: Conditional request handling
     :return: User object with extended info
     """
     ctx.require_user()
+    _evaluate_user(cond, db, ctx, user_id)
     user = (
         db.query(User)
         .options(joinedload(User.teams).joinedload(UsersTeams.team))
@@ -200,22 +396,30 @@ def get_user_detail_with_groups(
     return get_masked_user_model(user, ctx, detailed=True)
 
 
-@router.patch("/db/users/{user_id}", response_model=UserInfoExtended, tags=["Users"])
+@router.patch(
+    "/db/users/{user_id}",
+    response_model=UserInfoExtended,
+    tags=["Users"],
+    responses=PRECONDITION_OPENAPI,
+)
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Update user data
     :param user_id: User ID
     :param user_data: User data schema
     :param db: Active database session
+    :param cond: Conditional request handling, for If-Match
     :return: Updated User
     """
     ctx.require_group_admin()
     async with acquire_lock(f"user_lock:{user_id}"):
+        _evaluate_user(cond, db, ctx, user_id)
         user = (
             db.query(User)
             .options(joinedload(User.teams))
@@ -240,7 +444,7 @@ async def update_user(
                 data.pop("team_ids")
 
         if "password" in data:
-            user.hashed_password = hash_password(data.pop("password"))
+            user.hashed_password = await hash_password_async(data.pop("password"))
 
         if "team_ids" in data and ctx.is_admin:
             new_teams = data.pop("team_ids")
@@ -268,19 +472,27 @@ async def update_user(
 
 
 @router.delete(
-    "/db/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Users"]
+    "/db/users/{user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["Users"],
+    responses=PRECONDITION_OPENAPI,
 )
 async def delete_user(
-    user_id: int, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    user_id: int,
+    db: Session = Depends(get_db),
+    ctx: RequestContext = Depends(),
+    cond: ConditionalRequest = Depends(),
 ):
     """
     Delete user
     :param user_id: User ID
     :param db: Active database session
+    :param cond: Conditional request handling, for If-Match
     :return: None
     """
     ctx.require_group_admin()
     async with acquire_lock(f"user_lock:{user_id}"):
+        _evaluate_user(cond, db, ctx, user_id)
         user = (
             db.query(User)
             .options(joinedload(User.teams))
@@ -302,7 +514,7 @@ async def delete_user(
 
 
 @router.post("/db/users/avatar", tags=["Users"])
-async def upload_user_avatar(
+def upload_user_avatar(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     ctx: RequestContext = Depends(),
@@ -341,7 +553,7 @@ async def upload_user_avatar(
 
 
 @router.patch("/db/users/{user_id}/promote", tags=["Users"])
-async def update_user_team_role(
+def update_user_team_role(
     user_id: int,
     role_data: UserTeamRoleUpdate,
     db: Session = Depends(get_db),
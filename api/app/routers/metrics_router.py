@@ -0,0 +1,44 @@
+"""Router exposing API runtime metrics."""
+
+from fastapi import APIRouter, Depends, Response
+
+from app.auth.dependencies import RequestContext
+from app.database import get_pool_status
+from app.utils.metrics_service import get_startup_report, render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics(ctx: RequestContext = Depends()):
+    """
+    Connection pool usage of this worker process for both database engines.
+    Used to size pools against Postgres max_connections.
+    :param ctx: Request context for user and team info
+    :return: Pool size, in-use/overflow counts and checkout wait times per engine
+    """
+    ctx.require_admin()
+    return get_pool_status()
+
+
+@router.get("/metrics/startup")
+def get_startup_metrics(ctx: RequestContext = Depends()):
+    """
+    Startup time of this worker process split into phases: module imports,
+    application setup and the lifespan initialisation steps.
+    :param ctx: Request context for user and team info
+    :return: Phase durations and their total in seconds
+    """
+    ctx.require_admin()
+    return get_startup_report()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_prometheus_metrics():
+    """
+    Request latency, per-route SQL/Redis/Prometheus usage and pool gauges in
+    Prometheus exposition format, scraped by the monitoring service.
+    :return: Plain text exposition payload
+    """
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
@@ -302,7 +302,7 @@ async def get_prometheus_all_metrics(
 
 
 @router.post("/prometheus/target")
-async def add_prometheus_new_target(
+def add_prometheus_new_target(
     target: PrometheusTarget, ctx: RequestContext = Depends()
 ):
     """
@@ -0,0 +1,43 @@
+"""Router for the search across entities."""
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import RequestContext, get_read_db
+from app.db.schemas import SearchResponse
+from app.utils.search_service import SEARCH_TYPES, search
+
+router = APIRouter()
+
+SearchType = Literal["machine", "inventory", "rack", "room", "user", "documentation"]
+
+
+@router.get("/search", response_model=SearchResponse, tags=["Search"])
+def search_entities(
+    q: str = Query(..., min_length=1, max_length=100, description="Search phrase"),
+    types: Optional[List[SearchType]] = Query(
+        None, description="Searched entity types, all by default"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    ctx: RequestContext = Depends(),
+):
+    """
+    Search machines (name, IP, MAC and serial number), inventory, racks,
+    rooms, users (name and login) and documentation (title and content) of
+    the teams of the user. Words match as prefixes, and with pg_trgm also
+    approximately.
+    :param q: Search phrase
+    :param types: Optional list of entity types to search
+    :param limit: Page size
+    :param offset: Number of results skipped
+    :param db: Read only database session
+    :param ctx: Request context for user and team info
+    :return: Page of results, best matches first
+    """
+    ctx.require_user()
+    types = list(dict.fromkeys(types or SEARCH_TYPES))
+    return search(db, ctx, q.strip(), types, limit, offset)
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.db.models import History, User
 from app.db.schemas import HistoryResponse
-from app.auth.dependencies import RequestContext
+from app.auth.dependencies import RequestContext, get_read_db
 from app.routers.database_history_router import resolve_entity_name
 
 router = APIRouter()
@@ -69,7 +69,7 @@ def get_state_diff(
 
 @router.get("/sub/history", response_model=List[HistoryResponse], tags=["History"])
 def get_blackboxed_history_logs(
-    limit=200, db: Session = Depends(get_db), ctx: RequestContext = Depends()
+    limit=200, db: Session = Depends(get_read_db), ctx: RequestContext = Depends()
 ):
     """
     Retrieve "blackboxed" history list.
@@ -5,7 +5,6 @@ import json
 import asyncio
 import time
 
-import ansible_runner
 from fastapi import HTTPException
 
 REPORTS_DIR = "/code/ansible/platform_reports"
@@ -93,6 +92,10 @@ async def run_playbook_task(playbook_path: str, host: str | list, extra_vars: di
     host_dict = {"all": {"hosts": {h: {} for h in hosts_list}}}
 
     def _run():
+        # Imported on first use, it is only needed by discovery and would
+        # otherwise be loaded by every API worker at startup
+        import ansible_runner  # pylint: disable=import-outside-toplevel
+
         return ansible_runner.run(
             playbook=playbook_path,
             inventory=host_dict,
@@ -0,0 +1,204 @@
+"""Per-day reservation calendar of inventory items, kept in step with rentals."""
+
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Date,
+    and_,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Inventory, InventoryReservation, Rentals
+
+
+def _days(start_date: date, end_date: date):
+    """
+    Days from start_date to end_date inclusive, as a SQL column.
+    """
+    return cast(
+        func.generate_series(
+            cast(start_date, Date),
+            cast(end_date, Date),
+            literal_column("interval '1 day'"),
+        ).column_valued("day"),
+        Date,
+    )
+
+
+def reserve(db: Session, item_id: int, start_date: date, end_date: date, quantity: int):
+    """
+    Add a rental to the calendar of its item, in the caller's transaction.
+    :param db: Active database session
+    :param item_id: Inventory item ID
+    :param start_date: First rented day
+    :param end_date: Last rented day
+    :param quantity: Rented quantity
+    """
+    days = select(literal(item_id), _days(start_date, end_date), literal(quantity))
+    stmt = insert(InventoryReservation).from_select(
+        ["item_id", "day", "quantity"], days
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["item_id", "day"],
+            set_={"quantity": InventoryReservation.quantity + stmt.excluded.quantity},
+        )
+    )
+
+
+def book(
+    db: Session, item_id: int, start_date: date, end_date: date, quantity: int
+) -> Optional[int]:
+    """
+    Reserve a rental only if every day of it stays within the item's quantity,
+    in one statement of the caller's transaction. Bookings of the same days
+    wait on each other's calendar rows instead of failing, other items and
+    days are never locked.
+    :param db: Active database session
+    :param item_id: Inventory item ID
+    :param start_date: First rented day
+    :param end_date: Last rented day
+    :param quantity: Rented quantity
+    :return: Quantity still free on the busiest day, None if the rental does
+        not fit or the item does not exist (some days may be reserved already,
+        the caller must roll back)
+    """
+    capacity = (
+        select(Inventory.quantity).where(Inventory.id == item_id).scalar_subquery()
+    )
+    days = select(
+        literal(item_id), _days(start_date, end_date), literal(quantity)
+    ).where(capacity >= quantity)
+    stmt = insert(InventoryReservation).from_select(
+        ["item_id", "day", "quantity"], days
+    )
+    booked = (
+        stmt.on_conflict_do_update(
+            index_elements=["item_id", "day"],
+            set_={"quantity": InventoryReservation.quantity + stmt.excluded.quantity},
+            where=InventoryReservation.quantity + stmt.excluded.quantity <= capacity,
+        )
+        .returning(InventoryReservation.quantity)
+        .cte("booked")
+    )
+    count, left = db.execute(
+        select(func.count(), capacity - func.max(booked.c.quantity)).select_from(booked)
+    ).one()
+    if count < (end_date - start_date).days + 1:
+        return None
+    return left
+
+
+def release(db: Session, item_id: int, start_date: date, end_date: date, quantity: int):
+    """
+    Remove (part of) a rental from the calendar of its item, in the caller's
+    transaction. Days left without reservations are deleted.
+    :param db: Active database session
+    :param item_id: Inventory item ID
+    :param start_date: First released day
+    :param end_date: Last released day
+    :param quantity: Released quantity
+    """
+    in_range = (
+        InventoryReservation.item_id == item_id,
+        InventoryReservation.day.between(start_date, end_date),
+    )
+    db.execute(
+        update(InventoryReservation)
+        .where(*in_range)
+        .values(quantity=InventoryReservation.quantity - quantity)
+    )
+    db.execute(
+        delete(InventoryReservation).where(
+            *in_range, InventoryReservation.quantity <= 0
+        )
+    )
+
+
+def reserved_peak(db: Session, item_id: int, start_date: date, end_date: date) -> int:
+    """
+    Highest quantity of an item reserved on any day of a period.
+    :param db: Active database session
+    :param item_id: Inventory item ID
+    :param start_date: First day of the period
+    :param end_date: Last day of the period
+    :return: Reserved quantity, 0 if the item is free
+    """
+    return db.scalar(
+        select(func.coalesce(func.max(InventoryReservation.quantity), 0)).where(
+            InventoryReservation.item_id == item_id,
+            InventoryReservation.day.between(start_date, end_date),
+        )
+    )
+
+
+def refresh_items(db: Session, item_ids: Iterable[int], today: date):
+    """
+    Recompute the rental state of items from their rentals not returned yet,
+    in the caller's transaction: rented_quantity counts the units out today,
+    rental_status is set when none is left and rental_id points to the
+    latest rental. Items whose state did not change are not written, the
+    others get a new version_id.
+    :param db: Active database session
+    :param item_ids: Inventory item IDs
+    :param today: Day the state is computed for
+    """
+    state = (
+        select(
+            Inventory.id,
+            func.coalesce(func.sum(Rentals.quantity), 0).label("rented"),
+            func.max(Rentals.id).label("rental_id"),
+        )
+        .outerjoin(
+            Rentals,
+            and_(
+                Rentals.item_id == Inventory.id,
+                Rentals.returned_on.is_(None),
+                Rentals.start_date <= today,
+            ),
+        )
+        .where(Inventory.id.in_(item_ids))
+        .group_by(Inventory.id)
+        .subquery()
+    )
+    rental_status = state.c.rented >= Inventory.quantity
+    db.execute(
+        update(Inventory)
+        .where(
+            Inventory.id == state.c.id,
+            tuple_(
+                Inventory.rented_quantity, Inventory.rental_status, Inventory.rental_id
+            ).is_distinct_from(
+                tuple_(state.c.rented, rental_status, state.c.rental_id)
+            ),
+        )
+        .values(
+            rented_quantity=state.c.rented,
+            rental_status=rental_status,
+            rental_id=state.c.rental_id,
+            version_id=Inventory.version_id + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def period(start_date, end_date):
+    """
+    Days from start_date to end_date inclusive as a date range, matching the
+    GiST index on rentals.
+    :param start_date: First day, a date or a column
+    :param end_date: Last day, a date or a column
+    :return: SQL daterange expression
+    """
+    return func.daterange(start_date, end_date, text("'[]'"))
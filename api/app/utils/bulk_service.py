@@ -0,0 +1,264 @@
+"""Parsing and validation of bulk import requests (JSON or CSV)."""
+
+import codecs
+import csv
+import io
+import json
+import os
+from typing import AsyncIterator, Iterable, Iterator, List, Tuple, Type
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+
+MAX_BULK_ROWS = int(os.getenv("MAX_BULK_ROWS", "1000"))
+# Rows validated and inserted together by the streaming imports
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+
+# Request body documentation shared by the bulk endpoints
+BULK_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"type": "object"}}
+            },
+            "text/csv": {"schema": {"type": "string"}},
+        },
+        "description": "JSON array of objects, or CSV with a header row. "
+        "List columns in CSV are separated by ';'.",
+    }
+}
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Same for the endpoints reading the body with iter_bulk_batches
+STREAMING_BULK_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            **BULK_OPENAPI["requestBody"]["content"],
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+        "description": "JSON array of objects, CSV with a header row or NDJSON "
+        "(one object per line). List columns in CSV are separated by ';'.",
+    }
+}
+
+
+async def read_bulk_rows(request: Request) -> List[dict]:
+    """
+    Read the rows of a bulk request body.
+    Empty CSV cells are left out, so schema defaults apply to them.
+    :param request: Incoming request with a JSON array or CSV body
+    :return: List of row dictionaries
+    """
+    content_type = request.headers.get("content-type", "")
+    body = await request.body()
+    try:
+        if content_type.startswith("text/csv"):
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            rows = [_csv_row(row) for row in reader]
+        elif content_type.startswith("application/json"):
+            rows = json.loads(body)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Send a JSON array or text/csv.",
+            )
+    except (UnicodeDecodeError, ValueError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed request body: {e}",
+        ) from e
+
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a list of objects.",
+        )
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_ROWS} rows per request.",
+        )
+    return rows
+
+
+async def iter_bulk_batches(
+    request: Request, batch_size: int = BULK_BATCH_SIZE
+) -> AsyncIterator[List[dict]]:
+    """
+    Read the rows of a bulk request body in batches. CSV and NDJSON bodies are
+    parsed while they are received, so the size of an import is not limited by
+    memory; JSON arrays are read whole and capped at MAX_BULK_ROWS.
+    :param request: Incoming request with a JSON array, CSV or NDJSON body
+    :param batch_size: Rows per batch
+    :return: Async iterator of lists of row dictionaries
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        rows = await read_bulk_rows(request)
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+        return
+    if content_type.startswith("text/csv"):
+        parse = _csv_records
+    elif content_type.startswith(("application/x-ndjson", "application/jsonl")):
+        parse = _ndjson_records
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send a JSON array, text/csv or application/x-ndjson.",
+        )
+
+    batch = []
+    try:
+        async for row in parse(_iter_lines(request)):
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    except (UnicodeDecodeError, ValueError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed request body: {e}",
+        ) from e
+    if batch:
+        yield batch
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[dict]:
+    header, record = None, ""
+    async for line in lines:
+        record += line + "\n"
+        # A quoted cell may span lines, wait for its closing quote
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        yield _csv_row(dict(zip(header, values)))
+    if record.strip():
+        raise ValueError("unterminated quoted cell")
+
+
+async def _ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[dict]:
+    async for line in lines:
+        if line.strip():
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("every line must be a JSON object")
+            yield row
+
+
+def _csv_row(row: dict) -> dict:
+    # Empty cells are left out, so schema defaults apply to them
+    return {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+
+
+def split_list_fields(rows: List[dict], fields: Tuple[str, ...]):
+    """
+    Turn ';' separated CSV cells of list fields into lists, in place.
+    :param rows: Row dictionaries
+    :param fields: Names of list fields
+    """
+    for row in rows:
+        for field in fields:
+            if isinstance(row.get(field), str):
+                row[field] = [v.strip() for v in row[field].split(";") if v.strip()]
+
+
+def validate_rows(rows: List[dict], schema: Type[BaseModel], start: int = 1):
+    """
+    Validate every row against a schema, collecting errors per row.
+    :param rows: Row dictionaries
+    :param schema: Pydantic schema of one row
+    :param start: Number of the first row
+    :return: Tuple of valid (row number, model) pairs and error results
+    """
+    valid, errors = [], []
+    for number, row in enumerate(rows, start=start):
+        try:
+            valid.append((number, schema.model_validate(row)))
+        except ValidationError as e:
+            errors.append(row_error(number, format_validation_error(e)))
+    return valid, errors
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """
+    One line summary of a pydantic validation error.
+    :param error: ValidationError
+    :return: Message like "email: value is not a valid email address"
+    """
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def row_error(number: int, detail: str, **fields) -> dict:
+    """
+    Result of a rejected row.
+    :param number: Row number, starting at 1
+    :param detail: Reason
+    :param fields: Extra identifying fields, e.g. login
+    :return: Result dictionary
+    """
+    return {"row": number, "status": "error", "detail": detail, **fields}
+
+
+def iter_export_chunks(
+    rows: Iterable[dict],
+    fields: List[str],
+    export_format: str,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> Iterator[str]:
+    """
+    Serialize rows for a streaming export, one chunk per batch_size rows.
+    CSV list cells are joined with ';' so the output can be imported back.
+    :param rows: Row dictionaries, e.g. a generator over a yield_per query
+    :param fields: Column names, in order
+    :param export_format: "csv" or "ndjson"
+    :param batch_size: Rows per chunk
+    :return: Iterator of text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator="\n")
+    if export_format == "csv":
+        writer.writeheader()
+    for number, row in enumerate(rows, start=1):
+        if export_format == "csv":
+            writer.writerow({k: _csv_cell(v) for k, v in row.items()})
+        else:
+            buffer.write(json.dumps(row, default=str) + "\n")
+        if number % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def _csv_cell(value):
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    if isinstance(value, bool):
+        return str(value).lower()
+    return value
@@ -0,0 +1,52 @@
+"""In-process caches of rendered responses, keyed by entity version."""
+
+import threading
+from collections import OrderedDict
+
+
+class VersionedCache:
+    """
+    Bounded LRU map of entity ID to a value rendered at some version. A lookup
+    only hits when the stored version is the current one, so writes never
+    have to invalidate it, and every worker process keeps its own copy.
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        :param max_entries: Entries kept before the least recently used go
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """
+        Value stored for a key at a version.
+        :param key: Entity ID
+        :param version: Current version of the entity
+        :return: Cached value, None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, value):
+        """
+        Store the value of a key rendered at a version.
+        :param key: Entity ID
+        :param version: Version the value was rendered at
+        :param value: Rendered value
+        """
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional, Type
 
 from fastapi import HTTPException, status
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.exc import StaleDataError
 from app.utils.security import hash_password
@@ -21,7 +23,6 @@ import inspect
 
 from app.auth.dependencies import RequestContext
 
-
 # ==========================
 #          UTILS
 # ==========================
@@ -53,156 +54,163 @@ def handle_commit(db: Session):
         ) from exc
 
 
-def init_service_team(db: Session):
-    """
-    Initializes a default service team if none exists.
-    :param db: The current database session.
-    """
-    service_team = (
-        db.query(models.Teams).filter(models.Teams.name == "Service Team").first()
-    )
-    if not service_team:
-        service_team = models.Teams(name="Service Team")
-        db.add(service_team)
-        db.commit()
-        db.refresh(service_team)
-    return service_team
+# Bump when the seed data below changes, every database then gets it once
+BOOTSTRAP_VERSION = 1
+# Key of the Postgres advisory lock serialising bootstrap across workers
+BOOTSTRAP_LOCK_ID = 7265002
 
+LABBYN_DOCS_CONTENT = inspect.cleandoc("""
+    # Labbyn
 
-def init_super_user(db: Session):
-    """
-    Initializes a super user if none exists.
-    :param db: The current database session.
-    """
-    service_team = init_service_team(db)
-
-    super_user = db.query(models.User).filter(models.User.login == "Service").first()
-    if not super_user:
-        admin_user = models.User(
-            login="Service",
-            name="Service Account",
-            surname="System",
-            email="service@labbyn.service",
-            hashed_password=hash_password("Service"),
-            user_type=models.UserType.ADMIN,
-            is_active=True,
-            is_superuser=True,
-            is_verified=True,
-            force_password_change=False,  # For development purposes only
-        )
-        db.add(admin_user)
-        db.commit()
-        db.refresh(admin_user)
+    Labbyn is an application for your datacenter, laboratory or homelab. You can monitor your infrastructure, set the location of each server or platform on an interactive dashboard, store information about your assets in an inventory and more. Everything runs on a modern GUI, is deployable on most Linux machines and is **OPEN SOURCE**.
 
-        super_user = admin_user
-        link = (
-            db.query(models.UsersTeams)
-            .filter_by(user_id=super_user.id, team_id=service_team.id)
-            .first()
-        )
-
-        if not link:
-            db.add(
-                models.UsersTeams(
-                    user_id=super_user.id, team_id=service_team.id, is_group_admin=True
-                )
-            )
-            db.commit()
-
-
-def init_virtual_lab(db: Session):
-    """
-    Initializes virtual lab if none exists.
-    :param db: The current database session.
-    """
-    service_team = init_service_team(db)
-
-    virtual_lab = (
-        db.query(models.Rooms)
-        .filter(models.Rooms.name == "virtual", models.Rooms.team_id == service_team.id)
-        .first()
-    )
-
-    if not virtual_lab:
-        virtual_lab = models.Rooms(
-            name="virtual", room_type="virtual", team_id=service_team.id
-        )
-        db.add(virtual_lab)
-        db.commit()
-        db.refresh(virtual_lab)
+    ## Installation
 
+    To install you only need docker  and docker compose.
+    Example of Debian installation:
+    ```bash
+    apt update
+    apt upgrade
+    apt install docker.io docker-compose
+    apt install -y docker-compose-plugin
+    ```
+    ### Application script
 
-def init_document(db: Session):
-    """
-    Initializes document that contains app documentation.
-    :param db: The current database session.
-    """
+    Inside the `scripts` directory there is an `app.sh` script that can be used to manage your application.
 
-    labbyn_docs = (
-        db.query(models.Documentation)
-        .filter(models.Documentation.title == "labbyn")
-        .first()
-    )
-    if not labbyn_docs:
-        content_raw = """
-                # Labbyn
+    #### Arguments:
+    - `deploy` - start/install app on your machine
+    - `update` - rebuild application if nesscesary
+    - `stop` - stop application container
+    - `delete` - delete application
+    - `--dev` - run application in development mode
+    > [!IMPORTANT]
+    > **If you use the `delete` argument entire application will be deleted including containers, images, volumes and networks**
 
-                Labbyn is an application for your datacenter, laboratory or homelab. You can monitor your infrastructure, set the location of each server or platform on an interactive dashboard, store information about your assets in an inventory and more. Everything runs on a modern GUI, is deployable on most Linux machines and is **OPEN SOURCE**.
+    ### Example:
 
-                ## Installation
+    Start/Install application
 
-                To install you only need docker  and docker compose.
-                Example of Debian installation:
-                ```bash
-                apt update
-                apt upgrade
-                apt install docker.io docker-compose
-                apt install -y docker-compose-plugin
-                ```
-                ### Application script
+    ```bash
+    ./app.sh deploy
+    ```
 
-                Inside the `scripts` directory there is an `app.sh` script that can be used to manage your application.
+    Stop application
 
-                #### Arguments:
-                - `deploy` - start/install app on your machine
-                - `update` - rebuild application if nesscesary
-                - `stop` - stop application container
-                - `delete` - delete application
-                - `--dev` - run application in development mode
-                > [!IMPORTANT]
-                > **If you use the `delete` argument entire application will be deleted including containers, images, volumes and networks**
+    ```bash
+    ./app.sh stop
+    ```
 
-                ### Example:
+    Start application in developement mode:
+    ```bash
+    ./app.sh deploy --dev
+    ```
 
-                Start/Install application
+    **PJATK 2025**:
+    s26990, s26985, s27081, s27549
+    """)
 
-                ```bash
-                ./app.sh deploy
-                ```
 
-                Stop application
+def is_bootstrapped(db: Session) -> bool:
+    """
+    Check if the database already holds the current seed data version.
+    :param db: The current database session.
+    :return: True if bootstrap can be skipped
+    """
+    version = db.execute(
+        select(models.BootstrapState.version).where(
+            models.BootstrapState.name == "seed"
+        )
+    ).scalar()
+    return version is not None and version >= BOOTSTRAP_VERSION
 
-                ```bash
-                ./app.sh stop
-                ```
 
-                Start application in developement mode:
-                ```bash
-                ./app.sh deploy --dev
-                ```
+def bootstrap_database(db: Session) -> bool:
+    """
+    Create the service team, the Service account, the virtual lab and the
+    labbyn documentation once per deployment.
+    Workers starting together serialise on an advisory lock and write the
+    seed data in one transaction, afterwards every start costs one query.
+    Existing rows are kept, so databases seeded before are safe to bootstrap.
+    :param db: The current database session.
+    :return: True if this call wrote the seed data
+    """
+    if is_bootstrapped(db):
+        db.rollback()
+        return False
 
-                **PJATK 2025**:
-                s26990, s26985, s27081, s27549
-                """
+    db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": BOOTSTRAP_LOCK_ID})
+    if is_bootstrapped(db):
+        db.rollback()
+        return False
+
+    # Team names are not unique, the lock keeps this check race free
+    team_id = db.execute(
+        select(models.Teams.id)
+        .where(models.Teams.name == "Service Team")
+        .order_by(models.Teams.id)
+        .limit(1)
+    ).scalar()
+    if team_id is None:
+        team_id = db.execute(
+            insert(models.Teams)
+            .values(name="Service Team", version_id=1)
+            .returning(models.Teams.id)
+        ).scalar_one()
+
+    user_id = db.execute(
+        select(models.User.id).where(models.User.login == "Service")
+    ).scalar()
+    if user_id is None:
+        user_id = db.execute(
+            insert(models.User)
+            .values(
+                login="Service",
+                name="Service Account",
+                surname="System",
+                email="service@labbyn.service",
+                hashed_password=hash_password("Service"),
+                user_type=models.UserType.ADMIN,
+                is_active=True,
+                is_superuser=True,
+                is_verified=True,
+                force_password_change=False,  # For development purposes only
+                version_id=1,
+            )
+            .returning(models.User.id)
+        ).scalar_one()
+        db.execute(
+            insert(models.UsersTeams).values(
+                user_id=user_id, team_id=team_id, is_group_admin=True
+            )
+        )
 
-        labbyn_docs = models.Documentation(
+    db.execute(
+        insert(models.Rooms)
+        .values(name="virtual", room_type="virtual", team_id=team_id, version_id=1)
+        .on_conflict_do_nothing(constraint="_room_team_uc")
+    )
+    db.execute(
+        insert(models.Documentation)
+        .values(
             title="labbyn",
             author="anonymous admin",
-            content=inspect.cleandoc(content_raw),
+            content=LABBYN_DOCS_CONTENT,
+            added_on=datetime.now(),
+            version_id=1,
         )
-        db.add(labbyn_docs)
-        db.commit()
-        db.refresh(labbyn_docs)
+        .on_conflict_do_nothing(index_elements=["title"])
+    )
+    db.execute(
+        insert(models.BootstrapState)
+        .values(name="seed", version=BOOTSTRAP_VERSION)
+        .on_conflict_do_update(
+            index_elements=["name"],
+            set_={"version": BOOTSTRAP_VERSION, "applied_at": func.now()},
+        )
+    )
+    db.commit()
+    return True
 
 
 def resolve_target_team_id(ctx: RequestContext, team_id: Optional[int] = None):
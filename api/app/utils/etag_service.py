@@ -0,0 +1,181 @@
+"""
+Conditional requests: entity tags derived from database versions, answered
+with 304 on reads and checked as an optimistic-locking precondition on writes.
+"""
+
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import Text, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Query
+
+NOT_MODIFIED_OPENAPI = {304: {"description": "The copy of the client is current"}}
+PRECONDITION_OPENAPI = {
+    412: {"description": "If-Match does not match the current entity tag"}
+}
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong entity tag of a representation.
+    :param parts: Values identifying the representation, e.g. ID and version
+    :return: Quoted entity tag
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _tags(header: str, weak: bool = True):
+    """
+    Entity tags of an If-None-Match or If-Match header.
+    :param header: Header value
+    :param weak: Remove weak prefixes, If-Match compares strongly so keeps them
+    :return: List of quoted entity tags
+    """
+    tags = [tag.strip() for tag in header.split(",")]
+    return [tag.removeprefix("W/") for tag in tags] if weak else tags
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Check the validators a client sent against the current representation.
+    If-Modified-Since is only used when the request has no If-None-Match.
+    :param request: Incoming request
+    :param etag: Current entity tag
+    :param last_modified: Time the current representation was produced
+    :return: True if the client copy is current and 304 can be answered
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _tags(if_none_match)
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    """
+    Response headers carrying the validators of a representation.
+    :param etag: Entity tag
+    :param last_modified: Time the representation was produced (UTC)
+    :return: Dictionary of headers
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """
+    Empty 304 response for a client copy that is still current.
+    :param etag: Entity tag
+    :param last_modified: Time the representation was produced (UTC)
+    :return: Response
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
+
+
+def related_rows(model, *criteria):
+    """
+    Rows of a model matching criteria, as text in primary key order. Any
+    change to one of the rows, or to which rows match, changes the value.
+    For relations embedded in a response whose changes do not bump the
+    version_id of the entity, e.g. its tags.
+    :param model: Related model
+    :param criteria: Filters, correlated to the entity
+    :return: Scalar subquery
+    """
+    table = model.__table__
+    return (
+        select(
+            func.string_agg(
+                cast(table.table_valued(), Text),
+                aggregate_order_by(literal(","), *table.primary_key.columns),
+            )
+        )
+        .where(*criteria)
+        .correlate_except(table)
+        .scalar_subquery()
+    )
+
+
+def digest(*values):
+    """
+    Hash of values, e.g. of related_rows, to version everything a response
+    embeds besides the entity itself.
+    :param values: Text expressions, NULL counts as empty
+    :return: MD5 expression
+    """
+    return func.md5(func.concat_ws("|", *(func.coalesce(v, "") for v in values)))
+
+
+class ConditionalRequest:
+    """
+    Conditional request handling of an entity endpoint, used as a dependency.
+    The entity tag is read with one query of the ID and version_id of the
+    entity, before anything else is loaded.
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+        self.etag = None
+
+    def evaluate(self, query: Query, model, version=None):
+        """
+        Read the entity tag of the entity of a query and evaluate the
+        conditional headers against it. A GET whose If-None-Match is current
+        is answered with 304, other GETs get the ETag header. A write with
+        If-Match locks the row until the end of the transaction, so the tag
+        it was checked against stays current, and fails with 412 if the
+        entity changed. Missing entities are left to the endpoint.
+        :param query: Query of the entity, access filters applied
+        :param model: Entity model
+        :param version: Version of what the response embeds besides the
+            entity, part of the tag, see digest
+        :return: Value of version that was read, None if nothing was read
+        """
+        read = self.request.method == "GET"
+        if_match = self.request.headers.get("if-match")
+        if not read:
+            if if_match is None:
+                return None
+            query = query.with_for_update(of=model)
+        columns = [model.id, model.version_id]
+        if version is not None:
+            columns.append(version)
+        row = query.with_entities(*columns).first()
+        if row is None:
+            return None
+        self.etag = make_etag(model.__tablename__, *row)
+
+        if read:
+            if is_not_modified(self.request, self.etag):
+                raise HTTPException(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=validator_headers(self.etag),
+                )
+            self.response.headers["ETag"] = self.etag
+        else:
+            tags = _tags(if_match, weak=False)
+            if "*" not in tags and self.etag not in tags:
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail="The entity was modified since it was fetched. "
+                    "Reload it and try again.",
+                )
+        return row[2] if version is not None else None
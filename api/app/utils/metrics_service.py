@@ -0,0 +1,272 @@
+"""
+Request level performance instrumentation exported in Prometheus format.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+REQUEST_LATENCY = Histogram(
+    "labbyn_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "labbyn_http_request_db_queries",
+    "Number of SQL statements executed per request",
+    ["method", "route"],
+    buckets=COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "labbyn_http_request_db_seconds",
+    "Time spent executing SQL statements per request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_REDIS_CALLS = Histogram(
+    "labbyn_http_request_redis_calls",
+    "Number of Redis calls per request",
+    ["method", "route"],
+    buckets=COUNT_BUCKETS,
+)
+REQUEST_REDIS_SECONDS = Histogram(
+    "labbyn_http_request_redis_seconds",
+    "Time spent in Redis calls per request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_PROMETHEUS_SECONDS = Histogram(
+    "labbyn_http_request_prometheus_seconds",
+    "Time spent querying the Prometheus server per request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+STARTUP_PHASE_SECONDS = Gauge(
+    "labbyn_startup_phase_seconds",
+    "Duration of API startup phases of the worker process",
+    ["phase"],
+    multiprocess_mode="max",
+)
+
+
+@dataclass
+class RequestStats:
+    """
+    Counters collected while a single request is processed.
+    """
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_calls: int = 0
+    redis_seconds: float = 0.0
+    prometheus_calls: int = 0
+    prometheus_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "labbyn_request_stats", default=None
+)
+
+
+def start_request_stats() -> RequestStats:
+    """
+    Start collecting counters for the current request.
+    The context is copied into threadpool workers, so sync handlers share it.
+    :return: Fresh RequestStats object
+    """
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    """
+    Counters of the request being processed, None outside of a request.
+    :return: RequestStats or None
+    """
+    return _request_stats.get()
+
+
+@contextmanager
+def track_redis():
+    """
+    Measure a Redis call and add it to the current request counters.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.redis_calls += 1
+            stats.redis_seconds += time.perf_counter() - start
+
+
+@contextmanager
+def track_prometheus():
+    """
+    Measure a Prometheus HTTP call and add it to the current request counters.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.prometheus_calls += 1
+            stats.prometheus_seconds += time.perf_counter() - start
+
+
+def instrument_engine(engine):
+    """
+    Count SQL statements and their execution time for the current request.
+    :param engine: Sync engine (or async_engine.sync_engine)
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):  # pylint: disable=unused-argument,too-many-arguments
+        # Kept on the execution context, which is discarded with the statement
+        # even when it fails and after_cursor_execute never runs
+        context.labbyn_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):  # pylint: disable=unused-argument,too-many-arguments
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += time.perf_counter() - context.labbyn_query_start
+
+
+def observe_request(method: str, route: str, status: int, elapsed: float, stats):
+    """
+    Export the counters of a finished request.
+    :param method: HTTP method
+    :param route: Route path template, e.g. /db/machines/{machine_id}
+    :param status: Response status code
+    :param elapsed: Request latency in seconds
+    :param stats: RequestStats collected during the request
+    """
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+    REQUEST_DB_QUERIES.labels(method, route).observe(stats.db_queries)
+    REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+    REQUEST_REDIS_CALLS.labels(method, route).observe(stats.redis_calls)
+    REQUEST_REDIS_SECONDS.labels(method, route).observe(stats.redis_seconds)
+    if stats.prometheus_calls:
+        REQUEST_PROMETHEUS_SECONDS.labels(method, route).observe(
+            stats.prometheus_seconds
+        )
+
+
+_pool_collectors = []
+
+
+class PoolCollector:
+    """
+    Exposes database connection pool usage as gauges at scrape time.
+    """
+
+    FIELDS = ("pool_size", "checked_out", "overflow", "checkouts", "timeouts")
+
+    def __init__(self, status_func: Callable[[], dict]):
+        self.status_func = status_func
+
+    def collect(self):
+        """Yield one gauge family per pool field, labelled by engine."""
+        status = self.status_func()
+        for field in self.FIELDS:
+            gauge = GaugeMetricFamily(
+                f"labbyn_db_pool_{field}",
+                f"Database connection pool {field.replace('_', ' ')}",
+                labels=["engine"],
+            )
+            for engine_name, pool in status.items():
+                if field in pool:
+                    gauge.add_metric([engine_name], pool[field])
+            yield gauge
+
+
+def register_pool_collector(status_func: Callable[[], dict]):
+    """
+    Register pool gauges in the default registry. They are also added to the
+    multiprocess registry, where they show the pools of the scraped worker.
+    :param status_func: Callable returning pool status per engine
+    """
+    collector = PoolCollector(status_func)
+    _pool_collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+def render_metrics():
+    """
+    Render all metrics in Prometheus exposition format. With several uvicorn
+    workers PROMETHEUS_MULTIPROC_DIR must be set so samples are aggregated.
+    :return: Tuple of payload bytes and content type
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _pool_collectors:
+            registry.register(collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+_startup_phases = {}
+
+
+def record_startup_phase(phase: str, seconds: float):
+    """
+    Store the duration of a startup phase and export it as a gauge.
+    :param phase: Phase name, e.g. imports or bootstrap
+    :param seconds: Duration in seconds
+    """
+    _startup_phases[phase] = round(seconds, 4)
+    STARTUP_PHASE_SECONDS.labels(phase).set(seconds)
+
+
+@contextmanager
+def track_startup(phase: str):
+    """
+    Measure a startup phase of the worker process.
+    :param phase: Phase name
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_startup_phase(phase, time.perf_counter() - start)
+
+
+def get_startup_report() -> dict:
+    """
+    Startup phases of this worker process in the order they ran.
+    Import costs of single modules are profiled with
+    python -X importtime -c "import app.main".
+    :return: Phase durations and their total in seconds
+    """
+    return {
+        "phases": dict(_startup_phases),
+        "total_seconds": round(sum(_startup_phases.values()), 4),
+    }
@@ -10,6 +10,8 @@ from threading import Lock
 import httpx
 from dotenv import load_dotenv
 
+from app.utils.metrics_service import track_prometheus
+
 load_dotenv(".env/api.env")
 PROMETHEUS_URL = os.getenv("PROMETHEUS_URL")
 PROMETHEUS_TARGETS_PATH = os.getenv("PROMETHEUS_TARGETS_PATH")
@@ -46,7 +48,8 @@ async def _request(
     for _ in range(retries):
         try:
             async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(url, params=params)
+                with track_prometheus():
+                    response = await client.get(url, params=params)
                 if 400 <= response.status_code < 500:
                     response.raise_for_status()
                 if response.status_code >= 500:
@@ -1,13 +1,16 @@
 """Redis service for caching using aioredis."""
+
 import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 
 import redis.asyncio as aioredis
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
 from redis import RedisError
 
+from app.utils.metrics_service import track_redis
+
 load_dotenv(".env/api.env")
 REDIS_URL = os.getenv("REDIS_URL")
 COLLECT_TIMEOUT = int(os.getenv("COLLECT_TIMEOUT"))
@@ -67,7 +70,7 @@ async def get_redis_client():
     return await redis_manager.get_client()
 
 
-async def set_cache(key: str, value: str):
+async def set_cache(key: str, value: str, expire: int = COLLECT_TIMEOUT):
     """
     Set a value in Redis cache with an expiration time.
     :param key: Cache key
@@ -75,7 +78,8 @@ async def set_cache(key: str, value: str):
     :param expire: Expiration time in seconds
     """
     redis_client = await get_redis_client()
-    await redis_client.set(key, value, ex=COLLECT_TIMEOUT)
+    with track_redis():
+        await redis_client.set(key, value, ex=expire)
 
 
 async def get_cache(key: str):
@@ -85,7 +89,45 @@ async def get_cache(key: str):
     :return: Value from redis cache
     """
     r = await get_redis_client()
-    return await r.get(key)
+    with track_redis():
+        return await r.get(key)
+
+
+async def push_queue(key: str, *values: str):
+    """
+    Append values to a Redis list used as a queue, consumers pop them from
+    the head.
+    :param key: Queue key
+    :param values: Queued values
+    """
+    redis_client = await get_redis_client()
+    with track_redis():
+        await redis_client.rpush(key, *values)
+
+
+async def mark_recent_write(user_id: int, expire: int):
+    """
+    Remember that a user has just written to the primary database.
+    :param user_id: User ID
+    :param expire: Stickiness window in seconds
+    """
+    try:
+        await set_cache(f"db_recent_write:{user_id}", "1", expire=expire)
+    except RedisError:
+        pass
+
+
+async def has_recent_write(user_id: int) -> bool:
+    """
+    Check if a user wrote to the primary database within the stickiness window.
+    Reports True when Redis is unavailable, so reads fall back to the primary.
+    :param user_id: User ID
+    :return: True if reads should go to the primary
+    """
+    try:
+        return await get_cache(f"db_recent_write:{user_id}") is not None
+    except RedisError:
+        return True
 
 
 @asynccontextmanager
@@ -106,7 +148,8 @@ async def acquire_lock(
     is_locked = False
 
     try:
-        is_locked = await lock.acquire(blocking=True)
+        with track_redis():
+            is_locked = await lock.acquire(blocking=True)
         if not is_locked:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -123,9 +166,30 @@ async def acquire_lock(
     finally:
         if is_locked:
             try:
-                await lock.release()
+                with track_redis():
+                    await lock.release()
             except RedisError as e:
                 raise HTTPException(
                     status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                     detail="Redis service failed.",
                 ) from e
+
+
+@asynccontextmanager
+async def acquire_locks(
+    lock_names, timeout: int = COLLECT_TIMEOUT, wait_timeout: int = 5
+):
+    """
+    Hold several Redis locks at once. They are taken in sorted order, so two
+    requests locking overlapping sets cannot deadlock each other.
+    :param lock_names: Lock keys, duplicates are ignored
+    :param timeout: Auto-release time in seconds
+    :param wait_timeout: Waiting for each lock before dropping
+    :return: None
+    """
+    async with AsyncExitStack() as stack:
+        for lock_name in sorted(set(lock_names)):
+            await stack.enter_async_context(
+                acquire_lock(lock_name, timeout=timeout, wait_timeout=wait_timeout)
+            )
+        yield
@@ -0,0 +1,169 @@
+"""Rental sweeper keeping the rental state of inventory items up to date."""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import date
+from typing import Optional
+
+from redis import RedisError
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, run_in_db_threadpool
+from app.db.models import Rentals
+from app.utils.availability_service import refresh_items
+from app.utils.redis_service import push_queue
+
+RENTAL_SWEEP_INTERVAL = int(os.getenv("RENTAL_SWEEP_INTERVAL", "3600"))
+RENTAL_SWEEP_BATCH_SIZE = int(os.getenv("RENTAL_SWEEP_BATCH_SIZE", "500"))
+OVERDUE_QUEUE_KEY = "rental_overdue_notifications"
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _claim_overdue(db: Session, today: date, batch_size: int):
+    """
+    Lock a batch of rentals that ended without being returned and were not
+    reported yet. Rentals locked by another sweeper are skipped.
+    :param db: Active database session
+    :param today: Day of the sweep
+    :param batch_size: Maximum number of rentals
+    :return: List of rental rows
+    """
+    return db.execute(
+        select(
+            Rentals.id,
+            Rentals.item_id,
+            Rentals.user_id,
+            Rentals.end_date,
+            Rentals.quantity,
+        )
+        .where(
+            Rentals.returned_on.is_(None),
+            Rentals.end_date < today,
+            Rentals.overdue.is_(False),
+        )
+        .order_by(Rentals.end_date)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def _mark_overdue(db: Session, rental_ids: list):
+    """
+    Flag rentals whose overdue notification was queued and commit.
+    :param db: Active database session
+    :param rental_ids: Rental IDs
+    """
+    db.execute(
+        update(Rentals)
+        .where(Rentals.id.in_(rental_ids))
+        .values(overdue=True, version_id=Rentals.version_id + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _refresh_started(
+    db: Session, since: Optional[date], today: date, after_id: int, batch_size: int
+):
+    """
+    Refresh a batch of items with rentals that started since the last sweep
+    and commit.
+    :param db: Active database session
+    :param since: Day of the last sweep, None to refresh every rented item
+    :param today: Day of the sweep
+    :param after_id: Only items with a greater ID, for keyset pagination
+    :param batch_size: Maximum number of items
+    :return: Refreshed item IDs, in ascending order
+    """
+    query = select(Rentals.item_id).where(
+        Rentals.returned_on.is_(None),
+        Rentals.start_date <= today,
+        Rentals.item_id > after_id,
+    )
+    if since is not None:
+        query = query.where(Rentals.start_date > since)
+    item_ids = db.scalars(
+        query.group_by(Rentals.item_id).order_by(Rentals.item_id).limit(batch_size)
+    ).all()
+    if item_ids:
+        refresh_items(db, item_ids, today)
+        db.commit()
+    return item_ids
+
+
+async def sweep_rentals(
+    today: date,
+    since: Optional[date] = None,
+    batch_size: int = RENTAL_SWEEP_BATCH_SIZE,
+) -> dict:
+    """
+    Process the rentals whose state changed since the last sweep, one batch
+    per transaction: rentals that ended without being returned are queued
+    for an overdue notification, and items of rentals that started count
+    them as rented. A batch is only marked once its notifications are queued.
+    :param today: Day of the sweep
+    :param since: Day of the last sweep, None on the first sweep
+    :param batch_size: Rentals or items per transaction
+    :return: Number of overdue rentals and refreshed items
+    """
+    db = SessionLocal()
+    overdue, refreshed = 0, 0
+    try:
+        while True:
+            rentals = await run_in_db_threadpool(_claim_overdue, db, today, batch_size)
+            if not rentals:
+                break
+            await push_queue(
+                OVERDUE_QUEUE_KEY,
+                *(
+                    json.dumps(
+                        {
+                            "rental_id": r.id,
+                            "item_id": r.item_id,
+                            "user_id": r.user_id,
+                            "end_date": r.end_date.isoformat(),
+                            "quantity": r.quantity,
+                        }
+                    )
+                    for r in rentals
+                ),
+            )
+            await run_in_db_threadpool(_mark_overdue, db, [r.id for r in rentals])
+            overdue += len(rentals)
+
+        after_id = 0
+        while True:
+            item_ids = await run_in_db_threadpool(
+                _refresh_started, db, since, today, after_id, batch_size
+            )
+            if not item_ids:
+                break
+            after_id = item_ids[-1]
+            refreshed += len(item_ids)
+    finally:
+        await run_in_db_threadpool(db.close)
+    return {"overdue": overdue, "refreshed": refreshed}
+
+
+async def rental_sweeper_worker():
+    """
+    Sweep the rentals at startup, then periodically. The first sweep
+    refreshes every rented item, the next ones only handle what changed
+    since the previous one.
+    :return: None
+    """
+    since = None
+    while True:
+        today = date.today()
+        try:
+            result = await sweep_rentals(today, since)
+            since = today
+            logger.info("Rental sweep: %s", result)
+        except (SQLAlchemyError, RedisError):
+            logger.exception("Rental sweep failed, retrying next interval")
+        await asyncio.sleep(RENTAL_SWEEP_INTERVAL)
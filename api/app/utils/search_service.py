@@ -0,0 +1,185 @@
+"""
+Ranked search over machines, inventory, racks, rooms, users and documentation,
+answered from the full-text indexes of the tables (and their trigram indexes
+when the pg_trgm extension is installed), one page at a time.
+"""
+
+from sqlalchemy import false, func, literal, literal_column, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import RequestContext
+from app.db.models import (
+    Documentation,
+    Inventory,
+    Machines,
+    Rack,
+    Rooms,
+    User,
+    UsersTeams,
+    search_document,
+    search_vector,
+)
+
+# Searched entity types: model, displayed name, location, searched columns
+# and columns matched by similarity. Columns must be those of the indexes.
+SEARCH_TYPES = {
+    "machine": (
+        Machines,
+        Machines.name,
+        func.concat("/machines/", Machines.id),
+        (
+            Machines.name,
+            Machines.ip_address,
+            Machines.mac_address,
+            Machines.serial_number,
+        ),
+        None,
+    ),
+    "inventory": (
+        Inventory,
+        Inventory.name,
+        func.concat("/inventory/", Inventory.id),
+        (Inventory.name,),
+        None,
+    ),
+    "rack": (
+        Rack,
+        Rack.name,
+        func.concat("/labs/", Rack.room_id),
+        (Rack.name,),
+        None,
+    ),
+    "room": (
+        Rooms,
+        Rooms.name,
+        func.concat("/labs/", Rooms.id),
+        (Rooms.name,),
+        None,
+    ),
+    "user": (
+        User,
+        func.concat(User.name, " ", User.surname),
+        func.concat("/users/", User.id),
+        (User.name, User.surname, User.login),
+        None,
+    ),
+    "documentation": (
+        Documentation,
+        Documentation.title,
+        func.concat("/docs/", Documentation.id),
+        (Documentation.title, Documentation.content),
+        (Documentation.title,),
+    ),
+}
+
+_trigram_installed = None
+
+
+def trigram_installed(db: Session) -> bool:
+    """
+    Check once per process whether the pg_trgm extension is installed.
+    :param db: Active database session
+    :return: True if similarity matching can be used
+    """
+    global _trigram_installed  # pylint: disable=global-statement
+    if _trigram_installed is None:
+        _trigram_installed = bool(
+            db.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+        )
+    return _trigram_installed
+
+
+def prefix_query(phrase: str) -> str:
+    """
+    tsquery text matching rows with every word of a phrase, each word as a
+    prefix. Words are quoted, so the parser splits them like indexed text,
+    e.g. an IP address prefix or the parts of a MAC address.
+    :param phrase: Search phrase as typed
+    :return: tsquery text
+    """
+    words = phrase.split()
+    return " & ".join(
+        "'" + word.replace("\\", "\\\\").replace("'", "''") + "':*" for word in words
+    )
+
+
+def _scope(query, model, ctx: RequestContext):
+    """
+    Restrict a search branch to the entities the user may see.
+    :param query: Select of the branch
+    :param model: Searched model
+    :param ctx: Request context for user and team info
+    :return: Filtered select
+    """
+    if model is not User:
+        return ctx.team_filter(query, model)
+    if ctx.is_admin:
+        return query
+    # A semi-join, so members of several teams of the user are found once
+    members = select(UsersTeams.user_id).where(UsersTeams.team_id.in_(ctx.team_ids))
+    return query.where(User.id.in_(members) if ctx.team_ids else false())
+
+
+def search(
+    db: Session,
+    ctx: RequestContext,
+    phrase: str,
+    types: list,
+    limit: int,
+    offset: int,
+) -> dict:
+    """
+    One page of the entities matching a phrase, best matches first, in one
+    query. Rows match when their indexed text contains every word of the
+    phrase as a word prefix, or with pg_trgm, when it contains words similar
+    to the phrase.
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :param phrase: Search phrase
+    :param types: Searched entity types, keys of SEARCH_TYPES
+    :param limit: Page size
+    :param offset: Number of matches skipped
+    :return: SearchResponse data
+    """
+    tsquery = func.to_tsquery(
+        literal_column("'simple'::regconfig"), literal(prefix_query(phrase))
+    )
+    trigram = trigram_installed(db)
+    branches = []
+    for entity_type in types:
+        model, name, location, columns, similar_columns = SEARCH_TYPES[entity_type]
+        vector = search_vector(*columns)
+        matches = vector.op("@@")(tsquery)
+        rank = func.ts_rank(vector, tsquery)
+        if trigram:
+            document = search_document(*(similar_columns or columns))
+            matches = matches | literal(phrase).op("<%")(document)
+            rank = func.greatest(rank, func.word_similarity(phrase, document))
+        branch = select(
+            literal(entity_type).label("type"),
+            model.id.label("id"),
+            name.label("name"),
+            location.label("location"),
+            rank.label("rank"),
+        ).where(matches)
+        branches.append(_scope(branch, model, ctx))
+
+    found = union_all(*branches).subquery()
+    rows = db.execute(
+        select(found, func.count().over().label("total"))
+        .order_by(found.c.rank.desc(), found.c.type, found.c.id)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    if rows:
+        total = rows[0].total
+    elif offset:
+        total = db.scalar(select(func.count()).select_from(found))
+    else:
+        total = 0
+    return {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "items": [row._asdict() for row in rows],
+    }
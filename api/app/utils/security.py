@@ -1,19 +1,80 @@
 """Utility functions for password hashing and verification."""
 
+import functools
+import os
 import secrets
 import string
+import threading
+
+from anyio import CapacityLimiter, to_thread
+from dotenv import load_dotenv
 from fastapi_users.password import PasswordHelper
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+load_dotenv(".env/api.env")
+
+# Scheme of new hashes, "argon2" or "bcrypt". Hashes of the other scheme and
+# hashes with outdated cost parameters are replaced on the next login.
+PASSWORD_HASH_ALGORITHM = os.getenv("PASSWORD_HASH_ALGORITHM", "argon2").lower()
+if PASSWORD_HASH_ALGORITHM not in ("argon2", "bcrypt"):
+    raise ValueError("PASSWORD_HASH_ALGORITHM must be 'argon2' or 'bcrypt'")
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "3"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "65536"))
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+
+# Hashes computed at the same time. Each one keeps a CPU core busy (and takes
+# PASSWORD_ARGON2_MEMORY_COST KiB), so a login burst queues instead of
+# starving request handling.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+password_hash_limiter = CapacityLimiter(PASSWORD_HASH_WORKERS)
+_password_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS)
+
+
+def get_password_helper(
+    algorithm: str = PASSWORD_HASH_ALGORITHM,
+    argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = PASSWORD_ARGON2_MEMORY_COST,
+    bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+):
+    """
+    Build the password helper hashing with the configured scheme and cost.
+    :param algorithm: Scheme of new hashes, "argon2" or "bcrypt"
+    :param argon2_time_cost: Argon2 iterations
+    :param argon2_memory_cost: Argon2 memory in KiB
+    :param bcrypt_rounds: bcrypt cost factor (log2 of the rounds)
+    :return: PasswordHelper
+    """
+    argon2 = Argon2Hasher(time_cost=argon2_time_cost, memory_cost=argon2_memory_cost)
+    bcrypt = BcryptHasher(rounds=bcrypt_rounds)
+    hashers = (argon2, bcrypt) if algorithm == "argon2" else (bcrypt, argon2)
+    return PasswordHelper(PasswordHash(hashers))
 
-password_helper = PasswordHelper()
+
+password_helper = get_password_helper()
 
 
 def hash_password(password: str):
     """
-    Hash password in bcrypt
+    Hash password with the configured scheme. Blocks, call it from worker
+    threads or use hash_password_async.
     :param password: Plain password
     :return: Hashed password
     """
-    return password_helper.hash(password)
+    with _password_hash_slots:
+        return password_helper.hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verify a password and rehash it if its scheme or cost is outdated.
+    :param plain_password: Plain password
+    :param hashed_password: Hashed password
+    :return: Tuple of match status and the new hash, or None if up to date
+    """
+    with _password_hash_slots:
+        return password_helper.verify_and_update(plain_password, hashed_password)
 
 
 def verify_password(plain_password: str, hashed_password: str):
@@ -23,10 +84,37 @@ def verify_password(plain_password: str, hashed_password: str):
     :param hashed_password: Hashed password
     :return: True if match, False otherwise
     """
-    status, _ = password_helper.verify_and_update(plain_password, hashed_password)
+    status, _ = verify_and_update_password(plain_password, hashed_password)
     return status
 
 
+async def _run_in_hash_threadpool(func, *args):
+    return await to_thread.run_sync(
+        functools.partial(func, *args), limiter=password_hash_limiter
+    )
+
+
+async def hash_password_async(password: str):
+    """
+    Hash password in the bounded hashing threadpool, off the event loop.
+    :param password: Plain password
+    :return: Hashed password
+    """
+    return await _run_in_hash_threadpool(hash_password, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    """
+    verify_and_update_password in the bounded hashing threadpool.
+    :param plain_password: Plain password
+    :param hashed_password: Hashed password
+    :return: Tuple of match status and the new hash, or None if up to date
+    """
+    return await _run_in_hash_threadpool(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
 def generate_starting_password(lenght: int = 8):
     """
     Generate a random starting password
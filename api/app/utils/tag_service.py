@@ -0,0 +1,249 @@
+"""
+Tag links of machines, racks, rooms and documents: set-based idempotent
+assignment, tag filters of the listings and tag facet counts.
+"""
+
+from typing import Iterable, List, Literal, Optional
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import (
+    Integer,
+    delete,
+    func,
+    literal,
+    select,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import RequestContext
+from app.db.models import (
+    Documentation,
+    Machines,
+    Rack,
+    Rooms,
+    Tags,
+    TagsDocumentation,
+    TagsMachines,
+    TagsRacks,
+    TagsRooms,
+)
+
+# Tagged entity types: model and entity ID column of its association table
+TAG_LINKS = {
+    "machine": (Machines, TagsMachines.__table__.c.machine_id),
+    "rack": (Rack, TagsRacks.__table__.c.rack_id),
+    "room": (Rooms, TagsRooms.__table__.c.room_id),
+    "documentation": (
+        Documentation,
+        TagsDocumentation.__table__.c.documentation_id,
+    ),
+}
+
+
+def tag_link(entity_type: str):
+    """
+    Model and association column of a tagged entity type.
+    :param entity_type: Entity type, case insensitive
+    :return: Tuple of model and entity ID column of the association table
+    """
+    link = TAG_LINKS.get(entity_type.lower())
+    if link is None:
+        raise HTTPException(status_code=400, detail="Invalid entity type")
+    return link
+
+
+def link_tags(db: Session, entity_column, pairs: Iterable[tuple]) -> int:
+    """
+    Link tags to entities in one INSERT, links that already exist are
+    skipped by the unique index of the association table.
+    :param db: Active database session
+    :param entity_column: Entity ID column of the association table
+    :param pairs: (entity ID, tag ID) pairs, duplicates allowed
+    :return: Number of links created
+    """
+    rows = [
+        {entity_column.key: entity_id, "tag_id": tag_id}
+        for entity_id, tag_id in dict.fromkeys(pairs)
+    ]
+    if not rows:
+        return 0
+    statement = (
+        insert(entity_column.table)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[entity_column.name, "tag_id"])
+    )
+    return db.execute(statement).rowcount
+
+
+def link_tags_product(db: Session, entity_column, entity_ids, tag_ids) -> int:
+    """
+    Link every tag to every entity in one INSERT ... SELECT, the pairs are
+    built by the database from the two ID arrays. Links that already exist
+    are skipped.
+    :param db: Active database session
+    :param entity_column: Entity ID column of the association table
+    :param entity_ids: Entity IDs
+    :param tag_ids: Tag IDs
+    :return: Number of links created
+    """
+    entities = (
+        func.unnest(literal(sorted(set(entity_ids)), ARRAY(Integer)))
+        .table_valued("id")
+        .render_derived("entities")
+    )
+    tags = (
+        func.unnest(literal(sorted(set(tag_ids)), ARRAY(Integer)))
+        .table_valued("id")
+        .render_derived("tags")
+    )
+    pairs = select(entities.c.id, tags.c.id).select_from(entities.join(tags, true()))
+    statement = (
+        insert(entity_column.table)
+        .from_select([entity_column.name, "tag_id"], pairs)
+        .on_conflict_do_nothing(index_elements=[entity_column.name, "tag_id"])
+    )
+    return db.execute(statement).rowcount
+
+
+def unlink_tags(db: Session, entity_column, entity_ids, tag_ids) -> int:
+    """
+    Remove the links between any of the entities and any of the tags.
+    :param db: Active database session
+    :param entity_column: Entity ID column of the association table
+    :param entity_ids: Entity IDs
+    :param tag_ids: Tag IDs
+    :return: Number of links removed
+    """
+    table = entity_column.table
+    statement = delete(table).where(
+        entity_column.in_(entity_ids), table.c.tag_id.in_(tag_ids)
+    )
+    return db.execute(statement).rowcount
+
+
+class TagFilter:
+    """
+    Tag filter of an entity listing, used as a dependency. Keeps entities
+    with all (tags_mode=and) or any (tags_mode=or) of the tags, matched in
+    the association table by its tag_id index.
+    """
+
+    def __init__(
+        self,
+        tags: Optional[List[str]] = Query(
+            None, description="Tag names, repeated or comma-separated (e.g. gpu,prod)"
+        ),
+        tags_mode: Literal["and", "or"] = Query(
+            "and", description="Keep entities with all (and) or any (or) of the tags"
+        ),
+    ):
+        self.names = sorted(
+            {name.strip() for value in tags or [] for name in value.split(",")} - {""}
+        )
+        self.mode = tags_mode
+
+    def apply(self, query, entity_type: str):
+        """
+        Filter a query of entities by the tags of the request.
+        :param query: Query or Select of the entities
+        :param entity_type: Key of TAG_LINKS
+        :return: Filtered query, unchanged without tags
+        """
+        if not self.names:
+            return query
+        model, column = TAG_LINKS[entity_type]
+        tag_id = column.table.c.tag_id
+        tagged = (
+            select(column)
+            .join(Tags, Tags.id == tag_id)
+            .where(Tags.name.in_(self.names))
+        )
+        if self.mode == "and":
+            # Links are unique, so an entity has all tags when it has as many
+            tagged = tagged.group_by(column).having(
+                func.count(tag_id) == len(self.names)
+            )
+        return query.filter(model.id.in_(tagged))
+
+
+def tag_facets(db: Session, ctx: RequestContext, entity_types: List[str]) -> list:
+    """
+    Number of entities of each type carrying each tag, counting only the
+    entities the user may see, in one grouped query.
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :param entity_types: Counted entity types, keys of TAG_LINKS
+    :return: TagFacetResponse data of every tag, by tag name
+    """
+    branches = []
+    for entity_type in entity_types:
+        model, column = TAG_LINKS[entity_type]
+        branch = select(literal(entity_type).label("type"), column.table.c.tag_id).join(
+            model, model.id == column
+        )
+        if model is not Documentation:
+            branch = ctx.team_filter(branch, model)
+        branches.append(branch)
+    links = union_all(*branches).subquery()
+    counts = [
+        func.count().filter(links.c.type == entity_type) for entity_type in entity_types
+    ]
+    rows = db.execute(
+        select(Tags.id, Tags.name, Tags.color, func.count(links.c.tag_id), *counts)
+        .outerjoin(links, links.c.tag_id == Tags.id)
+        .group_by(Tags.id)
+        .order_by(Tags.name)
+    ).all()
+    return [
+        {
+            "id": row[0],
+            "name": row[1],
+            "color": row[2],
+            "total": row[3],
+            "counts": dict(zip(entity_types, row[4:])),
+        }
+        for row in rows
+    ]
+
+
+def check_access(db: Session, ctx: RequestContext, entity_type: str, entity_ids):
+    """
+    Fail unless all entities exist and the user may see them. Documents are
+    visible to every user.
+    :param db: Active database session
+    :param ctx: Request context for user and team info
+    :param entity_type: Key of TAG_LINKS
+    :param entity_ids: Entity IDs
+    """
+    model, _ = TAG_LINKS[entity_type]
+    query = select(model.id).where(model.id.in_(entity_ids))
+    if model is not Documentation:
+        query = ctx.team_filter(query, model)
+    missing = set(entity_ids) - set(db.scalars(query))
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{entity_type} not found or access denied: {sorted(missing)}",
+        )
+
+
+def check_tags(db: Session, tag_ids) -> dict:
+    """
+    Fail unless all tags exist.
+    :param db: Active database session
+    :param tag_ids: Tag IDs
+    :return: Dictionary of tag ID to tag name
+    """
+    names = dict(
+        db.execute(select(Tags.id, Tags.name).where(Tags.id.in_(tag_ids))).all()
+    )
+    missing = set(tag_ids) - set(names)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tags not found: {sorted(missing)}",
+        )
+    return names
@@ -0,0 +1,139 @@
+"""
+Team views rendered once per version of everything they show, cached by team.
+"""
+
+import os
+
+from sqlalchemy import Text, cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    Categories,
+    Inventory,
+    Machines,
+    Rack,
+    Rooms,
+    Shelf,
+    Tags,
+    TagsRacks,
+    Teams,
+    User,
+    UsersTeams,
+)
+from app.utils.cache_service import VersionedCache
+from app.utils.etag_service import digest, related_rows
+
+TEAM_CACHE_SIZE = int(os.getenv("TEAM_CACHE_SIZE", "500"))
+# Rendered TeamDetailResponse JSON of each team
+team_summary_cache = VersionedCache(TEAM_CACHE_SIZE)
+# Rendered TeamFullDetailResponse JSON of each team
+team_detail_cache = VersionedCache(TEAM_CACHE_SIZE)
+
+
+def related_versions(model, *criteria):
+    """
+    ID and version_id of the rows of a versioned model matching criteria, in
+    ID order. Cheaper than related_rows for many rows, any update bumps the
+    version_id of a row.
+    :param model: Related model
+    :param criteria: Filters, correlated to the team
+    :return: Scalar subquery
+    """
+    return (
+        select(
+            func.string_agg(
+                func.concat(model.id, ":", model.version_id),
+                aggregate_order_by(literal(","), model.id),
+            )
+        )
+        .where(*criteria)
+        .correlate(Teams)
+        .scalar_subquery()
+    )
+
+
+def team_summary_version():
+    """
+    Version of the TeamDetailResponse of a team: its version_id, its
+    memberships and the version of its members.
+    :return: MD5 expression correlated to Teams
+    """
+    member_ids = (
+        select(UsersTeams.user_id)
+        .where(UsersTeams.team_id == Teams.id)
+        .correlate(Teams)
+    )
+    return digest(
+        cast(Teams.version_id, Text),
+        related_rows(UsersTeams, UsersTeams.team_id == Teams.id),
+        related_versions(User, User.id.in_(member_ids)),
+    )
+
+
+def team_detail_version():
+    """
+    Version of the TeamFullDetailResponse of a team: the summary version and
+    the versions of its racks and their tags, shelves and machines, of its
+    machines and of its inventory with the room, machine and category of
+    each item.
+    :return: MD5 expression correlated to Teams
+    """
+    rack_ids = select(Rack.id).where(Rack.team_id == Teams.id).correlate(Teams)
+    shelf_ids = select(Shelf.id).where(Shelf.rack_id.in_(rack_ids))
+    items = select(Inventory).where(Inventory.team_id == Teams.id).correlate(Teams)
+    return digest(
+        team_summary_version(),
+        related_versions(Rack, Rack.team_id == Teams.id),
+        related_rows(TagsRacks, TagsRacks.rack_id.in_(rack_ids)),
+        related_versions(
+            Tags,
+            Tags.id.in_(
+                select(TagsRacks.tag_id).where(TagsRacks.rack_id.in_(rack_ids))
+            ),
+        ),
+        related_versions(Shelf, Shelf.rack_id.in_(rack_ids)),
+        related_versions(
+            Machines,
+            or_(
+                Machines.team_id == Teams.id,
+                Machines.shelf_id.in_(shelf_ids),
+                Machines.id.in_(items.with_only_columns(Inventory.machine_id)),
+            ),
+        ),
+        related_versions(Inventory, Inventory.team_id == Teams.id),
+        related_versions(
+            Rooms, Rooms.id.in_(items.with_only_columns(Inventory.localization_id))
+        ),
+        related_versions(
+            Categories,
+            Categories.id.in_(items.with_only_columns(Inventory.category_id)),
+        ),
+    )
+
+
+def render_teams(db: Session, query, version, cache: VersionedCache, render):
+    """
+    Rendered JSON of the teams of a query. The versions of all teams are read
+    first, only teams missing from the cache at their current version are
+    rendered.
+    :param db: Active database session
+    :param query: Select of Teams rows, filters applied
+    :param version: Version expression of the rendering, e.g. team_detail_version
+    :param cache: Cache of the rendering
+    :param render: Callable taking a list of team IDs and returning a
+        dictionary of team ID to JSON document
+    :return: List of JSON documents, in team ID order
+    """
+    versions = db.execute(
+        query.with_only_columns(Teams.id, version).order_by(Teams.id)
+    ).all()
+    documents = {team_id: cache.get(team_id, v) for team_id, v in versions}
+    missing = [team_id for team_id, cached in documents.items() if cached is None]
+    if missing:
+        rendered = render(missing)
+        for team_id, v in versions:
+            if team_id in rendered:
+                documents[team_id] = rendered[team_id]
+                cache.put(team_id, v, rendered[team_id])
+    return [documents[team_id] for team_id, _ in versions if documents[team_id]]
@@ -0,0 +1,330 @@
+"""
+Rack and room trees rendered to JSON by the database and cached by the
+version of everything they contain.
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Text, cast, func, literal, literal_column, null, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    Layout,
+    Machines,
+    Rack,
+    Rooms,
+    Shelf,
+    Tags,
+    TagsRacks,
+    TagsRooms,
+    Teams,
+)
+from app.utils.cache_service import VersionedCache
+
+RACK_CACHE_SIZE = int(os.getenv("RACK_CACHE_SIZE", "5000"))
+# Rendered RackResponse JSON of each rack, keyed by the version of its tree
+rack_cache = VersionedCache(RACK_CACHE_SIZE)
+ROOM_CACHE_SIZE = int(os.getenv("ROOM_CACHE_SIZE", "500"))
+# Rendered RoomSnapshotResponse JSON of each room and when it was rendered
+room_cache = VersionedCache(ROOM_CACHE_SIZE)
+
+
+def agg(values, *order_by, separator=None):
+    """
+    Aggregate of the rows of a correlated subquery, ordered.
+    :param values: Aggregated expression
+    :param order_by: Order of the rows
+    :param separator: Use string_agg with this separator instead of json_agg
+    :return: Aggregate expression
+    """
+    if separator is not None:
+        return func.string_agg(
+            values, aggregate_order_by(literal(separator), *order_by)
+        )
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(values, *order_by)),
+        literal_column("'[]'::json"),
+    )
+
+
+def _tag_columns(link_model, link_column, owner_id):
+    """
+    TagsResponse JSON of the tags of an entity, and their versions.
+    :param link_model: Association model between tags and the entity
+    :param link_column: Entity ID column of the association
+    :param owner_id: Correlated entity ID column
+    :return: JSON and version scalar subqueries
+    """
+    tags = (
+        select(Tags)
+        .join(link_model, link_model.tag_id == Tags.id)
+        .where(link_column == owner_id)
+    )
+    rendered = tags.with_only_columns(
+        agg(
+            func.json_build_object(
+                "name",
+                Tags.name,
+                "color",
+                Tags.color,
+                "id",
+                Tags.id,
+                "version_id",
+                Tags.version_id,
+            ),
+            Tags.id,
+        )
+    )
+    versions = tags.with_only_columns(
+        agg(func.concat(Tags.id, ":", Tags.version_id), Tags.id, separator=",")
+    )
+    return rendered.scalar_subquery(), versions.scalar_subquery()
+
+
+def rack_tree_columns():
+    """
+    Columns rendering racks (joined with their room and team) as RackResponse
+    JSON, and the version of each rack tree: a hash of the version_id of the
+    rack, its room, team, tags, shelves and their machines.
+    :return: Version and JSON text columns
+    """
+    machines = select(
+        agg(
+            func.json_build_object(
+                "id",
+                Machines.id,
+                "name",
+                Machines.name,
+                "ip_address",
+                Machines.ip_address,
+                "mac_address",
+                Machines.mac_address,
+                "team_id",
+                Machines.team_id,
+                "machine_url",
+                null(),
+            ),
+            Machines.id,
+        )
+    ).where(Machines.shelf_id == Shelf.id)
+    machine_versions = select(
+        agg(
+            func.concat(Machines.id, ":", Machines.version_id),
+            Machines.id,
+            separator=",",
+        )
+    ).where(Machines.shelf_id == Shelf.id)
+    shelves = select(
+        agg(
+            func.json_build_object(
+                "id",
+                Shelf.id,
+                "name",
+                Shelf.name,
+                "order",
+                Shelf.order,
+                "rack_id",
+                Shelf.rack_id,
+                "rack_name",
+                null(),
+                "machines",
+                machines.scalar_subquery(),
+            ),
+            Shelf.order,
+            Shelf.id,
+        )
+    ).where(Shelf.rack_id == Rack.id)
+    shelf_versions = select(
+        agg(
+            func.concat(
+                Shelf.id,
+                ":",
+                Shelf.version_id,
+                "(",
+                machine_versions.scalar_subquery(),
+                ")",
+            ),
+            Shelf.id,
+            separator=",",
+        )
+    ).where(Shelf.rack_id == Rack.id)
+    tags, tag_versions = _tag_columns(TagsRacks, TagsRacks.rack_id, Rack.id)
+    version = func.md5(
+        func.concat_ws(
+            "|",
+            Rack.version_id,
+            Rooms.version_id,
+            Teams.version_id,
+            tag_versions,
+            shelf_versions.scalar_subquery(),
+        )
+    )
+    tree = func.json_build_object(
+        "name",
+        Rack.name,
+        "room_id",
+        Rack.room_id,
+        "layout_id",
+        Rack.layout_id,
+        "team_id",
+        Rack.team_id,
+        "id",
+        Rack.id,
+        "room_name",
+        func.coalesce(Rooms.name, "N/A"),
+        "team_name",
+        func.coalesce(Teams.name, "N/A"),
+        "tags",
+        tags,
+        "shelves",
+        shelves.scalar_subquery(),
+    )
+    return version, cast(tree, Text)
+
+
+def with_rack_tree_joins(query):
+    """
+    Join a query of racks with the room and team read by rack_tree_columns.
+    :param query: Select or Query of Rack rows
+    :return: Joined query
+    """
+    return query.outerjoin(Rooms, Rooms.id == Rack.room_id).outerjoin(
+        Teams, Teams.id == Rack.team_id
+    )
+
+
+def render_racks(db: Session, query, versions: Optional[list] = None):
+    """
+    Rendered RackResponse JSON of the racks of a query. The versions of all
+    racks are read first, only racks missing from rack_cache at their current
+    version are rendered, by the database in one statement.
+    :param db: Active database session
+    :param query: Select of Rack rows, filters applied
+    :param versions: (rack ID, version) pairs of the query, in rack ID order,
+        when the caller already read them
+    :return: List of JSON documents, in rack ID order
+    """
+    version, tree = rack_tree_columns()
+    query = with_rack_tree_joins(query).order_by(Rack.id)
+    if versions is None:
+        versions = db.execute(query.with_only_columns(Rack.id, version)).all()
+
+    trees = {rack_id: rack_cache.get(rack_id, v) for rack_id, v in versions}
+    missing = [rack_id for rack_id, cached in trees.items() if cached is None]
+    if missing:
+        rendered = db.execute(
+            query.with_only_columns(Rack.id, version, tree).where(Rack.id.in_(missing))
+        )
+        for rack_id, v, document in rendered:
+            trees[rack_id] = document
+            rack_cache.put(rack_id, v, document)
+    return [trees[rack_id] for rack_id, _ in versions]
+
+
+def room_snapshot_columns():
+    """
+    Columns rendering a room and the coordinates of its racks as JSON, and
+    the version of the room snapshot: a hash of the version_id of the room,
+    its tags, the rack coordinates and the version of each of its rack trees.
+    Racks are rendered separately, by render_racks.
+    :return: Version, room JSON text and layouts JSON text columns
+    """
+    rack_version, _ = rack_tree_columns()
+    rack_versions = (
+        select(agg(func.concat(Rack.id, ":", rack_version), Rack.id, separator=","))
+        .outerjoin(Teams, Teams.id == Rack.team_id)
+        .where(Rack.room_id == Rooms.id)
+    )
+    rack_layouts = select(Layout).where(
+        Layout.id.in_(
+            select(Rack.layout_id).where(Rack.room_id == Rooms.id).correlate(Rooms)
+        )
+    )
+    layouts = rack_layouts.with_only_columns(
+        agg(
+            func.json_build_object(
+                "x",
+                Layout.x,
+                "y",
+                Layout.y,
+                "id",
+                Layout.id,
+                "version_id",
+                Layout.version_id,
+            ),
+            Layout.id,
+        )
+    )
+    layout_versions = rack_layouts.with_only_columns(
+        agg(func.concat(Layout.id, ":", Layout.version_id), Layout.id, separator=",")
+    )
+    tags, tag_versions = _tag_columns(TagsRooms, TagsRooms.room_id, Rooms.id)
+    version = func.md5(
+        func.concat_ws(
+            "|",
+            Rooms.version_id,
+            tag_versions,
+            layout_versions.scalar_subquery(),
+            rack_versions.scalar_subquery(),
+        )
+    )
+    room = func.json_build_object(
+        "name",
+        Rooms.name,
+        "room_type",
+        Rooms.room_type,
+        "team_id",
+        Rooms.team_id,
+        "id",
+        Rooms.id,
+        "version_id",
+        Rooms.version_id,
+        "tags",
+        tags,
+    )
+    return version, cast(room, Text), cast(layouts.scalar_subquery(), Text)
+
+
+def room_snapshot_version(db: Session, query) -> Optional[str]:
+    """
+    Current version of the snapshot of a room, without rendering anything.
+    :param db: Active database session
+    :param query: Select of one Rooms row, filters applied
+    :return: Version hash, None if the room is not found
+    """
+    version, _, _ = room_snapshot_columns()
+    return db.scalar(query.with_only_columns(version))
+
+
+def render_room_snapshot(db: Session, room_id: int):
+    """
+    Render the RoomSnapshotResponse JSON of a room and store it in
+    room_cache. Racks come from render_racks, so they are shared with the
+    rack endpoints and their cache.
+    :param db: Active database session
+    :param room_id: Room ID, access already checked
+    :return: Tuple of version, JSON document and render time (UTC), None if
+        the room no longer exists
+    """
+    row = db.execute(
+        select(*room_snapshot_columns()).where(Rooms.id == room_id)
+    ).first()
+    if row is None:
+        return None
+    version, room, layouts = row
+    racks = render_racks(db, select(Rack).where(Rack.room_id == room_id))
+    document = (
+        '{"room":'
+        + room
+        + ',"layouts":'
+        + layouts
+        + ',"racks":['
+        + ",".join(racks)
+        + "]}"
+    )
+    rendered_at = datetime.now(timezone.utc)
+    room_cache.put(room_id, version, (document, rendered_at))
+    return version, document, rendered_at
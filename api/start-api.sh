@@ -27,17 +27,18 @@ fi
 export PYTHONPATH=/code
 export ALEMBIC_CONFIG=/code/alembic.ini
 
-echo "Ensuring Alembic versions directory exists..."
-mkdir -p /code/alembic/versions
-
-echo "Resetting Alembic history to 'head'..."
-alembic stamp head
+echo "Applying database migrations..."
+python -m app.db.migrate
 
-echo "Attempting to create a new Alembic revision based on current models..."
-alembic revision --autogenerate -m "Auto init on start"
+# Several workers share the metrics endpoint through this directory
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/labbyn-metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
 
-echo "Applying database migrations..."
-alembic upgrade head
+if [ "$API_RELOAD" = "1" ]; then
+  echo "Starting Uvicorn server with auto-reload..."
+  exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+fi
 
-echo "Starting Uvicorn server..."
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+echo "Starting Uvicorn server with ${API_WORKERS:-2} workers..."
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${API_WORKERS:-2}"
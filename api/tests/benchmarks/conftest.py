@@ -0,0 +1,171 @@
+"""
+Fixtures for the benchmark suite.
+
+Run with:  LABBYN_BENCHMARK=1 pytest tests/benchmarks
+Environment:
+  BENCH_REQUESTS / BENCH_CONCURRENCY   load per endpoint (default 100 / 10)
+  BENCH_<ENTITY>                       synthetic lab size, see seed.LabSizes
+  BENCH_BASE_URL                       benchmark a running server instead of
+                                       the in-process ASGI app
+  BENCH_RESULTS_PATH                   JSON report (benchmark-results.json)
+  BENCH_REGRESSION_THRESHOLD           override the threshold of baseline.json
+  BENCH_KEEP_LAB=1                     keep the seeded lab for the next run
+  BENCH_PROMETHEUS_LATENCY / _ERROR_RATE / _CARDINALITY
+                                       behaviour of the fake Prometheus
+  LABBYN_BENCHMARK_UPDATE_BASELINE=1   store this run as the new baseline
+"""
+
+import json
+import os
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.database import sync_engine
+from app.main import app
+from app.routers.prometheus_router import (
+    PROMETEUS_CACHE_METRICS_KEY,
+    PROMETEUS_CACHE_STATUS_KEY,
+)
+from app.utils.prometheus_service import fetch_prometheus_metrics
+from app.utils.redis_service import set_cache
+from tests.benchmarks.seed import LabSizes, drop_lab, seed_lab
+from tests.fake_prometheus import FakePrometheus
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+RESULTS_PATH = Path(os.getenv("BENCH_RESULTS_PATH", "benchmark-results.json"))
+UPDATE_BASELINE = os.getenv("LABBYN_BENCHMARK_UPDATE_BASELINE") == "1"
+BENCH_REQUESTS = int(os.getenv("BENCH_REQUESTS", "100"))
+BENCH_CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "10"))
+KEEP_LAB = os.getenv("BENCH_KEEP_LAB") == "1"
+PROMETHEUS_LATENCY = float(os.getenv("BENCH_PROMETHEUS_LATENCY", "0.02"))
+PROMETHEUS_ERROR_RATE = float(os.getenv("BENCH_PROMETHEUS_ERROR_RATE", "0"))
+PROMETHEUS_CARDINALITY = int(os.getenv("BENCH_PROMETHEUS_CARDINALITY", "2"))
+DEFAULT_THRESHOLD = 0.3
+
+
+@pytest.fixture(scope="session")
+def bench_sizes():
+    """Synthetic lab sizes for this run."""
+    return LabSizes.from_env()
+
+
+@pytest.fixture(scope="session")
+def bench_lab(test_client, bench_sizes):  # pylint: disable=unused-argument
+    """
+    Seeded synthetic lab. test_client runs the app lifespan first, which
+    creates the service user and the virtual lab. The lab is removed at the
+    end of the session unless BENCH_KEEP_LAB=1.
+    """
+    yield seed_lab(sync_engine, bench_sizes)
+    if not KEEP_LAB:
+        drop_lab(sync_engine)
+
+
+@pytest.fixture(scope="session")
+async def bench_prometheus(bench_lab):
+    """
+    Synthetic Prometheus server scraping every seeded machine. The API, its
+    background workers included, is pointed at it for the whole session and
+    the metric caches are filled once before the first benchmark.
+    """
+    prometheus = FakePrometheus(
+        hosts=len(bench_lab["machine_ids"]),
+        latency=PROMETHEUS_LATENCY,
+        error_rate=PROMETHEUS_ERROR_RATE,
+        cardinality=PROMETHEUS_CARDINALITY,
+    )
+    with prometheus, mock.patch(
+        "app.utils.prometheus_service.PROMETHEUS_URL", prometheus.url
+    ):
+        await set_cache(
+            PROMETEUS_CACHE_STATUS_KEY,
+            json.dumps(await fetch_prometheus_metrics(["status"])),
+        )
+        await set_cache(
+            PROMETEUS_CACHE_METRICS_KEY,
+            json.dumps(
+                await fetch_prometheus_metrics(
+                    ["cpu_usage", "memory_usage", "disk_usage"]
+                )
+            ),
+        )
+        yield prometheus
+
+
+@pytest.fixture(scope="session")
+async def bench_client(bench_lab):  # pylint: disable=unused-argument
+    """
+    HTTP client for the benchmark target, the in-process app by default.
+    A BENCH_BASE_URL server must use the database the lab was seeded into.
+    """
+    base_url = os.getenv("BENCH_BASE_URL")
+    if base_url:
+        client = AsyncClient(base_url=base_url, timeout=60)
+    else:
+        client = AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench", timeout=60
+        )
+    async with client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+async def bench_headers(bench_client):
+    """Authorization header of the service (admin) account."""
+    res = await bench_client.post(
+        "/auth/login", data={"username": "Service", "password": "Service"}
+    )
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def bench_baseline():
+    """Committed baseline, empty when it does not exist yet."""
+    if not BASELINE_PATH.exists():
+        return {"threshold": DEFAULT_THRESHOLD, "endpoints": {}}
+    return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="session")
+def bench_results(bench_sizes, bench_baseline):
+    """
+    Collects results of all benchmarks and writes the JSON report at the end of
+    the session (and the baseline when LABBYN_BENCHMARK_UPDATE_BASELINE=1).
+    """
+    results = {}
+    yield results
+    if not results:
+        return
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "target": os.getenv("BENCH_BASE_URL", "in-process"),
+            "requests": BENCH_REQUESTS,
+            "concurrency": BENCH_CONCURRENCY,
+            "lab": bench_sizes.__dict__,
+        },
+        "endpoints": results,
+    }
+    RESULTS_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if UPDATE_BASELINE:
+        report["threshold"] = bench_baseline.get("threshold", DEFAULT_THRESHOLD)
+        # Merge, so a partial run (pytest -k) only updates its own entries
+        report["endpoints"] = bench_baseline["endpoints"] | {
+            name: {
+                "p50_ms": r["p50_ms"],
+                "p95_ms": r["p95_ms"],
+                "p99_ms": r["p99_ms"],
+                "throughput_rps": r["throughput_rps"],
+            }
+            for name, r in results.items()
+        }
+        BASELINE_PATH.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,102 @@
+"""
+Concurrent load generator and latency statistics for the benchmark suite.
+"""
+
+import asyncio
+import math
+import time
+
+
+def percentile(values, q: float):
+    """
+    Nearest-rank percentile.
+    :param values: Measured values
+    :param q: Percentile between 0 and 100
+    :return: Percentile value, 0 for no values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+async def run_calls(call, requests: int, concurrency: int):
+    """
+    Run an awaitable with a fixed number of concurrent workers.
+    :param call: Async callable(i) returning an error message or None
+    :param requests: Total number of calls
+    :param concurrency: Number of calls in flight
+    :return: Dictionary with latency percentiles (ms), throughput and errors
+    """
+    latencies = []
+    errors = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            error = await call(i)
+            latencies.append(time.perf_counter() - start)
+            if error:
+                errors.append(error)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+async def run_load(client, request_factory, requests: int, concurrency: int):
+    """
+    Send requests with a fixed number of concurrent workers.
+    :param client: httpx.AsyncClient
+    :param request_factory: Callable(i) returning (method, url, kwargs)
+    :param requests: Total number of requests
+    :param concurrency: Number of requests in flight
+    :return: Dictionary with latency percentiles (ms), throughput and errors
+    """
+
+    async def call(i):
+        method, url, kwargs = request_factory(i)
+        response = await client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            return f"{method} {url}: {response.status_code}"
+        return None
+
+    return await run_calls(call, requests, concurrency)
+
+
+def compare_to_baseline(name: str, result: dict, baseline: dict, threshold: float):
+    """
+    Compare a benchmark result with its committed baseline.
+    :param name: Benchmark name
+    :param result: Result of run_load
+    :param baseline: Baseline entry with p95_ms and throughput_rps
+    :param threshold: Allowed relative regression, e.g. 0.3 for 30%
+    :return: List of regression messages, empty when within threshold
+    """
+    problems = []
+    max_p95 = baseline["p95_ms"] * (1 + threshold)
+    if result["p95_ms"] > max_p95:
+        problems.append(
+            f"{name}: p95 {result['p95_ms']}ms > {max_p95:.2f}ms "
+            f"(baseline {baseline['p95_ms']}ms)"
+        )
+    min_rps = baseline["throughput_rps"] * (1 - threshold)
+    if result["throughput_rps"] < min_rps:
+        problems.append(
+            f"{name}: throughput {result['throughput_rps']} rps < {min_rps:.2f} rps "
+            f"(baseline {baseline['throughput_rps']} rps)"
+        )
+    return problems
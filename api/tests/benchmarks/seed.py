@@ -0,0 +1,398 @@
+"""
+Synthetic lab used by the benchmark suite.
+Rows are inserted with Core bulk statements and history with generate_series,
+so a full lab with millions of history rows seeds in well under a minute.
+"""
+
+import os
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select, text, update
+
+from app.db.models import (
+    Categories,
+    CPUs,
+    Disks,
+    EntityType,
+    History,
+    Inventory,
+    Machines,
+    Metadata,
+    Rack,
+    Rentals,
+    Rooms,
+    Shelf,
+    Tags,
+    TagsMachines,
+    TagsRacks,
+    TagsRooms,
+    Teams,
+    User,
+    UsersTeams,
+    UserType,
+)
+from app.utils.availability_service import refresh_items
+from tests.fake_prometheus import host_address
+
+PREFIX = "bench"
+CHUNK_SIZE = 5000
+
+
+@dataclass
+class LabSizes:
+    """
+    Number of rows seeded per entity, overridable with BENCH_* variables.
+    """
+
+    teams: int = 10
+    rooms: int = 20
+    racks: int = 250
+    shelves_per_rack: int = 10
+    machines: int = 5000
+    inventory: int = 3000
+    rentals: int = 10000
+    history: int = 2000000
+    users: int = 50
+    tags: int = 20
+
+    @classmethod
+    def from_env(cls):
+        """Read sizes from BENCH_<FIELD> environment variables."""
+        values = {
+            name: int(os.getenv(f"BENCH_{name.upper()}", default))
+            for name, default in asdict(cls()).items()
+        }
+        return cls(**values)
+
+
+def _insert(conn, model, rows):
+    """
+    Bulk insert rows in chunks and return the new primary keys in row order.
+    """
+    ids = []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start : start + CHUNK_SIZE]
+        ids.extend(conn.execute(stmt, chunk).scalars().all())
+    return ids
+
+
+def _insert_no_return(conn, model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        conn.execute(insert(model), rows[start : start + CHUNK_SIZE])
+
+
+def _without_statement_timeout(conn):
+    """
+    Bulk seeding and cleanup run far longer than DB_STATEMENT_TIMEOUT_MS allows
+    for API requests, lift the timeout for the current transaction only.
+    """
+    conn.execute(text("SET LOCAL statement_timeout = 0"))
+
+
+def _bench_ids(model, column):
+    return select(model.id).where(column.like(f"{PREFIX}\\_%"))
+
+
+def describe_lab(conn):
+    """
+    IDs of seeded entities that benchmarks pick request targets from.
+    :param conn: Open connection
+    :return: Dictionary of id lists
+    """
+
+    def ids(model, column):
+        return (
+            conn.execute(_bench_ids(model, column).order_by(model.id)).scalars().all()
+        )
+
+    return {
+        "team_ids": ids(Teams, Teams.name),
+        "room_ids": ids(Rooms, Rooms.name),
+        "rack_ids": ids(Rack, Rack.name),
+        "machine_ids": ids(Machines, Machines.name),
+        "inventory_ids": ids(Inventory, Inventory.name),
+    }
+
+
+def seed_lab(engine, sizes: LabSizes, seed: int = 42):
+    """
+    Seed the synthetic lab once, later calls reuse the existing rows.
+    :param engine: Sync engine of the benchmark database
+    :param sizes: Row counts to seed
+    :param seed: Random seed, keeps the data set identical between runs
+    :return: Dictionary of seeded ids (see describe_lab)
+    """
+    rnd = random.Random(seed)
+    with engine.begin() as conn:
+        _without_statement_timeout(conn)
+        already_seeded = conn.execute(
+            select(Teams.id).where(Teams.name == f"{PREFIX}_team_0")
+        ).scalar()
+        if already_seeded:
+            return describe_lab(conn)
+
+        team_ids = _insert(
+            conn, Teams, [{"name": f"{PREFIX}_team_{i}"} for i in range(sizes.teams)]
+        )
+        room_ids = _insert(
+            conn,
+            Rooms,
+            [
+                {
+                    "name": f"{PREFIX}_room_{i}",
+                    "room_type": "Server Room",
+                    "team_id": team_ids[i % len(team_ids)],
+                }
+                for i in range(sizes.rooms)
+            ],
+        )
+        tag_ids = _insert(
+            conn,
+            Tags,
+            [{"name": f"{PREFIX}_tag_{i}", "color": "blue"} for i in range(sizes.tags)],
+        )
+        user_ids = _insert(
+            conn,
+            User,
+            [
+                {
+                    "name": "Bench",
+                    "surname": f"User{i}",
+                    "login": f"{PREFIX}_user_{i}",
+                    "email": f"{PREFIX}_user_{i}@labbyn.bench",
+                    "hashed_password": "!",
+                    "user_type": UserType.USER,
+                }
+                for i in range(sizes.users)
+            ],
+        )
+        _insert_no_return(
+            conn,
+            UsersTeams,
+            [
+                {"user_id": uid, "team_id": team_ids[i % len(team_ids)]}
+                for i, uid in enumerate(user_ids)
+            ],
+        )
+
+        rack_ids = _insert(
+            conn,
+            Rack,
+            [
+                {
+                    "name": f"{PREFIX}_rack_{i}",
+                    "room_id": room_ids[i % len(room_ids)],
+                    "team_id": team_ids[i % len(team_ids)],
+                }
+                for i in range(sizes.racks)
+            ],
+        )
+        shelf_ids = _insert(
+            conn,
+            Shelf,
+            [
+                {"name": f"{PREFIX}_shelf_{r}_{o}", "rack_id": rack_id, "order": o}
+                for r, rack_id in enumerate(rack_ids)
+                for o in range(sizes.shelves_per_rack)
+            ],
+        )
+
+        metadata_ids = _insert(
+            conn,
+            Metadata,
+            [{"agent_prometheus": True} for _ in range(sizes.machines)],
+        )
+        machine_rows = []
+        for i in range(sizes.machines):
+            shelf_index = i % len(shelf_ids)
+            rack_index = shelf_index // sizes.shelves_per_rack
+            machine_rows.append(
+                {
+                    "name": f"{PREFIX}_srv_{i}",
+                    "localization_id": room_ids[rack_index % len(room_ids)],
+                    "team_id": team_ids[rack_index % len(team_ids)],
+                    "ip_address": host_address(i),
+                    "mac_address": f"02:00:00:{i // 65536 % 256:02x}:"
+                    f"{i // 256 % 256:02x}:{i % 256:02x}",
+                    "os": "Debian",
+                    "ram": "64GB",
+                    "metadata_id": metadata_ids[i],
+                    "shelf_id": shelf_ids[shelf_index],
+                }
+            )
+        machine_ids = _insert(conn, Machines, machine_rows)
+        _insert_no_return(
+            conn,
+            CPUs,
+            [
+                {"name": "Xeon", "machine_id": mid}
+                for mid in machine_ids
+                for _ in (0, 1)
+            ],
+        )
+        _insert_no_return(
+            conn,
+            Disks,
+            [
+                {"name": "nvme", "capacity": "2TB", "machine_id": mid}
+                for mid in machine_ids
+            ],
+        )
+
+        _insert_no_return(
+            conn,
+            TagsRacks,
+            [
+                {"rack_id": rack_id, "tag_id": tag_id}
+                for rack_id in rack_ids
+                for tag_id in rnd.sample(tag_ids, 2)
+            ],
+        )
+        _insert_no_return(
+            conn,
+            TagsRooms,
+            [
+                {"room_id": room_id, "tag_id": rnd.choice(tag_ids)}
+                for room_id in room_ids
+            ],
+        )
+        _insert_no_return(
+            conn,
+            TagsMachines,
+            [{"machine_id": mid, "tag_id": rnd.choice(tag_ids)} for mid in machine_ids],
+        )
+
+        category_id = conn.execute(
+            insert(Categories).returning(Categories.id),
+            {"name": f"{PREFIX}_category"},
+        ).scalar_one()
+        inventory_ids = _insert(
+            conn,
+            Inventory,
+            [
+                {
+                    "name": f"{PREFIX}_item_{i}",
+                    "quantity": 10,
+                    "team_id": team_ids[i % len(team_ids)],
+                    "localization_id": room_ids[i % len(room_ids)],
+                    "category_id": category_id,
+                }
+                for i in range(sizes.inventory)
+            ],
+        )
+
+        today = date.today()
+        rental_rows = []
+        for _ in range(sizes.rentals):
+            start = today + timedelta(days=rnd.randint(-400, 30))
+            end = start + timedelta(days=rnd.randint(1, 30))
+            rental_rows.append(
+                {
+                    "item_id": rnd.choice(inventory_ids),
+                    "user_id": rnd.choice(user_ids),
+                    "start_date": start,
+                    "end_date": end,
+                    "quantity": 1,
+                    "returned_on": end if end < today else None,
+                }
+            )
+        _insert_no_return(conn, Rentals, rental_rows)
+        refresh_items(conn, inventory_ids, today)
+        conn.execute(
+            text("""
+                INSERT INTO inventory_reservations (item_id, day, quantity)
+                SELECT item_id, day::date, SUM(quantity)
+                FROM rentals,
+                    generate_series(start_date, end_date, interval '1 day') AS day
+                WHERE item_id = ANY(:items)
+                GROUP BY item_id, day::date
+                """),
+            {"items": inventory_ids},
+        )
+
+        if sizes.history:
+            conn.execute(
+                text("""
+                    INSERT INTO history (entity_type, action, entity_id, user_id,
+                        timestamp, before_state, after_state, can_rollback)
+                    SELECT 'MACHINES',
+                        (ARRAY['CREATE', 'UPDATE', 'DELETE'])[1 + g % 3]::action_type_enum,
+                        :first_machine + g % :machines,
+                        :first_user + g % :users,
+                        now() - (g || ' seconds')::interval,
+                        jsonb_build_object('note', md5(g::text)),
+                        jsonb_build_object('note', md5((g + 1)::text)),
+                        true
+                    FROM generate_series(1, :rows) AS g
+                    """),
+                {
+                    "first_machine": machine_ids[0],
+                    "machines": len(machine_ids),
+                    "first_user": user_ids[0],
+                    "users": len(user_ids),
+                    "rows": sizes.history,
+                },
+            )
+        conn.execute(text("ANALYZE"))
+        return describe_lab(conn)
+
+
+def drop_lab(engine):
+    """
+    Delete every seeded row, including history and rentals created by the
+    benchmarks themselves, so the lab never leaks into other test runs.
+    :param engine: Sync engine of the benchmark database
+    """
+    machines = _bench_ids(Machines, Machines.name)
+    inventory = _bench_ids(Inventory, Inventory.name)
+    rooms = _bench_ids(Rooms, Rooms.name)
+    racks = _bench_ids(Rack, Rack.name)
+    users = _bench_ids(User, User.login)
+    tags = _bench_ids(Tags, Tags.name)
+    metadata = select(Machines.metadata_id).where(Machines.id.in_(machines))
+
+    with engine.begin() as conn:
+        _without_statement_timeout(conn)
+        metadata_ids = conn.execute(metadata).scalars().all()
+        statements = [
+            delete(History).where(
+                (History.user_id.in_(users))
+                | (
+                    (History.entity_type == EntityType.MACHINES)
+                    & History.entity_id.in_(machines)
+                )
+                | (
+                    (History.entity_type == EntityType.INVENTORY)
+                    & History.entity_id.in_(inventory)
+                )
+                | (
+                    (History.entity_type == EntityType.ROOM)
+                    & History.entity_id.in_(rooms)
+                )
+            ),
+            update(Inventory).where(Inventory.id.in_(inventory)).values(rental_id=None),
+            delete(Rentals).where(
+                Rentals.item_id.in_(inventory) | Rentals.user_id.in_(users)
+            ),
+            delete(Inventory).where(Inventory.id.in_(inventory)),
+            delete(Categories).where(Categories.name == f"{PREFIX}_category"),
+            delete(TagsMachines).where(TagsMachines.tag_id.in_(tags)),
+            delete(TagsRacks).where(TagsRacks.tag_id.in_(tags)),
+            delete(TagsRooms).where(TagsRooms.tag_id.in_(tags)),
+            delete(CPUs).where(CPUs.machine_id.in_(machines)),
+            delete(Disks).where(Disks.machine_id.in_(machines)),
+            delete(Machines).where(Machines.id.in_(machines)),
+            delete(Metadata).where(Metadata.id.in_(metadata_ids)),
+            delete(Shelf).where(Shelf.rack_id.in_(racks)),
+            delete(Rack).where(Rack.id.in_(racks)),
+            delete(UsersTeams).where(UsersTeams.user_id.in_(users)),
+            delete(User).where(User.id.in_(users)),
+            delete(Tags).where(Tags.id.in_(tags)),
+            delete(Rooms).where(Rooms.id.in_(rooms)),
+            delete(Teams).where(Teams.id.in_(_bench_ids(Teams, Teams.name))),
+        ]
+        for statement in statements:
+            conn.execute(statement.execution_options(synchronize_session=False))
@@ -0,0 +1,183 @@
+"""
+Latency and throughput benchmarks of the heaviest endpoints against a seeded
+synthetic lab. Skipped unless LABBYN_BENCHMARK is set, see conftest.py.
+"""
+
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from app.utils.prometheus_service import DEFAULT_QUERIES, fetch_prometheus_metrics
+from tests.benchmarks.conftest import (
+    BENCH_CONCURRENCY,
+    BENCH_REQUESTS,
+    DEFAULT_THRESHOLD,
+    UPDATE_BASELINE,
+)
+from tests.benchmarks.load import compare_to_baseline, run_calls, run_load
+from tests.benchmarks.seed import PREFIX
+from tests.fake_prometheus import host_address
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(
+        not os.getenv("LABBYN_BENCHMARK"),
+        reason="Set LABBYN_BENCHMARK=1 to run the benchmark suite",
+    ),
+]
+
+WARMUP_REQUESTS = int(os.getenv("BENCH_WARMUP", "5"))
+RENTAL_START = date.today() + timedelta(days=3650)
+
+
+def _pick(ids, i):
+    return ids[i % len(ids)]
+
+
+# name -> callable(lab, i) returning (method, url, request kwargs)
+ENDPOINTS = {
+    "racks_tree": lambda lab, i: ("GET", "/db/racks", {}),
+    "machines_list": lambda lab, i: ("GET", "/db/machines/", {}),
+    "machines_by_tag": lambda lab, i: (
+        "GET",
+        f"/db/machines/?tags={PREFIX}_tag_{i % 20}",
+        {},
+    ),
+    "tag_facets": lambda lab, i: ("GET", "/db/tags/facets", {}),
+    "machine_full_detail": lambda lab, i: (
+        "GET",
+        f"/db/machines/{_pick(lab['machine_ids'], i)}/full",
+        {},
+    ),
+    "rooms_dashboard": lambda lab, i: ("GET", "/db/rooms/dashboard", {}),
+    "room_details": lambda lab, i: (
+        "GET",
+        f"/db/rooms/{_pick(lab['room_ids'], i)}/details",
+        {},
+    ),
+    "teams_info": lambda lab, i: ("GET", "/db/teams/teams_info", {}),
+    "team_full_detail": lambda lab, i: (
+        "GET",
+        f"/db/teams/team_info/{_pick(lab['team_ids'], i)}",
+        {},
+    ),
+    "inventory_details": lambda lab, i: ("GET", "/db/inventory/details", {}),
+    "search": lambda lab, i: ("GET", f"/search?q=srv {i % 100}", {}),
+    "rentals_list": lambda lab, i: ("GET", "/db/rentals/", {}),
+    "prometheus_instances": lambda lab, i: ("GET", "/prometheus/instances", {}),
+    "prometheus_metrics": lambda lab, i: (
+        "GET",
+        "/prometheus/metrics?instances="
+        + ",".join(host_address(j) + ":9100" for j in range(i % 50, i % 50 + 10)),
+        {},
+    ),
+    "history_logs": lambda lab, i: ("GET", "/db/history/?limit=200", {}),
+    "history_subpage": lambda lab, i: ("GET", "/sub/history?limit=200", {}),
+    "auth_login": lambda lab, i: (
+        "POST",
+        "/auth/login",
+        {"data": {"username": "Service", "password": "Service"}},
+    ),
+    "machine_update": lambda lab, i: (
+        "PATCH",
+        f"/db/machines/{_pick(lab['machine_ids'], i)}",
+        {"json": {"os": f"Debian {i % 13}"}},
+    ),
+    "rental_create": lambda lab, i: (
+        "POST",
+        "/db/rentals/",
+        {
+            "json": {
+                "item_id": _pick(lab["inventory_ids"], i),
+                "start_date": str(RENTAL_START + timedelta(days=i)),
+                "end_date": str(RENTAL_START + timedelta(days=i)),
+                "quantity": 1,
+            }
+        },
+    ),
+}
+
+
+@pytest.mark.parametrize("name", list(ENDPOINTS))
+async def test_endpoint_benchmark(
+    name,
+    bench_client,
+    bench_headers,
+    bench_lab,
+    bench_prometheus,  # pylint: disable=unused-argument
+    bench_results,
+    bench_baseline,
+):
+    """
+    Load one endpoint and compare p95 latency and throughput to the baseline.
+    """
+    build = ENDPOINTS[name]
+
+    def request_factory(i):
+        method, url, kwargs = build(bench_lab, i)
+        return method, url, {**kwargs, "headers": bench_headers}
+
+    # Warm up connection pools and caches with requests outside the measured range
+    await run_load(
+        bench_client,
+        lambda i: request_factory(BENCH_REQUESTS + i),
+        WARMUP_REQUESTS,
+        1,
+    )
+    result = await run_load(
+        bench_client, request_factory, BENCH_REQUESTS, BENCH_CONCURRENCY
+    )
+    bench_results[name] = result
+
+    assert result["errors"] == 0, result["error_samples"]
+    _assert_within_baseline(name, result, bench_baseline)
+
+
+# name -> metrics fetched by one refresh of the background worker
+WORKER_REFRESHES = {
+    "worker_status_refresh": ["status"],
+    "worker_metrics_refresh": ["cpu_usage", "memory_usage", "disk_usage"],
+    "worker_all_metrics_refresh": list(DEFAULT_QUERIES),
+}
+
+
+@pytest.mark.parametrize("name", list(WORKER_REFRESHES))
+async def test_worker_refresh_benchmark(
+    name, bench_prometheus, bench_results, bench_baseline
+):
+    """
+    Time full refresh cycles of the Prometheus background workers, one at a
+    time as the workers run them.
+    """
+    metrics = WORKER_REFRESHES[name]
+
+    async def refresh(_):
+        payload = await fetch_prometheus_metrics(metrics, hosts=None)
+        failed = [m for m in metrics if isinstance(payload.get(m), dict)]
+        return f"{name}: {failed} failed" if failed else None
+
+    result = await run_calls(refresh, max(BENCH_REQUESTS // 10, 5), 1)
+    result["instances"] = len(bench_prometheus.instances)
+    bench_results[name] = result
+
+    assert result["errors"] == 0, result["error_samples"]
+    _assert_within_baseline(name, result, bench_baseline)
+
+
+def _assert_within_baseline(name, result, bench_baseline):
+    if UPDATE_BASELINE or name not in bench_baseline["endpoints"]:
+        return
+
+    problems = compare_to_baseline(
+        name,
+        result,
+        bench_baseline["endpoints"][name],
+        float(
+            os.getenv(
+                "BENCH_REGRESSION_THRESHOLD",
+                bench_baseline.get("threshold", DEFAULT_THRESHOLD),
+            )
+        ),
+    )
+    assert not problems, "\n".join(problems)
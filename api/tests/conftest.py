@@ -8,12 +8,14 @@ from unittest.mock import MagicMock
 import pytest
 from fastapi.testclient import TestClient
 
-from app.database import SessionLocal
+from app.database import SessionLocal, replica_engine, sync_engine
 from app.main import app
 from app.utils import redis_service
 from app.utils.redis_service import REDIS_URL
 from app.utils.redis_service import redis_manager
 from httpx import ASGITransport, AsyncClient
+from tests.fake_prometheus import FakePrometheus
+from tests.query_budget import query_budget_context
 
 
 @pytest.fixture(scope="session")
@@ -109,7 +111,7 @@ def mock_ansible_success(monkeypatch):
     mock_result.status = "successful"
     mock_run.return_value = mock_result
 
-    monkeypatch.setattr("app.utils.ansible_service.ansible_runner.run", mock_run)
+    monkeypatch.setattr("ansible_runner.run", mock_run)
     return mock_run
 
 
@@ -173,3 +175,41 @@ async def alpha_admin_header(test_client_async, service_header):
 
     token = login_res.json()["access_token"]
     return {"Authorization": f"Bearer {token}", "team_id": team_id}
+
+
+@pytest.fixture(scope="function")
+def query_budget():
+    """
+    Assert the number of SQL statements executed by requests in a block.
+    The sync engines (primary and read replica) are observed, authentication on
+    the async engine costs the same for every endpoint.
+    Usage: with query_budget(3): test_client.get(...)
+    :return: Factory taking max_queries and optional max_repeats
+    """
+
+    def _budget(max_queries: int, max_repeats=None):
+        engines = [e for e in (sync_engine, replica_engine) if e is not None]
+        return query_budget_context(engines, max_queries, max_repeats)
+
+    return _budget
+
+
+@pytest.fixture(scope="function")
+def fake_prometheus(monkeypatch):
+    """
+    Start a synthetic Prometheus server and point the API at it.
+    Usage: prometheus = fake_prometheus(hosts=5000, latency=0.05)
+    :param monkeypatch: Monkey patching fixture
+    :return: Factory taking FakePrometheus options
+    """
+    servers = []
+
+    def _start(**options):
+        server = FakePrometheus(**options).start()
+        servers.append(server)
+        monkeypatch.setattr("app.utils.prometheus_service.PROMETHEUS_URL", server.url)
+        return server
+
+    yield _start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,199 @@
+"""
+Synthetic Prometheus HTTP server used to test and benchmark the metrics
+pipeline offline. Answers /api/v1/query and /api/v1/query_range with generated
+node_exporter-like series for any number of hosts.
+"""
+
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Prometheus refuses range queries resolving to more points than this
+MAX_RANGE_POINTS = 11000
+
+
+def host_address(i: int) -> str:
+    """
+    IP address of the i-th synthetic host, the same scheme the benchmark lab
+    uses for machine addresses.
+    :param i: Host index
+    :return: IPv4 address
+    """
+    return f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+
+
+class FakePrometheus:
+    """
+    Threaded HTTP server generating Prometheus API responses.
+    Usage: with FakePrometheus(hosts=5000, latency=0.05) as prometheus: ...
+    """
+
+    def __init__(
+        self,
+        hosts: int = 10,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        cardinality: int = 1,
+        down_ratio: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        :param hosts: Number of scraped node_exporter instances
+        :param latency: Seconds every response is delayed by
+        :param error_rate: Share of requests answered with 503, 0 to 1
+        :param cardinality: Filesystem series (mountpoints) per host
+        :param down_ratio: Share of hosts reported as down by the up metric
+        :param seed: Random seed, keeps values and errors reproducible
+        """
+        self.instances = [f"{host_address(i)}:9100" for i in range(hosts)]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.cardinality = cardinality
+        self.down = set(self.instances[: int(hosts * down_ratio)])
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL, the PROMETHEUS_URL of the API."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving on a free local port in a background thread."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler bound to this fake server."""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Answer one Prometheus API request."""
+                status_code, body = fake.handle(self.path)
+                payload = json.dumps(body).encode()
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle(self, path: str):
+        """
+        Build the response for a request path.
+        :param path: Request path with query string
+        :return: Tuple of status code and JSON body
+        """
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            return 503, _error("unavailable", "synthetic failure")
+
+        url = urlparse(path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        query = params.get("query")
+        if not query:
+            return 400, _error("bad_data", "query parameter is missing")
+
+        if url.path == "/api/v1/query":
+            now = float(params.get("time", time.time()))
+            result = [
+                {"metric": labels, "value": [now, str(self.value(labels, query, now))]}
+                for labels in self.series(query)
+            ]
+            return 200, _success("vector", result)
+
+        if url.path == "/api/v1/query_range":
+            try:
+                start, end = float(params["start"]), float(params["end"])
+                step = float(params["step"])
+            except (KeyError, ValueError):
+                return 400, _error("bad_data", "start, end and step are required")
+            if step <= 0 or end < start:
+                return 400, _error("bad_data", "invalid range")
+            points = int((end - start) / step) + 1
+            if points > MAX_RANGE_POINTS:
+                return 400, _error("bad_data", "exceeded maximum resolution")
+            timestamps = [start + i * step for i in range(points)]
+            result = [
+                {
+                    "metric": labels,
+                    "values": [
+                        [t, str(self.value(labels, query, t))] for t in timestamps
+                    ],
+                }
+                for labels in self.series(query)
+            ]
+            return 200, _success("matrix", result)
+
+        return 404, _error("not_found", f"unknown path {url.path}")
+
+    def series(self, query: str):
+        """
+        Label sets returned for a query: one per host, or one per mountpoint of
+        every host for filesystem queries.
+        :param query: PromQL expression
+        :return: List of label dictionaries
+        """
+        if "node_filesystem" in query:
+            mountpoints = ["/"] + [f"/data{i}" for i in range(1, self.cardinality)]
+            return [
+                {"instance": instance, "job": "node", "mountpoint": mountpoint}
+                for instance in self.instances
+                for mountpoint in mountpoints
+            ]
+        return [{"instance": instance, "job": "node"} for instance in self.instances]
+
+    def value(self, labels: dict, query: str, timestamp: float) -> float:
+        """
+        Deterministic sample value of a series at a point in time.
+        :param labels: Series labels
+        :param query: PromQL expression
+        :param timestamp: Unix timestamp of the sample
+        :return: Sample value
+        """
+        if query.strip() == "up":
+            return 0.0 if labels["instance"] in self.down else 1.0
+        key = f"{labels['instance']}{labels.get('mountpoint', '')}".encode()
+        phase = zlib.crc32(key) % 60
+        return round(50 + 40 * ((int(timestamp) + phase) % 60 - 30) / 30, 2)
+
+
+def _success(result_type: str, result: list):
+    return {"status": "success", "data": {"resultType": result_type, "result": result}}
+
+
+def _error(error_type: str, message: str):
+    return {"status": "error", "errorType": error_type, "error": message}
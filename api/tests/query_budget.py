@@ -0,0 +1,117 @@
+"""
+SQL statement recorder used by the query_budget fixture.
+Counts statements executed while a block runs and reports repeated statement
+shapes, which usually mean a lazy load inside a loop (N+1).
+"""
+
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\(\w+\)s|\$\d+|\?")
+_IN_LIST = re.compile(r"IN \((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape by replacing literals and bound
+    parameters with placeholders.
+    :param statement: SQL statement as sent to the driver
+    :return: Normalized statement
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PARAMETER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip()
+    return _IN_LIST.sub("IN (?)", shape)
+
+
+class QueryRecorder:
+    """
+    Records SQL statements executed on the given engines.
+    """
+
+    def __init__(self, engines):
+        self.engines = engines
+        self.statements = []
+
+    def _record(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):  # pylint: disable=unused-argument,too-many-arguments
+        self.statements.append(statement)
+
+    def start(self):
+        """Attach the cursor listener to every engine."""
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+
+    def stop(self):
+        """Detach the cursor listener from every engine."""
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        """Number of recorded statements."""
+        return len(self.statements)
+
+    def repeated_shapes(self, min_repeats: int = 2):
+        """
+        Statement shapes executed at least min_repeats times.
+        :param min_repeats: Minimum number of executions to report
+        :return: List of (shape, count) sorted by count, highest first
+        """
+        shapes = Counter(normalize_statement(s) for s in self.statements)
+        return [(s, n) for s, n in shapes.most_common() if n >= min_repeats]
+
+    def report(self) -> str:
+        """
+        Human readable summary of recorded statements and likely N+1 patterns.
+        :return: Report text
+        """
+        lines = [f"{self.count} SQL statements executed:"]
+        lines += [f"  {i + 1}. {s}" for i, s in enumerate(self.statements)]
+        repeated = self.repeated_shapes()
+        if repeated:
+            lines.append("Repeated statement shapes (likely N+1):")
+            lines += [f"  {n}x {shape}" for shape, n in repeated]
+        return "\n".join(lines)
+
+
+@contextmanager
+def query_budget_context(engines, max_queries: int, max_repeats=None):
+    """
+    Fail the test when the block runs more statements than max_queries, or
+    when one statement shape repeats more than max_repeats times.
+    :param engines: Engines to observe
+    :param max_queries: Statement budget for the block
+    :param max_repeats: Optional limit for executions of a single shape
+    :return: QueryRecorder with the recorded statements
+    """
+    recorder = QueryRecorder(engines)
+    recorder.start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+
+    if recorder.count > max_queries:
+        pytest.fail(
+            f"Query budget exceeded: {recorder.count} > {max_queries}\n"
+            f"{recorder.report()}",
+            pytrace=False,
+        )
+    if max_repeats is not None:
+        worst = recorder.repeated_shapes(max_repeats + 1)
+        if worst:
+            pytest.fail(
+                f"Statement repeated more than {max_repeats} times "
+                f"(likely N+1)\n{recorder.report()}",
+                pytrace=False,
+            )
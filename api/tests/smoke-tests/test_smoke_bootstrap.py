@@ -0,0 +1,64 @@
+"""Smoke tests for the one-time database bootstrap run in the lifespan."""
+
+import concurrent.futures
+
+from sqlalchemy import delete, func, select
+
+from app.database import SessionLocal
+from app.db import models
+from app.utils.database_service import bootstrap_database
+
+
+def _bootstrap_in_new_session():
+    db = SessionLocal()
+    try:
+        return bootstrap_database(db)
+    finally:
+        db.close()
+
+
+def test_bootstrap_costs_one_query_when_current(
+    test_client, db_session, query_budget
+):  # pylint: disable=unused-argument
+    """
+    After the first start, bootstrap is a single version lookup.
+    """
+    with query_budget(1):
+        assert bootstrap_database(db_session) is False
+
+
+def test_concurrent_bootstrap_writes_seed_data_once(
+    test_client, db_session
+):  # pylint: disable=unused-argument
+    """
+    Workers starting together bootstrap once and never duplicate seed rows,
+    also on a database seeded before the bootstrap version was recorded.
+    """
+    db_session.execute(delete(models.BootstrapState))
+    db_session.commit()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: _bootstrap_in_new_session(), range(4)))
+
+    assert results.count(True) == 1
+    counts = db_session.execute(
+        select(
+            select(func.count())
+            .select_from(models.User)
+            .where(models.User.login == "Service")
+            .scalar_subquery(),
+            select(func.count())
+            .select_from(models.Teams)
+            .where(models.Teams.name == "Service Team")
+            .scalar_subquery(),
+            select(func.count())
+            .select_from(models.Rooms)
+            .where(models.Rooms.name == "virtual")
+            .scalar_subquery(),
+            select(func.count())
+            .select_from(models.Documentation)
+            .where(models.Documentation.title == "labbyn")
+            .scalar_subquery(),
+        )
+    ).one()
+    assert tuple(counts) == (1, 1, 1, 1)
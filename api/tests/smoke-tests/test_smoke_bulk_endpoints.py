@@ -0,0 +1,360 @@
+"""
+Smoke tests for the bulk import, export and batch update endpoints.
+"""
+
+import json
+import uuid
+from unittest import mock
+
+import pytest
+from app.db.models import ActionType, EntityType, History
+
+pytestmark = [pytest.mark.smoke, pytest.mark.api, pytest.mark.database]
+
+
+def unique_str(prefix: str):
+    """
+    Generate random name to avoid unique fields.
+    :param prefix: Starting prefix
+    :return: Prefix along with random name
+    """
+    return f"{prefix}_{uuid.uuid4().hex[:6]}"
+
+
+def test_bulk_user_import_reports_every_row(test_client, service_header_sync):
+    """
+    Valid rows are created with their teams, invalid ones are reported.
+    """
+    team_res = test_client.post(
+        "/db/teams/", json={"name": unique_str("BulkTeam")}, headers=service_header_sync
+    )
+    team_id = team_res.json()["id"]
+    logins = [unique_str("bulk") for _ in range(3)]
+    rows = [
+        {
+            "login": logins[0],
+            "email": f"{logins[0]}@lab.pl",
+            "name": "A",
+            "surname": "B",
+            "team_ids": [team_id],
+        },
+        {"login": logins[1], "email": "not-an-email", "name": "A", "surname": "B"},
+        {
+            "login": "Service",
+            "email": f"{logins[2]}@lab.pl",
+            "name": "A",
+            "surname": "B",
+        },
+        {
+            "login": logins[2],
+            "email": f"{logins[2]}@lab.pl",
+            "name": "A",
+            "surname": "B",
+            "team_ids": [999999],
+        },
+        {
+            "login": logins[0],
+            "email": f"{logins[0]}x@lab.pl",
+            "name": "A",
+            "surname": "B",
+        },
+    ]
+
+    response = test_client.post(
+        "/db/users/bulk", json=rows, headers=service_header_sync
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (1, 4)
+    results = data["results"]
+    assert [r["status"] for r in results] == ["created"] + ["error"] * 4
+    assert "email" in results[1]["detail"]
+    assert results[2]["detail"] == "User already exists."
+    assert "999999" in results[3]["detail"]
+    assert results[4]["detail"] == "User already exists."
+
+    created = test_client.get(
+        f"/db/users/{results[0]['id']}", headers=service_header_sync
+    ).json()
+    assert [m["team_id"] for m in created["membership"]] == [team_id]
+    login_res = test_client.post(
+        "/auth/login",
+        data={"username": logins[0], "password": results[0]["generated_password"]},
+    )
+    assert login_res.status_code == 200
+
+
+def test_bulk_user_import_from_csv(
+    test_client, service_header_sync, db_session, query_budget
+):
+    """
+    CSV rows are imported with a number of queries independent of the size.
+    """
+    teams = [
+        test_client.post(
+            "/db/teams/",
+            json={"name": unique_str("CsvTeam")},
+            headers=service_header_sync,
+        ).json()["id"]
+        for _ in range(2)
+    ]
+    logins = [unique_str("csv") for _ in range(30)]
+    csv_body = "login,email,name,surname,user_type,password,team_ids\n" + "".join(
+        f"{login},{login}@lab.pl,Csv,User,user,,{teams[0]};{teams[1]}\n"
+        for login in logins
+    )
+    csv_body += f"{logins[0]}_pw,{logins[0]}_pw@lab.pl,Csv,User,group_admin,Secret12,\n"
+
+    with query_budget(20):
+        response = test_client.post(
+            "/db/users/bulk",
+            content=csv_body,
+            headers={**service_header_sync, "Content-Type": "text/csv"},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (31, 0)
+    assert data["results"][-1]["generated_password"] == "Secret12"
+    created = test_client.get(
+        f"/db/users/{data['results'][0]['id']}", headers=service_header_sync
+    ).json()
+    assert sorted(m["team_id"] for m in created["membership"]) == sorted(teams)
+
+
+def test_bulk_user_import_rejects_bad_bodies(test_client, service_header_sync):
+    """
+    Bodies that are not a list of rows are rejected as a whole.
+    """
+
+    def post(headers=None, **kwargs):
+        return test_client.post(
+            "/db/users/bulk",
+            headers={**service_header_sync, **(headers or {})},
+            **kwargs,
+        )
+
+    assert post(json={"login": "x"}).status_code == 400
+    assert post(content="x", headers={"Content-Type": "text/plain"}).status_code == 415
+    assert post(json=[{}] * 1001).status_code == 413
+
+
+def _machine_fixtures(test_client, headers):
+    room_id = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("BulkRoom"), "room_type": "srv"},
+        headers=headers,
+    ).json()["id"]
+    rack_id = test_client.post(
+        "/db/racks",
+        json={"name": unique_str("BulkRack"), "room_id": room_id},
+        headers=headers,
+    ).json()["id"]
+    shelf_id = test_client.post(
+        f"/db/shelf/{rack_id}",
+        json={"name": unique_str("BulkShelf"), "order": 1},
+        headers=headers,
+    ).json()["id"]
+    tag = test_client.post(
+        "/db/tags/", json={"name": unique_str("bulk"), "color": "red"}, headers=headers
+    ).json()["name"]
+    return room_id, shelf_id, tag
+
+
+def test_bulk_machine_import_in_batches(
+    test_client, service_header_sync, db_session, query_budget
+):
+    """
+    A CSV import is committed in batches, each with a fixed number of queries
+    and one summarized history entry.
+    """
+    headers = service_header_sync
+    room_id, shelf_id, tag = _machine_fixtures(test_client, headers)
+    names = [unique_str("bulk-srv") for _ in range(60)]
+    csv_body = "name,localization_id,shelf_id,os,cpus,disks,tags,agent_prometheus\n"
+    csv_body += "".join(
+        f'{name},{room_id},{shelf_id},"Debian\n12",Xeon;Xeon,sda:1TB;sdb,{tag},true\n'
+        for name in names
+    )
+    csv_body += f"{names[0]},{room_id},,,,,,\n"
+    csv_body += f"{unique_str('bulk-srv')},{room_id},,,,,missing-tag,\n"
+
+    with mock.patch(
+        "app.routers.database_machine_router.BULK_BATCH_SIZE", 25
+    ), query_budget(40):
+        response = test_client.post(
+            "/db/machines/bulk",
+            content=csv_body,
+            headers={**headers, "Content-Type": "text/csv"},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (60, 2)
+    assert data["results"][60]["detail"] == "Machine already exists in this room."
+    assert "missing-tag" in data["results"][61]["detail"]
+
+    machine_ids = [r["id"] for r in data["results"][:60]]
+    machine = test_client.get(
+        f"/db/machines/{machine_ids[0]}/full", headers=headers
+    ).json()
+    assert machine["os"] == "Debian\n12"
+    assert [c["name"] for c in machine["cpus"]] == ["Xeon", "Xeon"]
+    assert sorted((d["name"], d["capacity"]) for d in machine["disks"]) == [
+        ("sda", "1TB"),
+        ("sdb", None),
+    ]
+    assert [t["name"] for t in machine["tags"]] == [tag]
+    assert machine["monitoring"] is True
+
+    audit = (
+        db_session.query(History)
+        .filter(
+            History.entity_type == EntityType.MACHINES,
+            History.entity_id.in_(machine_ids),
+        )
+        .all()
+    )
+    assert sorted(h.extra_data["bulk_import"] for h in audit) == [10, 25, 25]
+
+
+def test_bulk_machine_export_round_trip(test_client, service_header_sync):
+    """
+    Exported machines can be imported back, in both formats.
+    """
+    headers = service_header_sync
+    room_id, shelf_id, tag = _machine_fixtures(test_client, headers)
+    name = unique_str("export-srv")
+    rows = [
+        {
+            "name": name,
+            "localization_id": room_id,
+            "shelf_id": shelf_id,
+            "cpus": ["Epyc"],
+            "disks": ["nvme0:2TB"],
+            "tags": [tag],
+            "ansible_access": True,
+        }
+    ]
+    ndjson = "".join(json.dumps(row) + "\n" for row in rows)
+    imported = test_client.post(
+        "/db/machines/bulk",
+        content=ndjson,
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert imported.json()["created"] == 1
+
+    exported = test_client.get("/db/machines/export?format=ndjson", headers=headers)
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    row = next(
+        r
+        for r in map(json.loads, exported.text.splitlines())
+        if r["name"] == name and r["localization_id"] == room_id
+    )
+    assert {k: row[k] for k in rows[0]} == rows[0]
+
+    csv_export = test_client.get("/db/machines/export", headers=headers)
+    assert csv_export.headers["content-type"].startswith("text/csv")
+    line = next(
+        line for line in csv_export.text.splitlines() if line.startswith(f"{name},")
+    )
+    reimported = test_client.post(
+        "/db/machines/bulk",
+        content=csv_export.text.splitlines()[0] + "\n" + line + "\n",
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert reimported.json()["results"][0]["detail"] == (
+        "Machine already exists in this room."
+    )
+
+
+def test_batch_machine_update(
+    test_client, service_header_sync, db_session, query_budget
+):
+    """
+    Many machines are moved, re-teamed and re-tagged in one request, and a
+    rejected machine leaves all of them unchanged.
+    """
+    headers = service_header_sync
+    room_id, _, old_tag = _machine_fixtures(test_client, headers)
+    new_room_id, shelf_id, new_tag = _machine_fixtures(test_client, headers)
+    tag_ids = {
+        t["name"]: t["id"] for t in test_client.get("/db/tags/", headers=headers).json()
+    }
+    team_id = test_client.post(
+        "/db/teams/", json={"name": unique_str("BatchTeam")}, headers=headers
+    ).json()["id"]
+    rows = [
+        {"name": unique_str("batch-srv"), "localization_id": room_id, "tags": [old_tag]}
+        for _ in range(20)
+    ]
+    machine_ids = [
+        r["id"]
+        for r in test_client.post(
+            "/db/machines/bulk", json=rows, headers=headers
+        ).json()["results"]
+    ]
+
+    rejected = test_client.patch(
+        "/db/machines/batch",
+        json={"machine_ids": machine_ids + [999999], "team_id": team_id},
+        headers=headers,
+    )
+    assert rejected.status_code == 404
+    assert "999999" in rejected.json()["detail"]
+
+    with query_budget(14, max_repeats=1):
+        response = test_client.patch(
+            "/db/machines/batch",
+            json={
+                "machine_ids": machine_ids,
+                "team_id": team_id,
+                "shelf_id": shelf_id,
+                "add_tag_ids": [tag_ids[new_tag]],
+                "remove_tag_ids": [tag_ids[old_tag]],
+            },
+            headers=headers,
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": 20, "machine_ids": sorted(machine_ids)}
+    for machine_id in machine_ids[:2]:
+        machine = test_client.get(
+            f"/db/machines/{machine_id}/full", headers=headers
+        ).json()
+        assert [t["name"] for t in machine["tags"]] == [new_tag]
+        machine = test_client.get(f"/db/machines/{machine_id}", headers=headers).json()
+        assert (
+            machine["team_id"],
+            machine["localization_id"],
+            machine["shelf_id"],
+        ) == (
+            team_id,
+            new_room_id,
+            shelf_id,
+        )
+
+    audit = (
+        db_session.query(History)
+        .filter(
+            History.entity_type == EntityType.MACHINES,
+            History.entity_id == machine_ids[0],
+            History.action == ActionType.UPDATE,
+        )
+        .one()
+    )
+    assert audit.extra_data["shelf_id"] == {"old": None, "new": shelf_id}
+    assert audit.extra_data["localization_id"] == {"old": room_id, "new": new_room_id}
+
+    mismatch = test_client.patch(
+        "/db/machines/batch",
+        json={
+            "machine_ids": machine_ids,
+            "shelf_id": shelf_id,
+            "localization_id": room_id,
+        },
+        headers=headers,
+    )
+    assert mismatch.status_code == 400
@@ -0,0 +1,254 @@
+"""
+Smoke tests for conditional requests (ETag, If-None-Match, If-Modified-Since).
+"""
+
+import uuid
+from datetime import date
+
+import pytest
+
+pytestmark = [pytest.mark.smoke, pytest.mark.api, pytest.mark.database]
+
+
+def unique_str(prefix: str):
+    """
+    Generate random name to avoid unique fields.
+    :param prefix: Starting prefix
+    :return: Prefix along with random name
+    """
+    return f"{prefix}_{uuid.uuid4().hex[:6]}"
+
+
+@pytest.fixture(name="lab")
+def fixture_lab(test_client, service_header_sync):
+    """
+    Room with a tag and one rack holding one machine on one shelf.
+    """
+    headers = service_header_sync
+    tag = test_client.post(
+        "/db/tags/", json={"name": unique_str("tag"), "color": "red"}, headers=headers
+    ).json()
+    room = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("room"), "room_type": "srv", "tag_ids": [tag["id"]]},
+        headers=headers,
+    ).json()
+    layout = test_client.post("/db/layout/", json={"x": 3, "y": 4}, headers=headers)
+    rack = test_client.post(
+        "/db/racks",
+        json={
+            "name": unique_str("rack"),
+            "room_id": room["id"],
+            "layout_id": layout.json()["id"],
+        },
+        headers=headers,
+    ).json()
+    shelf = test_client.post(
+        f"/db/shelf/{rack['id']}",
+        json={"name": unique_str("shelf"), "order": 1},
+        headers=headers,
+    ).json()
+    meta = test_client.post(
+        "/db/metadata/", json={"agent_prometheus": False}, headers=headers
+    ).json()
+    machine = test_client.post(
+        "/db/machines/",
+        json={
+            "name": unique_str("srv"),
+            "localization_id": room["id"],
+            "metadata_id": meta["id"],
+        },
+        headers=headers,
+    ).json()
+    test_client.post(
+        f"/db/machines/{machine['id']}/mount/{shelf['id']}", headers=headers
+    )
+    document = test_client.post(
+        "/db/documentation/",
+        json={"title": unique_str("doc"), "content": "-", "tag_ids": [tag["id"]]},
+        headers=headers,
+    ).json()
+    team = test_client.get("/db/teams/", headers=headers).json()[0]
+    return {
+        "team": team,
+        "room": room,
+        "rack": rack,
+        "shelf": shelf,
+        "machine": machine,
+        "tag": tag,
+        "documentation": document,
+    }
+
+
+def detail_urls(lab):
+    """
+    Detail endpoint of each entity of the lab.
+    """
+    return [
+        f"/db/machines/{lab['machine']['id']}",
+        f"/db/racks/{lab['rack']['id']}",
+        f"/db/shelf/{lab['shelf']['id']}",
+        f"/db/rooms/{lab['room']['id']}",
+        f"/db/teams/{lab['team']['id']}",
+        f"/db/tags/{lab['tag']['id']}",
+        f"/db/documentation/{lab['documentation']['id']}",
+    ]
+
+
+def test_room_snapshot_revalidation(
+    test_client, service_header_sync, lab, query_budget
+):
+    """
+    The room snapshot answers a current If-None-Match or If-Modified-Since
+    with 304 after one version query, and changes its ETag when a machine in
+    one of its racks changes.
+    """
+    headers = service_header_sync
+    url = f"/db/rooms/{lab['room']['id']}/snapshot"
+
+    response = test_client.get(url, headers=headers)
+    assert response.status_code == 200
+    snapshot = response.json()
+    assert snapshot["room"]["tags"][0]["name"] == lab["tag"]["name"]
+    assert [(l["x"], l["y"]) for l in snapshot["layouts"]] == [(3, 4)]
+    assert [r["id"] for r in snapshot["racks"]] == [lab["rack"]["id"]]
+    machines = snapshot["racks"][0]["shelves"][0]["machines"]
+    assert [m["id"] for m in machines] == [lab["machine"]["id"]]
+    etag = response.headers["etag"]
+
+    with query_budget(2):
+        cached = test_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    since = {"If-Modified-Since": response.headers["last-modified"]}
+    assert test_client.get(url, headers={**headers, **since}).status_code == 304
+
+    test_client.patch(
+        f"/db/machines/{lab['machine']['id']}",
+        json={"name": "renamed"},
+        headers=headers,
+    )
+    changed = test_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["racks"][0]["shelves"][0]["machines"][0]["name"] == (
+        "renamed"
+    )
+    missing = test_client.get("/db/rooms/999999/snapshot", headers=headers)
+    assert missing.status_code == 404
+
+
+def test_entity_detail_revalidation(
+    test_client, service_header_sync, lab, query_budget
+):
+    """
+    Entity detail endpoints send an ETag and answer a current If-None-Match
+    with 304 after one version query.
+    """
+    headers = service_header_sync
+    for url in detail_urls(lab):
+        response = test_client.get(url, headers=headers)
+        assert response.status_code == 200, url
+        etag = response.headers["etag"]
+        with query_budget(2):
+            cached = test_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304, url
+        assert cached.content == b""
+        weak = {"If-None-Match": f'"other", W/{etag}'}
+        assert test_client.get(url, headers={**headers, **weak}).status_code == 304
+
+
+def test_etag_follows_embedded_relations(test_client, service_header_sync, lab):
+    """
+    Changes to rows embedded in a response change its ETag, even when they do
+    not bump the version_id of the entity.
+    """
+    headers = service_header_sync
+    room_url = f"/db/rooms/{lab['room']['id']}"
+    shelf_url = f"/db/shelf/{lab['shelf']['id']}"
+    room_etag = test_client.get(room_url, headers=headers).headers["etag"]
+    shelf_etag = test_client.get(shelf_url, headers=headers).headers["etag"]
+
+    tag = test_client.post(
+        "/db/tags/", json={"name": unique_str("tag"), "color": "blue"}, headers=headers
+    ).json()
+    test_client.post(
+        "/db/tags/assign",
+        json={
+            "tag_id": tag["id"],
+            "entity_id": lab["room"]["id"],
+            "entity_type": "room",
+        },
+        headers=headers,
+    )
+    test_client.patch(
+        f"/db/machines/{lab['machine']['id']}", json={"note": "moved"}, headers=headers
+    )
+
+    room = test_client.get(room_url, headers={**headers, "If-None-Match": room_etag})
+    assert room.status_code == 200
+    assert len(room.json()["tags"]) == 2
+    shelf = test_client.get(shelf_url, headers={**headers, "If-None-Match": shelf_etag})
+    assert shelf.status_code == 200
+
+
+def test_if_match_precondition(test_client, service_header_sync, lab):
+    """
+    Writes with an If-Match that is not the current ETag fail with 412 and
+    change nothing.
+    """
+    headers = service_header_sync
+    url = f"/db/machines/{lab['machine']['id']}"
+    etag = test_client.get(url, headers=headers).headers["etag"]
+
+    first = test_client.patch(
+        url, json={"name": "first"}, headers={**headers, "If-Match": etag}
+    )
+    assert first.status_code == 200
+    stale = test_client.patch(
+        url, json={"name": "second"}, headers={**headers, "If-Match": etag}
+    )
+    assert stale.status_code == 412
+    assert test_client.get(url, headers=headers).json()["name"] == "first"
+
+    weak = {"If-Match": "W/" + test_client.get(url, headers=headers).headers["etag"]}
+    assert test_client.delete(url, headers={**headers, **weak}).status_code == 412
+    stale = test_client.delete(url, headers={**headers, "If-Match": etag})
+    assert stale.status_code == 412
+    deleted = test_client.delete(url, headers={**headers, "If-Match": "*"})
+    assert deleted.status_code == 204
+
+
+def test_inventory_etag_follows_rentals(test_client, service_header_sync):
+    """
+    Renting an item changes its ETag, its rented quantity is part of it.
+    """
+    headers = service_header_sync
+    room_id = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("room"), "room_type": "srv"},
+        headers=headers,
+    ).json()["id"]
+    category_id = test_client.post(
+        "/db/categories/", json={"name": unique_str("cat")}, headers=headers
+    ).json()["id"]
+    item_id = test_client.post(
+        "/db/inventory/",
+        json={
+            "name": unique_str("item"),
+            "quantity": 2,
+            "category_id": category_id,
+            "localization_id": room_id,
+        },
+        headers=headers,
+    ).json()["id"]
+    url = f"/db/inventory/{item_id}"
+    etag = test_client.get(url, headers=headers).headers["etag"]
+
+    today = date.today().isoformat()
+    rental = {"item_id": item_id, "start_date": today, "end_date": today, "quantity": 1}
+    created = test_client.post("/db/rentals/", json=rental, headers=headers)
+    assert created.status_code == 201
+    response = test_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["rented_quantity"] == 1
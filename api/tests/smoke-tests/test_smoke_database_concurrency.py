@@ -4,8 +4,11 @@ Verifies locking mechanisms (Redis) and Transaction Isolation.
 """
 
 import pytest
+import time
 import uuid
 import concurrent.futures
+from sqlalchemy import event
+from app.database import sync_engine
 from app.db.models import Machines, Inventory, Rentals
 
 pytestmark = [
@@ -25,7 +28,7 @@ def test_rental_race_condition_threaded(test_client, db_session, service_header_
     Test Race Condition:
     Two users try to rent the SAME item at the EXACT SAME time.
 
-    Expected behavior with Redis Lock:
+    Expected behavior with the reservation calendar row locks:
     - User A gets 201 Created (Success)
     - User B gets 409 Conflict (Item already rented)
 
@@ -111,3 +114,181 @@ def test_rental_race_condition_threaded(test_client, db_session, service_header_
     db_session.expire_all()
     count = db_session.query(Rentals).filter(Rentals.item_id == item_id).count()
     assert count == 1, f"Should exists only 1, got: {count} (DOUBLE BOOKING!)"
+
+
+SLOW_STATEMENT_SECONDS = 0.2
+SLOW_STATEMENTS = ("UPDATE machines", "INSERT INTO rentals", "UPDATE rentals")
+
+
+@pytest.fixture(scope="function")
+def slow_hot_path_statements():
+    """
+    Make the writes of the hot mutation paths take SLOW_STATEMENT_SECONDS.
+    The delay blocks the calling thread, like a slow query does.
+    """
+
+    def delay(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+        if statement.lstrip().startswith(SLOW_STATEMENTS):
+            time.sleep(SLOW_STATEMENT_SECONDS)
+
+    event.listen(sync_engine, "before_cursor_execute", delay)
+    yield
+    event.remove(sync_engine, "before_cursor_execute", delay)
+
+
+def run_concurrently(calls):
+    """Run callables at the same time and return (responses, elapsed seconds)."""
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        responses = list(executor.map(lambda call: call(), calls))
+    return responses, time.perf_counter() - start
+
+
+@pytest.mark.database
+def test_hot_paths_scale_with_concurrency(
+    test_client, service_header_sync, slow_hot_path_statements
+):
+    """
+    Concurrent update_machine, mount_machine, create_rental and return_rental
+    calls overlap their slow statements. If the handlers blocked the event loop
+    the requests would serialize and take at least n * SLOW_STATEMENT_SECONDS.
+    """
+    ac = test_client
+    headers = service_header_sync
+    n = 6
+
+    room_id = ac.post(
+        "/db/rooms/",
+        json={"name": unique_str("Room"), "room_type": "srv"},
+        headers=headers,
+    ).json()["id"]
+    rack = ac.post(
+        "/db/racks",
+        json={"name": unique_str("Rack"), "room_id": room_id},
+        headers=headers,
+    ).json()
+    shelf_id = ac.post(
+        f"/db/shelf/{rack['id']}",
+        json={"name": unique_str("Shelf"), "order": 1},
+        headers=headers,
+    ).json()["id"]
+    cat_id = ac.post(
+        "/db/categories/", json={"name": unique_str("Cat")}, headers=headers
+    ).json()["id"]
+
+    machine_ids, item_ids = [], []
+    for _ in range(n):
+        meta_id = ac.post(
+            "/db/metadata/", json={"agent_prometheus": False}, headers=headers
+        ).json()["id"]
+        machine_ids.append(
+            ac.post(
+                "/db/machines/",
+                json={
+                    "name": unique_str("srv"),
+                    "localization_id": room_id,
+                    "metadata_id": meta_id,
+                },
+                headers=headers,
+            ).json()["id"]
+        )
+        item_ids.append(
+            ac.post(
+                "/db/inventory/",
+                json={
+                    "name": unique_str("Item"),
+                    "quantity": 1,
+                    "category_id": cat_id,
+                    "localization_id": room_id,
+                },
+                headers=headers,
+            ).json()["id"]
+        )
+
+    serialized = n * SLOW_STATEMENT_SECONDS
+
+    def patch(mid):
+        return lambda: ac.patch(
+            f"/db/machines/{mid}", json={"os": "Alpine"}, headers=headers
+        )
+
+    def mount(mid):
+        return lambda: ac.post(f"/db/machines/{mid}/mount/{shelf_id}", headers=headers)
+
+    def rent(item_id):
+        return lambda: ac.post(
+            "/db/rentals/",
+            json={
+                "item_id": item_id,
+                "quantity": 1,
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-07",
+            },
+            headers=headers,
+        )
+
+    def give_back(rental_id):
+        return lambda: ac.post(f"/db/rentals/{rental_id}/return", headers=headers)
+
+    for calls, expected in (
+        ([patch(mid) for mid in machine_ids], 200),
+        ([mount(mid) for mid in machine_ids], 200),
+        ([rent(item_id) for item_id in item_ids], 201),
+    ):
+        responses, elapsed = run_concurrently(calls)
+        assert [r.status_code for r in responses] == [expected] * n
+        assert elapsed < serialized * 0.6, f"{elapsed:.2f}s, requests serialized"
+
+    rental_ids = [r.json()["id"] for r in responses]
+    responses, elapsed = run_concurrently([give_back(rid) for rid in rental_ids])
+    assert [r.status_code for r in responses] == [200] * n
+    assert elapsed < serialized * 0.6, f"{elapsed:.2f}s, requests serialized"
+
+
+@pytest.mark.database
+def test_same_item_bookings_queue(
+    test_client, service_header_sync, db_session, slow_hot_path_statements
+):
+    """
+    Concurrent bookings of one item wait for each other instead of failing:
+    all of them are answered, and exactly the stock is booked.
+    """
+    ac = test_client
+    headers = service_header_sync
+    room_id = ac.post(
+        "/db/rooms/",
+        json={"name": unique_str("Room"), "room_type": "srv"},
+        headers=headers,
+    ).json()["id"]
+    cat_id = ac.post(
+        "/db/categories/", json={"name": unique_str("Cat")}, headers=headers
+    ).json()["id"]
+    item_id = ac.post(
+        "/db/inventory/",
+        json={
+            "name": unique_str("Item"),
+            "quantity": 3,
+            "category_id": cat_id,
+            "localization_id": room_id,
+        },
+        headers=headers,
+    ).json()["id"]
+
+    def rent(start_day):
+        return lambda: ac.post(
+            "/db/rentals/",
+            json={
+                "item_id": item_id,
+                "quantity": 1,
+                "start_date": f"2024-01-0{start_day}",
+                "end_date": "2024-01-07",
+            },
+            headers=headers,
+        )
+
+    responses, _ = run_concurrently([rent(day) for day in range(1, 6)])
+
+    assert sorted(r.status_code for r in responses) == [201] * 3 + [409] * 2
+    db_session.expire_all()
+    count = db_session.query(Rentals).filter(Rentals.item_id == item_id).count()
+    assert count == 3
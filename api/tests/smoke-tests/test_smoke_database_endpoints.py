@@ -4,9 +4,14 @@ Verifies that HTTP endpoints are reachable, accept valid JSON,
 handle errors correctly (4xx), and persist data via the router layer.
 """
 
+import json
 import uuid
+from unittest import mock
+
 import pytest
+from app.db.models import User, UserType
 from app.main import app
+from app.utils.security import get_password_helper, verify_password
 
 pytestmark = [pytest.mark.smoke, pytest.mark.api, pytest.mark.database]
 
@@ -182,3 +187,115 @@ def test_resource_chain_creation(test_client, service_header_sync, db_session):
         "/db/machines/", json=machine_payload, headers=new_admin_header
     )
     assert machine_res.status_code == 201
+
+
+def test_login_rehashes_outdated_password_hash(test_client, db_session):
+    """
+    A hash with another scheme or cost is replaced by the configured one on
+    the first successful login.
+    """
+    login = unique_str("rehash")
+    user = User(
+        login=login,
+        name="Re",
+        surname="Hash",
+        email=f"{login}@labbyn.service",
+        hashed_password=get_password_helper("bcrypt", bcrypt_rounds=4).hash("Secret1"),
+        user_type=UserType.USER,
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    response = test_client.post(
+        "/auth/login", data={"username": login, "password": "Secret1"}
+    )
+    assert response.status_code == 200
+
+    db_session.refresh(user)
+    assert user.hashed_password.startswith("$argon2")
+    assert verify_password("Secret1", user.hashed_password)
+    wrong = test_client.post(
+        "/auth/login", data={"username": login, "password": "Secret2"}
+    )
+    assert wrong.status_code == 400
+
+
+def test_db_pool_metrics_endpoint(test_client, service_header_sync):
+    """
+    Pool telemetry is exposed for both engines.
+    """
+    response = test_client.get("/metrics/db-pool", headers=service_header_sync)
+    assert response.status_code == 200
+    data = response.json()
+    for engine in ("sync", "async"):
+        assert data[engine]["pool_size"] > 0
+        assert data[engine]["checkouts"] >= 0
+        assert "wait_seconds_max" in data[engine]
+
+
+def test_startup_metrics_endpoint(test_client, service_header_sync):
+    """
+    Startup phases of the worker are reported after the lifespan has run.
+    """
+    response = test_client.get("/metrics/startup", headers=service_header_sync)
+    assert response.status_code == 200
+    phases = response.json()["phases"]
+    for phase in ("imports", "app_setup", "bootstrap"):
+        assert phases[phase] >= 0
+
+
+def test_prometheus_metrics_endpoint(test_client, service_header_sync):
+    """
+    Requests are exported per route template with their SQL query counts.
+    """
+    assert test_client.get("/db/racks", headers=service_header_sync).status_code == 200
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'labbyn_http_request_duration_seconds_count{method="GET",route="/db/racks"'
+        in body
+    )
+    assert (
+        'labbyn_http_request_db_queries_count{method="GET",route="/db/racks"}' in body
+    )
+    assert 'labbyn_db_pool_checked_out{engine="sync"}' in body
+
+
+def test_machine_full_detail_with_prometheus_errors(test_client, service_header_sync):
+    """
+    Cached Prometheus errors must not break the machine detail page.
+    """
+    headers = service_header_sync
+    room = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("room"), "room_type": "Server Room"},
+        headers=headers,
+    ).json()
+    meta = test_client.post(
+        "/db/metadata/", json={"agent_prometheus": True}, headers=headers
+    ).json()
+    machine = test_client.post(
+        "/db/machines/",
+        json={
+            "name": unique_str("srv"),
+            "localization_id": room["id"],
+            "metadata_id": meta["id"],
+            "ip_address": "10.9.9.9",
+        },
+        headers=headers,
+    ).json()
+    error = json.dumps({"status": {"error": "Prometheus unreachable"}})
+
+    with mock.patch(
+        "app.routers.database_machine_router.get_cache",
+        new=mock.AsyncMock(return_value=error),
+    ):
+        response = test_client.get(
+            f"/db/machines/{machine['id']}/full", headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["network_status"] == "Offline"
@@ -0,0 +1,140 @@
+"""
+Transaction Pooling Tests.
+Runs the API engines in transaction mode against the PgBouncer service
+(docker compose up pgbouncer) and verifies that server connections stay
+bounded by the pooler as more API replicas are added.
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.database import (
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    DB_STATEMENT_TIMEOUT_MS,
+    create_async_db_engine,
+    create_sync_db_engine,
+    sync_engine,
+)
+
+PGBOUNCER_URL = os.getenv("PGBOUNCER_URL")
+PGBOUNCER_POOL_SIZE = int(os.getenv("PGBOUNCER_DEFAULT_POOL_SIZE", "10"))
+# pg_settings reports both timeouts in milliseconds
+TIMEOUT_SETTINGS = text(
+    "SELECT name, setting FROM pg_settings "
+    "WHERE name IN ('statement_timeout', 'idle_in_transaction_session_timeout')"
+)
+EXPECTED_TIMEOUTS = {
+    "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+    "idle_in_transaction_session_timeout": str(DB_IDLE_IN_TRANSACTION_TIMEOUT_MS),
+}
+
+pytestmark = [
+    pytest.mark.smoke,
+    pytest.mark.database,
+    pytest.mark.skipif(not PGBOUNCER_URL, reason="PGBOUNCER_URL is not set"),
+]
+
+
+def server_connections():
+    """Client backends connected directly to Postgres, excluding this one."""
+    with sync_engine.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT count(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() "
+                "AND backend_type = 'client backend' "
+                "AND pid <> pg_backend_pid()"
+            )
+        ).scalar()
+
+
+def peak_connections_under_load(replicas: int, workers_per_replica: int = 4):
+    """
+    Simulate API replicas, each with its own transaction-mode engine and several
+    concurrent requests, and sample the peak number of server connections.
+    """
+    engines = [
+        create_sync_db_engine(PGBOUNCER_URL, "transaction") for _ in range(replicas)
+    ]
+    stop = threading.Event()
+    peak = 0
+
+    def sample():
+        nonlocal peak
+        while not stop.is_set():
+            peak = max(peak, server_connections())
+            time.sleep(0.01)
+
+    def work(engine):
+        for _ in range(5):
+            with engine.begin() as conn:
+                conn.execute(text("SELECT pg_sleep(0.02)"))
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=replicas * workers_per_replica
+        ) as executor:
+            futures = [
+                executor.submit(work, engine)
+                for engine in engines
+                for _ in range(workers_per_replica)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        stop.set()
+        sampler.join()
+        for engine in engines:
+            engine.dispose()
+    return peak
+
+
+def test_server_connections_stay_flat_with_more_replicas():
+    """
+    Adding replicas must not add Postgres connections beyond the pooler's pool.
+    """
+    baseline = server_connections()
+
+    peak_one = peak_connections_under_load(replicas=1)
+    peak_many = peak_connections_under_load(replicas=8)
+
+    assert peak_many <= baseline + PGBOUNCER_POOL_SIZE
+    assert peak_many - peak_one <= PGBOUNCER_POOL_SIZE
+
+
+async def test_async_engine_statements_through_pooler():
+    """
+    asyncpg must not reuse named prepared statements across transactions, which
+    may be served by different server connections.
+    """
+    engine = create_async_db_engine(PGBOUNCER_URL, "transaction")
+    try:
+        for i in range(20):
+            async with engine.begin() as conn:
+                value = await conn.scalar(text("SELECT CAST(:x AS int) + 1"), {"x": i})
+                assert value == i + 1
+                timeouts = dict((await conn.execute(TIMEOUT_SETTINGS)).all())
+                assert timeouts == EXPECTED_TIMEOUTS
+    finally:
+        await engine.dispose()
+
+
+def test_sync_engine_applies_timeouts_per_transaction():
+    """
+    Timeouts are applied with SET LOCAL semantics on every transaction, since
+    the pooler may hand each transaction a different server connection.
+    """
+    engine = create_sync_db_engine(PGBOUNCER_URL, "transaction")
+    try:
+        for _ in range(5):
+            with engine.begin() as conn:
+                assert dict(conn.execute(TIMEOUT_SETTINGS).all()) == EXPECTED_TIMEOUTS
+    finally:
+        engine.dispose()
@@ -0,0 +1,189 @@
+"""
+Query Budget Tests.
+Guards list endpoints against N+1 regressions. Budgets include the team
+membership lookup done by RequestContext and must not grow with row counts.
+"""
+
+import uuid
+
+import pytest
+
+pytestmark = [
+    pytest.mark.smoke,
+    pytest.mark.database,
+    pytest.mark.api,
+]
+
+
+def unique_str(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:6]}"
+
+
+@pytest.fixture(scope="function")
+def extra_racks_and_machines(test_client, service_header_sync):
+    """
+    Add a few racks with tags and machines with cpus/disks, so lazy loads in a
+    loop would show up as repeated statements.
+    """
+    headers = service_header_sync
+    room = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("room"), "room_type": "Server Room"},
+        headers=headers,
+    ).json()
+    tag = test_client.post(
+        "/db/tags/", json={"name": unique_str("tag"), "color": "red"}, headers=headers
+    ).json()
+    for _ in range(3):
+        rack_res = test_client.post(
+            "/db/racks",
+            json={
+                "name": unique_str("rack"),
+                "room_id": room["id"],
+                "tag_ids": [tag["id"]],
+            },
+            headers=headers,
+        )
+        assert rack_res.status_code == 201
+        meta = test_client.post(
+            "/db/metadata/", json={"agent_prometheus": False}, headers=headers
+        ).json()
+        machine_res = test_client.post(
+            "/db/machines/",
+            json={
+                "name": unique_str("srv"),
+                "localization_id": room["id"],
+                "metadata_id": meta["id"],
+                "cpus": [{"name": "CPU"}],
+                "disks": [{"name": "SSD", "capacity": "1TB"}],
+            },
+            headers=headers,
+        )
+        assert machine_res.status_code == 201
+
+
+@pytest.mark.parametrize(
+    "url,budget",
+    [
+        ("/db/racks", 3),
+        ("/db/machines/", 4),
+    ],
+)
+def test_list_endpoint_query_budget(
+    test_client,
+    service_header_sync,
+    extra_racks_and_machines,
+    query_budget,
+    url,
+    budget,
+):
+    """
+    List endpoints run a fixed number of statements regardless of row count.
+    """
+    with query_budget(budget, max_repeats=1):
+        response = test_client.get(url, headers=service_header_sync)
+    assert response.status_code == 200
+
+
+def test_rack_tree_renders_changed_racks_only(
+    test_client, service_header_sync, query_budget
+):
+    """
+    Unchanged racks are served from the rendered rack cache, a change to a
+    machine on one of its shelves renders the rack again.
+    """
+    headers = service_header_sync
+    room = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("room"), "room_type": "Server Room"},
+        headers=headers,
+    ).json()
+    rack = test_client.post(
+        "/db/racks",
+        json={"name": unique_str("rack"), "room_id": room["id"]},
+        headers=headers,
+    ).json()
+    shelf = test_client.post(
+        f"/db/shelf/{rack['id']}",
+        json={"name": unique_str("shelf"), "order": 1},
+        headers=headers,
+    ).json()
+    meta = test_client.post(
+        "/db/metadata/", json={"agent_prometheus": False}, headers=headers
+    ).json()
+    machine = test_client.post(
+        "/db/machines/",
+        json={
+            "name": unique_str("srv"),
+            "localization_id": room["id"],
+            "metadata_id": meta["id"],
+        },
+        headers=headers,
+    ).json()
+    test_client.post(
+        f"/db/machines/{machine['id']}/mount/{shelf['id']}", headers=headers
+    )
+    url = f"/db/racks/{rack['id']}"
+    assert test_client.get(url, headers=headers).status_code == 200
+
+    with query_budget(2):
+        cached = test_client.get(url, headers=headers).json()
+    assert cached["room_name"] == room["name"]
+    assert [m["id"] for m in cached["shelves"][0]["machines"]] == [machine["id"]]
+
+    test_client.patch(
+        f"/db/machines/{machine['id']}", json={"name": "renamed"}, headers=headers
+    )
+    with query_budget(3):
+        rendered = test_client.get(url, headers=headers).json()
+    assert rendered["shelves"][0]["machines"][0]["name"] == "renamed"
+
+
+def test_team_views_render_changed_teams_only(
+    test_client, service_header_sync, query_budget
+):
+    """
+    Team views are served from the per-team cache after one version query,
+    a change to a machine of the team renders the team again.
+    """
+    headers = service_header_sync
+    team = test_client.post(
+        "/db/teams/", json={"name": unique_str("team")}, headers=headers
+    ).json()
+    room = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("room"), "room_type": "srv", "team_id": team["id"]},
+        headers=headers,
+    ).json()
+    meta = test_client.post(
+        "/db/metadata/", json={"agent_prometheus": False}, headers=headers
+    ).json()
+    machine = test_client.post(
+        "/db/machines/",
+        json={
+            "name": unique_str("srv"),
+            "localization_id": room["id"],
+            "metadata_id": meta["id"],
+            "team_id": team["id"],
+        },
+        headers=headers,
+    ).json()
+    url = f"/db/teams/team_info/{team['id']}"
+    assert test_client.get(url, headers=headers).status_code == 200
+    assert test_client.get("/db/teams/teams_info", headers=headers).status_code == 200
+
+    with query_budget(2):
+        detail = test_client.get(url, headers=headers).json()
+    assert [m["name"] for m in detail["machines"]] == [machine["name"]]
+    assert detail["machines"][0]["rack_name"] == "Unplaced"
+    with query_budget(2):
+        teams = test_client.get("/db/teams/teams_info", headers=headers).json()
+    assert team["id"] in [t["id"] for t in teams]
+
+    test_client.patch(
+        f"/db/machines/{machine['id']}", json={"name": "renamed"}, headers=headers
+    )
+    detail = test_client.get(url, headers=headers).json()
+    assert [m["name"] for m in detail["machines"]] == ["renamed"]
+    missing = test_client.get("/db/teams/team_info/999999", headers=headers)
+    assert missing.status_code == 404
@@ -0,0 +1,275 @@
+"""
+Smoke tests for rentals and the availability of inventory items.
+"""
+
+import json
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from app.db.models import Inventory, InventoryReservation, Rentals, User
+from app.utils.redis_service import get_redis_client
+from app.utils.rental_service import OVERDUE_QUEUE_KEY, sweep_rentals
+
+pytestmark = [pytest.mark.smoke, pytest.mark.api, pytest.mark.database]
+
+
+def unique_str(prefix: str):
+    """
+    Generate random name to avoid unique fields.
+    :param prefix: Starting prefix
+    :return: Prefix along with random name
+    """
+    return f"{prefix}_{uuid.uuid4().hex[:6]}"
+
+
+def days(offset: int):
+    """
+    Date relative to today, as sent in JSON.
+    :param offset: Days from today
+    :return: ISO date string
+    """
+    return str(date.today() + timedelta(days=offset))
+
+
+@pytest.fixture(name="item_id")
+def fixture_item_id(test_client, service_header_sync):
+    """
+    Inventory item with quantity 3.
+    """
+    headers = service_header_sync
+    room_id = test_client.post(
+        "/db/rooms/",
+        json={"name": unique_str("RentRoom"), "room_type": "srv"},
+        headers=headers,
+    ).json()["id"]
+    cat_id = test_client.post(
+        "/db/categories/", json={"name": unique_str("RentCat")}, headers=headers
+    ).json()["id"]
+    return test_client.post(
+        "/db/inventory/",
+        json={
+            "name": unique_str("Probe"),
+            "quantity": 3,
+            "category_id": cat_id,
+            "localization_id": room_id,
+        },
+        headers=headers,
+    ).json()["id"]
+
+
+def rent(test_client, headers, item_id, start, end, quantity):
+    """
+    Create a rental of the item between two day offsets.
+    """
+    return test_client.post(
+        "/db/rentals/",
+        json={
+            "item_id": item_id,
+            "start_date": days(start),
+            "end_date": days(end),
+            "quantity": quantity,
+        },
+        headers=headers,
+    )
+
+
+def in_stock(test_client, headers, item_id):
+    """
+    In stock quantity of the item shown by the detail endpoint.
+    """
+    return test_client.get(f"/db/inventory/details/{item_id}", headers=headers).json()[
+        "in_stock_quantity"
+    ]
+
+
+def test_stock_check_uses_peak_reservation(
+    test_client, service_header_sync, db_session, item_id, query_budget
+):
+    """
+    Rentals that do not overlap each other can share the stock, and the stock
+    check reads the reservation calendar instead of the rental history.
+    """
+    headers = service_header_sync
+    assert rent(test_client, headers, item_id, 0, 4, 2).status_code == 201
+    assert rent(test_client, headers, item_id, 6, 9, 2).status_code == 201
+    with query_budget(8, max_repeats=1):
+        assert rent(test_client, headers, item_id, 3, 7, 1).status_code == 201
+    conflict = rent(test_client, headers, item_id, 4, 4, 1)
+    assert conflict.status_code == 409
+    assert conflict.json()["detail"] == "You can't borrow more than: 0"
+
+    calendar = dict(
+        db_session.query(InventoryReservation.day, InventoryReservation.quantity)
+        .filter(InventoryReservation.item_id == item_id)
+        .all()
+    )
+    assert calendar[date.today()] == 2
+    assert calendar[date.today() + timedelta(days=4)] == 3
+    assert calendar[date.today() + timedelta(days=5)] == 1
+    assert len(calendar) == 10
+    assert in_stock(test_client, headers, item_id) == 1
+
+
+def test_return_and_delete_release_reservations(
+    test_client, service_header_sync, db_session, item_id
+):
+    """
+    Returned and deleted rentals give their days back, once.
+    """
+    headers = service_header_sync
+    partial = rent(test_client, headers, item_id, -2, 5, 3).json()
+    assert in_stock(test_client, headers, item_id) == 0
+
+    response = test_client.post(
+        f"/db/rentals/{partial['id']}/return", json={"quantity": 2}, headers=headers
+    )
+    assert response.status_code == 200
+    assert in_stock(test_client, headers, item_id) == 2
+
+    test_client.post(f"/db/rentals/{partial['id']}/return", headers=headers)
+    for body in (None, {"quantity": 1}):
+        again = test_client.post(
+            f"/db/rentals/{partial['id']}/return", json=body, headers=headers
+        )
+        assert again.status_code == 409
+    future = rent(test_client, headers, item_id, 1, 5, 3).json()
+    assert future["id"]
+
+    assert (
+        test_client.delete(f"/db/rentals/{future['id']}", headers=headers).status_code
+        == 204
+    )
+    calendar = dict(
+        db_session.query(InventoryReservation.day, InventoryReservation.quantity)
+        .filter(InventoryReservation.item_id == item_id)
+        .all()
+    )
+    # The returned rental keeps its days up to today
+    assert calendar == {
+        date.today() + timedelta(days=offset): 1 for offset in range(-2, 1)
+    }
+
+
+def test_returning_future_rental_cancels_it(
+    test_client, service_header_sync, db_session, item_id
+):
+    """
+    Returning a rental that has not started yet deletes it and frees its days.
+    """
+    headers = service_header_sync
+    future = rent(test_client, headers, item_id, 3, 6, 2).json()
+
+    response = test_client.post(f"/db/rentals/{future['id']}/return", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"message": "Rental cancelled"}
+    assert (
+        test_client.get(f"/db/rentals/{future['id']}", headers=headers).status_code
+        == 404
+    )
+    assert not (
+        db_session.query(InventoryReservation)
+        .filter(InventoryReservation.item_id == item_id)
+        .count()
+    )
+    assert rent(test_client, headers, item_id, 3, 6, 3).status_code == 201
+
+
+def test_item_details_load_only_active_rentals(
+    test_client, service_header_sync, db_session, item_id, query_budget
+):
+    """
+    Returned rentals are neither returned nor loaded by the detail views.
+    """
+    headers = service_header_sync
+    user_id = db_session.query(User.id).filter(User.login == "Service").scalar()
+    db_session.add_all(
+        Rentals(
+            item_id=item_id,
+            user_id=user_id,
+            start_date=date.today() - timedelta(days=offset + 1),
+            end_date=date.today() - timedelta(days=offset),
+            returned_on=date.today() - timedelta(days=offset),
+            quantity=1,
+        )
+        for offset in range(1, 200)
+    )
+    db_session.commit()
+    active = rent(test_client, headers, item_id, 0, 2, 1).json()
+
+    with query_budget(6, max_repeats=1):
+        detail = test_client.get(f"/db/inventory/details/{item_id}", headers=headers)
+
+    rentals = detail.json()["active_rentals"]
+    assert [r["id"] for r in rentals] == [active["id"]]
+    assert rentals[0]["borrower_team"] != ""
+    listing = test_client.get("/db/inventory/details", headers=headers).json()
+    item = next(i for i in listing if i["id"] == item_id)
+    assert [r["id"] for r in item["active_rentals"]] == [active["id"]]
+    assert item["in_stock_quantity"] == 2
+
+
+def test_rentals_filtered_by_period(test_client, service_header_sync, item_id):
+    """
+    The rental list returns the rentals overlapping a period, and rentals
+    ending before they start are refused.
+    """
+    headers = service_header_sync
+    early = rent(test_client, headers, item_id, 0, 2, 1).json()
+    late = rent(test_client, headers, item_id, 5, 8, 1).json()
+    assert rent(test_client, headers, item_id, 3, 1, 1).status_code == 400
+
+    def listed(**period):
+        params = {key: days(offset) for key, offset in period.items()}
+        response = test_client.get("/db/rentals/", params=params, headers=headers)
+        return {r["id"] for r in response.json()} & {early["id"], late["id"]}
+
+    assert listed(start_date=2, end_date=4) == {early["id"]}
+    assert listed(start_date=3, end_date=4) == set()
+    assert listed(start_date=8) == {late["id"]}
+    assert listed(end_date=0) == {early["id"]}
+    assert listed() == {early["id"], late["id"]}
+
+
+async def test_sweeper_queues_overdue_rentals_and_counts_started_ones(
+    test_client, service_header_sync, db_session, item_id
+):
+    """
+    The sweep of a day queues one notification per rental that ended without
+    being returned, and counts the rentals starting that day as rented.
+    """
+    headers = service_header_sync
+    late = rent(test_client, headers, item_id, -5, -1, 1).json()
+    starting = rent(test_client, headers, item_id, 1, 3, 2).json()
+    user_id = db_session.get(Rentals, late["id"]).user_id
+    item = db_session.get(Inventory, item_id)
+    assert (item.rented_quantity, item.rental_status) == (1, False)
+
+    redis_client = await get_redis_client()
+    queue_start = await redis_client.llen(OVERDUE_QUEUE_KEY)
+    tomorrow = date.today() + timedelta(days=1)
+    for _ in range(2):
+        result = await sweep_rentals(tomorrow, since=date.today(), batch_size=2)
+        assert result["refreshed"] >= 1
+
+    queued = [
+        json.loads(n)
+        for n in await redis_client.lrange(OVERDUE_QUEUE_KEY, queue_start, -1)
+    ]
+    assert [n for n in queued if n["rental_id"] == late["id"]] == [
+        {
+            "rental_id": late["id"],
+            "item_id": item_id,
+            "user_id": user_id,
+            "end_date": days(-1),
+            "quantity": 1,
+        }
+    ]
+    db_session.expire_all()
+    assert db_session.get(Rentals, late["id"]).overdue
+    item = db_session.get(Inventory, item_id)
+    assert (item.rented_quantity, item.rental_status, item.rental_id) == (
+        3,
+        True,
+        starting["id"],
+    )
@@ -0,0 +1,161 @@
+"""
+Smoke tests for the search endpoint.
+"""
+
+import uuid
+
+import pytest
+
+pytestmark = [pytest.mark.smoke, pytest.mark.api, pytest.mark.database]
+
+
+def unique_word():
+    """
+    Generate a random word no other row contains.
+    :return: Random word
+    """
+    return f"w{uuid.uuid4().hex[:10]}"
+
+
+def create_machine(test_client, headers, name, room_id, **fields):
+    """
+    Create a machine with fresh metadata.
+    :return: Machine data
+    """
+    meta = test_client.post(
+        "/db/metadata/", json={"agent_prometheus": False}, headers=headers
+    ).json()
+    return test_client.post(
+        "/db/machines/",
+        json={
+            "name": name,
+            "localization_id": room_id,
+            "metadata_id": meta["id"],
+            **fields,
+        },
+        headers=headers,
+    ).json()
+
+
+def test_search_ranked_and_paginated(test_client, service_header_sync, query_budget):
+    """
+    Machines are found by a prefix of their name, IP, MAC or serial number,
+    results are paginated with the total of all pages.
+    """
+    headers = service_header_sync
+    word = unique_word()
+    room = test_client.post(
+        "/db/rooms/",
+        json={"name": f"{word} lab", "room_type": "srv"},
+        headers=headers,
+    ).json()
+    machine = create_machine(
+        test_client,
+        headers,
+        f"{word} node",
+        room["id"],
+        ip_address="10.77.3.21",
+        mac_address="0a:1b:2c:3d:4e:5f",
+        serial_number=f"SN{word}",
+    )
+
+    response = test_client.get("/search", params={"q": word}, headers=headers)
+    assert response.status_code == 200
+    found = {(item["type"], item["id"]) for item in response.json()["items"]}
+    assert found == {("room", room["id"]), ("machine", machine["id"])}
+
+    for phrase in ["10.77.3", "0a:1b:2c", f"sn{word}", f"{word[:6]} no"]:
+        with query_budget(2):
+            items = test_client.get(
+                "/search",
+                params={"q": phrase, "types": ["machine"]},
+                headers=headers,
+            ).json()["items"]
+        assert machine["id"] in [item["id"] for item in items], phrase
+        assert all(item["type"] == "machine" for item in items)
+
+    first = test_client.get(
+        "/search", params={"q": word, "limit": 1}, headers=headers
+    ).json()
+    second = test_client.get(
+        "/search", params={"q": word, "limit": 1, "offset": 1}, headers=headers
+    ).json()
+    assert first["total"] == second["total"] == 2
+    assert len(first["items"]) == len(second["items"]) == 1
+    pages = [
+        (page["items"][0]["type"], page["items"][0]["id"]) for page in (first, second)
+    ]
+    assert set(pages) == found
+    assert first["items"][0]["rank"] >= second["items"][0]["rank"]
+    past = test_client.get(
+        "/search", params={"q": word, "offset": 5}, headers=headers
+    ).json()
+    assert past["total"] == 2 and past["items"] == []
+    repeated = test_client.get(
+        "/search",
+        params={"q": word, "types": ["machine", "machine"]},
+        headers=headers,
+    ).json()
+    assert repeated["total"] == 1
+    assert [item["id"] for item in repeated["items"]] == [machine["id"]]
+    empty = test_client.get("/search", params={"q": ""}, headers=headers)
+    assert empty.status_code == 422
+    assert (
+        test_client.get(
+            "/search", params={"q": word, "types": ["shelf"]}, headers=headers
+        ).status_code
+        == 422
+    )
+
+
+def test_search_is_team_scoped(test_client, service_header_sync):
+    """
+    Users only find the machines and users of their teams.
+    """
+    headers = service_header_sync
+    word = unique_word()
+    team_ids = [
+        test_client.post(
+            "/db/teams/",
+            json={"name": f"{word} team {i}", "team_admin_id": 1},
+            headers=headers,
+        ).json()["id"]
+        for i in range(2)
+    ]
+    created = test_client.post(
+        "/db/users/",
+        json={
+            "login": word,
+            "email": f"{word}@lab.pl",
+            "user_type": "group_admin",
+            "team_ids": [team_ids[0]],
+            "name": "Search",
+            "surname": word,
+        },
+        headers=headers,
+    ).json()
+    token = test_client.post(
+        "/auth/login",
+        data={"username": word, "password": created["generated_password"]},
+    ).json()["access_token"]
+    member = {"Authorization": f"Bearer {token}"}
+    room = test_client.post(
+        "/db/rooms/",
+        json={"name": f"{word} lab", "room_type": "srv"},
+        headers=headers,
+    ).json()
+    own, other = [
+        create_machine(
+            test_client, headers, f"{word} {i}", room["id"], team_id=team_ids[i]
+        )
+        for i in range(2)
+    ]
+
+    items = test_client.get(
+        "/search",
+        params={"q": word, "types": ["machine", "user"]},
+        headers=member,
+    ).json()["items"]
+    found = {(item["type"], item["id"]) for item in items}
+    assert found == {("machine", own["id"]), ("user", created["id"])}
+    assert ("machine", other["id"]) not in found
@@ -0,0 +1,161 @@
+"""
+Smoke tests for tag assignment, tag filters of the listings and tag facets.
+"""
+
+import uuid
+
+import pytest
+
+pytestmark = [pytest.mark.smoke, pytest.mark.api, pytest.mark.database]
+
+
+def unique_str(prefix: str):
+    """
+    Generate random name to avoid unique fields.
+    :param prefix: Starting prefix
+    :return: Prefix along with random name
+    """
+    return f"{prefix}_{uuid.uuid4().hex[:6]}"
+
+
+def create_tags(test_client, headers, count):
+    """
+    Create tags with random names.
+    :return: List of tag data
+    """
+    return [
+        test_client.post(
+            "/db/tags/",
+            json={"name": unique_str("tag"), "color": "red"},
+            headers=headers,
+        ).json()
+        for _ in range(count)
+    ]
+
+
+def create_rooms(test_client, headers, count):
+    """
+    Create rooms with random names.
+    :return: List of room data
+    """
+    return [
+        test_client.post(
+            "/db/rooms/",
+            json={"name": unique_str("room"), "room_type": "srv"},
+            headers=headers,
+        ).json()
+        for _ in range(count)
+    ]
+
+
+def test_tag_assignment_is_idempotent(test_client, service_header_sync):
+    """
+    Assigning a tag twice links it once, bulk assignment only creates the
+    missing links and bulk detach removes them.
+    """
+    headers = service_header_sync
+    tags = create_tags(test_client, headers, 2)
+    rooms = create_rooms(test_client, headers, 2)
+    link = {"tag_id": tags[0]["id"], "entity_id": rooms[0]["id"], "entity_type": "room"}
+
+    for _ in range(2):
+        response = test_client.post("/db/tags/assign", json=link, headers=headers)
+        assert response.status_code == 200
+    room = test_client.get(f"/db/rooms/{rooms[0]['id']}", headers=headers).json()
+    assert [t["id"] for t in room["tags"]] == [tags[0]["id"]]
+
+    bulk = {
+        "tag_ids": [t["id"] for t in tags],
+        "entity_ids": [r["id"] for r in rooms],
+        "entity_type": "Room",
+    }
+    assigned = test_client.post("/db/tags/assign/bulk", json=bulk, headers=headers)
+    assert assigned.json() == {"changed": 3}
+    again = test_client.post("/db/tags/assign/bulk", json=bulk, headers=headers)
+    assert again.json() == {"changed": 0}
+
+    detached = test_client.post("/db/tags/detach", json=link, headers=headers)
+    assert detached.status_code == 200
+    removed = test_client.post("/db/tags/detach/bulk", json=bulk, headers=headers)
+    assert removed.json() == {"changed": 3}
+    room = test_client.get(f"/db/rooms/{rooms[0]['id']}", headers=headers).json()
+    assert room["tags"] == []
+
+    invalid = test_client.post(
+        "/db/tags/assign", json={**link, "entity_type": "shelf"}, headers=headers
+    )
+    assert invalid.status_code == 400
+    missing_tag = test_client.post(
+        "/db/tags/assign", json={**link, "tag_id": 999999}, headers=headers
+    )
+    assert missing_tag.status_code == 404
+    missing_room = test_client.post(
+        "/db/tags/assign/bulk",
+        json={**bulk, "entity_ids": [rooms[0]["id"], 999999]},
+        headers=headers,
+    )
+    assert missing_room.status_code == 404
+    too_many = test_client.post(
+        "/db/tags/assign/bulk",
+        json={**bulk, "entity_ids": list(range(1, 1002))},
+        headers=headers,
+    )
+    assert too_many.status_code == 422
+
+
+def test_tag_filters_and_facets(test_client, service_header_sync, query_budget):
+    """
+    Listings keep entities with all or any of the tags, facets count the
+    entities carrying each tag.
+    """
+    headers = service_header_sync
+    first, second = create_tags(test_client, headers, 2)
+    rooms = create_rooms(test_client, headers, 3)
+    links = [(rooms[0], first), (rooms[0], second), (rooms[1], first)]
+    for room, tag in links:
+        test_client.post(
+            "/db/tags/assign",
+            json={"tag_id": tag["id"], "entity_id": room["id"], "entity_type": "room"},
+            headers=headers,
+        )
+    document = test_client.post(
+        "/db/documentation/",
+        json={"title": unique_str("doc"), "content": "-", "tag_ids": [second["id"]]},
+        headers=headers,
+    ).json()
+
+    def listed(url, **params):
+        response = test_client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        return {item["id"] for item in response.json()}
+
+    both = f"{first['name']},{second['name']}"
+    assert listed("/db/rooms/", tags=both) == {rooms[0]["id"]}
+    assert listed("/db/rooms/", tags=[first["name"], second["name"]]) == {
+        rooms[0]["id"]
+    }
+    assert listed("/db/rooms/", tags=both, tags_mode="or") == {
+        rooms[0]["id"],
+        rooms[1]["id"],
+    }
+    assert listed("/db/documentation/", tags=second["name"]) == {document["id"]}
+    assert listed("/db/machines/", tags=first["name"]) == set()
+    assert listed("/db/racks", tags=first["name"]) == set()
+    assert len(listed("/db/rooms/")) >= 3
+
+    with query_budget(2):
+        response = test_client.get("/db/tags/facets", headers=headers)
+    assert response.status_code == 200
+    facets = {facet["id"]: facet for facet in response.json()}
+    assert facets[first["id"]]["counts"] == {
+        "machine": 0,
+        "rack": 0,
+        "room": 2,
+        "documentation": 0,
+    }
+    assert facets[second["id"]]["total"] == 2
+    rooms_only = test_client.get(
+        "/db/tags/facets", params={"types": ["room"]}, headers=headers
+    ).json()
+    counts = {facet["id"]: facet["counts"] for facet in rooms_only}
+    assert counts[second["id"]] == {"room": 1}
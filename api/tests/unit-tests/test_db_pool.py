@@ -0,0 +1,46 @@
+"""Unit tests for connection pool telemetry."""
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db.pool import TimedQueuePool, pool_status
+
+
+@pytest.mark.unit
+def test_timed_pool_records_checkouts():
+    """Every checkout is counted and pool usage is reported."""
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool, pool_size=2)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        status = pool_status(engine.pool)
+        assert status["checked_out"] == 1
+        assert status["pool_size"] == 2
+
+    status = pool_status(engine.pool)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 1
+    assert status["timeouts"] == 0
+    assert status["wait_seconds_max"] >= 0
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_timed_pool_records_timeouts():
+    """A checkout that exceeds pool_timeout is counted as a timeout."""
+    engine = create_engine(
+        "sqlite://",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        status = pool_status(engine.pool)
+        assert status["overflow"] == 0
+
+    status = pool_status(engine.pool)
+    assert status["timeouts"] == 1
+    assert status["wait_seconds_max"] >= 0.1
+    engine.dispose()
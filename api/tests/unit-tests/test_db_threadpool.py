@@ -0,0 +1,59 @@
+"""Unit tests for running blocking database work off the event loop."""
+
+import asyncio
+import time
+
+import pytest
+from anyio import CapacityLimiter
+from app import database
+from app.database import run_in_db_threadpool
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_threadpool_keeps_event_loop_responsive():
+    """Blocking work in the threadpool does not stall other coroutines."""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        await run_in_db_threadpool(time.sleep, 0.3)
+    finally:
+        task.cancel()
+    assert ticks >= 10
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_threadpool_runs_blocking_work_concurrently(monkeypatch):
+    """Concurrent callers overlap up to the limiter size instead of serializing."""
+    monkeypatch.setattr(database, "db_threadpool_limiter", CapacityLimiter(4))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_in_db_threadpool(time.sleep, 0.2) for _ in range(4)))
+    assert time.perf_counter() - start < 0.6
+
+    monkeypatch.setattr(database, "db_threadpool_limiter", CapacityLimiter(1))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_in_db_threadpool(time.sleep, 0.1) for _ in range(3)))
+    assert time.perf_counter() - start >= 0.3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_threadpool_propagates_return_values_and_errors():
+    """Results and exceptions from the worker are returned to the caller."""
+
+    def boom():
+        raise ValueError("failed")
+
+    assert await run_in_db_threadpool(lambda a, b=0: a + b, 1, b=2) == 3
+    with pytest.raises(ValueError):
+        await run_in_db_threadpool(boom)
@@ -0,0 +1,90 @@
+"""Unit tests for the synthetic Prometheus server and the metrics pipeline."""
+
+import time
+
+import httpx
+import pytest
+
+from app.utils.prometheus_service import fetch_prometheus_metrics
+
+pytestmark = [pytest.mark.unit, pytest.mark.prometheus]
+
+
+async def test_pipeline_reads_every_host(fake_prometheus):
+    """fetch_prometheus_metrics parses one series per host and mountpoint."""
+    prometheus = fake_prometheus(hosts=500, cardinality=3, down_ratio=0.1)
+
+    result = await fetch_prometheus_metrics(
+        ["status", "cpu_usage", "memory_usage", "disk_usage"]
+    )
+
+    assert len(result["status"]) == 500
+    assert sum(s["value"] == 0.0 for s in result["status"]) == 50
+    assert len(result["cpu_usage"]) == 500
+    assert len(result["disk_usage"]) == 1500
+    assert {m["mountpoint"] for m in result["disk_usage"]} == {"/", "/data1", "/data2"}
+    assert prometheus.requests == 4
+
+
+async def test_pipeline_filters_hosts(fake_prometheus):
+    """Host filtering keeps only the requested instances."""
+    prometheus = fake_prometheus(hosts=100)
+    wanted = prometheus.instances[:3]
+
+    result = await fetch_prometheus_metrics(["status"], hosts=wanted)
+
+    assert [s["instance"] for s in result["status"]] == wanted
+
+
+async def test_latency_is_applied(fake_prometheus):
+    """Every response is delayed by the configured latency."""
+    fake_prometheus(hosts=1, latency=0.2)
+
+    start = time.perf_counter()
+    await fetch_prometheus_metrics(["status", "cpu_usage"])
+
+    assert time.perf_counter() - start >= 0.4
+
+
+def test_error_rate_is_reproducible(fake_prometheus):
+    """The same seed fails the same requests."""
+    outcomes = []
+    for _ in range(2):
+        prometheus = fake_prometheus(hosts=1, error_rate=0.5, seed=7)
+        with httpx.Client(base_url=prometheus.url) as client:
+            codes = [
+                client.get("/api/v1/query", params={"query": "up"}).status_code
+                for _ in range(20)
+            ]
+        assert set(codes) == {200, 503}
+        assert prometheus.errors == codes.count(503)
+        outcomes.append(codes)
+    assert outcomes[0] == outcomes[1]
+
+
+def test_query_range_returns_matrix(fake_prometheus):
+    """Range queries return one point per step for every series."""
+    prometheus = fake_prometheus(hosts=4, cardinality=2)
+    params = {
+        "query": "node_filesystem_avail_bytes",
+        "start": 1000,
+        "end": 1600,
+        "step": 60,
+    }
+
+    body = httpx.get(f"{prometheus.url}/api/v1/query_range", params=params).json()
+
+    assert body["data"]["resultType"] == "matrix"
+    assert len(body["data"]["result"]) == 8
+    assert all(len(s["values"]) == 11 for s in body["data"]["result"])
+
+
+def test_query_range_rejects_too_many_points(fake_prometheus):
+    """Like Prometheus, overly fine range queries are rejected."""
+    prometheus = fake_prometheus(hosts=1)
+    params = {"query": "up", "start": 0, "end": 100000, "step": 1}
+
+    response = httpx.get(f"{prometheus.url}/api/v1/query_range", params=params)
+
+    assert response.status_code == 400
+    assert response.json()["errorType"] == "bad_data"
@@ -0,0 +1,25 @@
+"""Unit tests keeping heavy optional dependencies out of the API startup."""
+
+import subprocess
+import sys
+
+import pytest
+
+LAZY_MODULES = ("ansible_runner",)
+
+
+@pytest.mark.unit
+def test_app_import_does_not_load_lazy_modules():
+    """Modules only needed by some endpoints are imported on first use."""
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == ""
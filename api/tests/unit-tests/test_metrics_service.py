@@ -0,0 +1,100 @@
+"""Unit tests for request performance instrumentation."""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+
+from app.utils import metrics_service
+from app.utils.metrics_service import (
+    get_request_stats,
+    get_startup_report,
+    instrument_engine,
+    render_metrics,
+    start_request_stats,
+    track_prometheus,
+    track_redis,
+    track_startup,
+)
+
+
+@pytest.mark.unit
+def test_sql_statements_are_counted_per_request():
+    """Cursor executions are added to the stats of the current request."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = start_request_stats()
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+
+    assert get_request_stats() is stats
+    assert stats.db_queries == 2
+    assert stats.db_seconds > 0
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_redis_and_prometheus_calls_are_tracked():
+    """Redis and Prometheus calls are counted even if they raise."""
+    stats = start_request_stats()
+    with track_redis():
+        pass
+    with pytest.raises(RuntimeError):
+        with track_prometheus():
+            raise RuntimeError()
+
+    assert stats.redis_calls == 1
+    assert stats.prometheus_calls == 1
+    assert stats.prometheus_seconds >= 0
+
+
+@pytest.mark.unit
+def test_failed_statements_leave_no_state_on_connection():
+    """A failing statement must not leave timing state behind on the connection."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        stats = start_request_stats()
+        for _ in range(3):
+            with pytest.raises(DBAPIError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert "labbyn_query_start" not in conn.info
+
+    assert stats.db_queries == 1
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_pool_gauges_are_rendered_in_multiprocess_mode(tmp_path, monkeypatch):
+    """Pool gauges must survive the switch to the multiprocess registry."""
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics_service, "_pool_collectors", [])
+    collector = metrics_service.PoolCollector(
+        lambda: {"sync": {"pool_size": 10, "checked_out": 2}}
+    )
+    metrics_service._pool_collectors.append(collector)
+
+    payload, _ = render_metrics()
+
+    assert b'labbyn_db_pool_checked_out{engine="sync"} 2.0' in payload
+
+
+@pytest.mark.unit
+def test_startup_phases_are_reported(monkeypatch):
+    """Startup phases are listed in order and exported as gauges."""
+    monkeypatch.setattr(metrics_service, "_startup_phases", {})
+    metrics_service.record_startup_phase("imports", 0.5)
+    with pytest.raises(RuntimeError):
+        with track_startup("bootstrap"):
+            raise RuntimeError()
+
+    report = get_startup_report()
+    payload, _ = render_metrics()
+
+    assert list(report["phases"]) == ["imports", "bootstrap"]
+    assert report["total_seconds"] >= 0.5
+    assert b'labbyn_startup_phase_seconds{phase="imports"} 0.5' in payload
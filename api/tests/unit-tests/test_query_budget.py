@@ -0,0 +1,35 @@
+"""Unit tests for the SQL statement recorder used by query budget tests."""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from tests.query_budget import QueryRecorder, normalize_statement
+
+
+@pytest.mark.unit
+def test_normalize_statement_replaces_literals_and_parameters():
+    """Statements differing only in values share one shape."""
+    first = normalize_statement("SELECT * FROM tags WHERE id = %(id_1)s AND name = 'a'")
+    second = normalize_statement("SELECT *  FROM tags\nWHERE id = 42 AND name = 'b''c'")
+    assert first == second == "SELECT * FROM tags WHERE id = ? AND name = ?"
+    assert normalize_statement("SELECT 1 WHERE id IN (1, 2, 3)") == (
+        "SELECT ? WHERE id IN (?)"
+    )
+
+
+@pytest.mark.unit
+def test_recorder_reports_repeated_shapes():
+    """Repeated shapes are listed as likely N+1 patterns."""
+    engine = create_engine("sqlite://")
+    recorder = QueryRecorder([engine])
+    recorder.start()
+    with engine.connect() as conn:
+        for i in range(3):
+            conn.execute(text(f"SELECT {i}"))
+        conn.execute(text("SELECT 'x' AS y"))
+    recorder.stop()
+
+    assert recorder.count == 4
+    assert recorder.repeated_shapes() == [("SELECT ?", 3)]
+    assert "likely N+1" in recorder.report()
+    engine.dispose()
@@ -0,0 +1,138 @@
+"""Unit tests for read replica routing and read-your-writes stickiness."""
+
+from unittest import mock
+
+import pytest
+from redis import RedisError
+
+from app import database
+from app.auth.dependencies import RequestContext
+from app.db.models import UserType
+from app.middleware import ReadYourWritesMiddleware
+from app.utils.redis_service import has_recent_write, mark_recent_write
+
+
+def make_app(status_code: int, user_id=None):
+    """Minimal ASGI app that sets request.state like RequestContext does."""
+
+    async def app(scope, receive, send):
+        if user_id is not None:
+            scope.setdefault("state", {})["user_id"] = user_id
+        await send({"type": "http.response.start", "status": status_code})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+async def call(middleware, method: str):
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    await middleware({"type": "http", "method": method, "state": {}}, receive, send)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "method,status_code,user_id,marked",
+    [
+        ("POST", 201, 7, True),
+        ("PATCH", 200, 7, True),
+        ("DELETE", 409, 7, False),
+        ("GET", 200, 7, False),
+        ("POST", 201, None, False),
+    ],
+)
+async def test_middleware_marks_successful_writes(method, status_code, user_id, marked):
+    """Only successful mutations by an authenticated user pin reads to the primary."""
+    middleware = ReadYourWritesMiddleware(make_app(status_code, user_id), 5)
+    with mock.patch(
+        "app.middleware.mark_recent_write", new=mock.AsyncMock()
+    ) as mark_mock:
+        await call(middleware, method)
+    if marked:
+        mark_mock.assert_awaited_once_with(user_id, 5)
+    else:
+        mark_mock.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_recent_write_roundtrip(redis_client_mock):
+    """A marked user is reported as having a recent write."""
+    await mark_recent_write(3, 5)
+    redis_client_mock.set.assert_awaited_once_with("db_recent_write:3", "1", ex=5)
+
+    redis_client_mock.get.return_value = "1"
+    assert await has_recent_write(3) is True
+    redis_client_mock.get.return_value = None
+    assert await has_recent_write(3) is False
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_recent_write_falls_back_to_primary_on_redis_error(redis_client_mock):
+    """Without Redis the stickiness state is unknown, so the primary is used."""
+    redis_client_mock.get.side_effect = RedisError()
+    assert await has_recent_write(3) is True
+
+
+@pytest.mark.unit
+def test_replica_session_selection(monkeypatch):
+    """Reads use the replica unless the primary is requested."""
+    replica_factory = mock.Mock()
+    primary_factory = mock.Mock()
+    monkeypatch.setattr(database, "ReplicaSessionLocal", replica_factory)
+    monkeypatch.setattr(database, "SessionLocal", primary_factory)
+
+    gen = database.get_replica_db(use_primary=False)
+    assert next(gen) is replica_factory.return_value
+    gen.close()
+    replica_factory.return_value.close.assert_called_once()
+
+    gen = database.get_replica_db(use_primary=True)
+    assert next(gen) is primary_factory.return_value
+    gen.close()
+
+    monkeypatch.setattr(database, "ReplicaSessionLocal", None)
+    gen = database.get_replica_db(use_primary=False)
+    assert next(gen) is primary_factory.return_value
+    gen.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_middleware_marks_before_response_reaches_client():
+    """The marker exists before the client can send its next request."""
+    events = []
+    middleware = ReadYourWritesMiddleware(make_app(201, 7), 5)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        events.append(message["type"])
+
+    async def mark(user_id, expire):  # pylint: disable=unused-argument
+        events.append("mark")
+
+    with mock.patch("app.middleware.mark_recent_write", new=mark):
+        await middleware({"type": "http", "method": "POST", "state": {}}, receive, send)
+    assert events == ["mark", "http.response.start", "http.response.body"]
+
+
+@pytest.mark.unit
+def test_request_context_releases_primary_connection():
+    """The team lookup must not keep a primary transaction open for the handler."""
+    db = mock.MagicMock()
+    user = mock.MagicMock(id=4, user_type=UserType.USER)
+    request = mock.MagicMock()
+
+    ctx = RequestContext(request, current_user=user, db=db)
+
+    db.rollback.assert_called_once()
+    assert request.state.user_id == 4
+    assert ctx.is_user
@@ -0,0 +1,59 @@
+"""Unit tests for password hashing."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils import security
+from app.utils.security import get_password_helper, hash_password_async
+
+
+@pytest.mark.unit
+def test_outdated_cost_is_rehashed():
+    """Hashes with a lower cost than configured get a new hash on verify."""
+    old_hash = get_password_helper("bcrypt", bcrypt_rounds=4).hash("secret")
+    helper = get_password_helper("bcrypt", bcrypt_rounds=5)
+
+    verified, updated = helper.verify_and_update("secret", old_hash)
+
+    assert verified
+    assert updated.startswith("$2b$05$")
+    assert helper.verify_and_update("secret", updated) == (True, None)
+    assert helper.verify_and_update("wrong", old_hash) == (False, None)
+
+
+@pytest.mark.unit
+def test_other_scheme_is_migrated_to_configured_one():
+    """Argon2 hashes are replaced by bcrypt ones when bcrypt is configured."""
+    argon2_hash = get_password_helper("argon2", argon2_time_cost=1).hash("secret")
+    helper = get_password_helper("bcrypt", bcrypt_rounds=4)
+
+    verified, updated = helper.verify_and_update("secret", argon2_hash)
+
+    assert verified
+    assert updated.startswith("$2b$04$")
+
+
+@pytest.mark.unit
+async def test_async_hashing_does_not_block_event_loop(monkeypatch):
+    """Hashing runs in the worker threads while the loop keeps ticking."""
+    monkeypatch.setattr(
+        security, "password_helper", get_password_helper("bcrypt", bcrypt_rounds=10)
+    )
+    gaps = []
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticker = asyncio.create_task(heartbeat())
+    hashes = await asyncio.gather(*(hash_password_async("secret") for _ in range(8)))
+    ticker.cancel()
+
+    assert len(set(hashes)) == 8
+    assert max(gaps) < 0.05